@@ -1,7 +1,21 @@
 # fly_recombination_logic.py
 import requests
+import asyncio
+import csv
+import gzip
 import json
+import mmap
 import os
+import re
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import unquote
 
 NCBI_BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
 NCBI_SUMMARY_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esummary.fcgi"
@@ -17,47 +31,285 @@ CENTROMERE_REGIONS = {
     "X": 1.53e6
 }
 
-def fetch_gene_info(identifier):
+CACHE_DIR = "ncbi_downloads"
+CACHE_INDEX = "index.json"
+CACHE_TTL = 365 * 24 * 3600  # seconds; coordinates only move with a new genome annotation release
+CACHE_MAXSIZE = 1024
+
+
+def _cache_key(identifier):
+    # NCBI term searches are case-insensitive, so 'White' and 'white' are the same query
+    return identifier.strip().casefold()
+
+
+class GeneCache:
     """
-    Fetch gene info from NCBI, supporting either:
-      - FlyBase IDs (FBgnxxxxx)
-      - Gene symbols (e.g., 'eve')
-    
-    Behavior:
-      - FlyBase IDs: searched explicitly in dbXrefs and synonyms, forced to unique match.
-      - Gene names: searched in official symbol field; ambiguous hits raise an error.
+    Read-through cache of NCBI gene summaries (the esummary record of each gene).
+
+      - In-process LRU of up to `maxsize` records, keyed by NCBI UID.
+      - On disk, in `directory`: `{identifier}.json` per looked-up identifier
+        (the files fetch_gene_info() always wrote) and `index.json`, mapping each
+        identifier (symbol or FlyBase ID) to its UID and each UID to its file and
+        fetch time. Several identifiers of one gene share one record.
+
+    Only identifiers that NCBI actually resolved are indexed, so a cached lookup
+    gives the same answer as the search (an ambiguous name is never cached).
+    Records older than `ttl` seconds (None: never) are treated as missing.
     """
 
-    # --- 1. Detect whether it's a FlyBase ID ---
-    is_flybase_id = identifier.startswith("FBgn")
+    def __init__(self, directory=CACHE_DIR, ttl=CACHE_TTL, maxsize=CACHE_MAXSIZE):
+        self.directory = directory
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._records = OrderedDict()  # uid -> gene_data, least recently used first
+        self._index = None
+        self._lock = threading.RLock()
+
+    @property
+    def index_path(self):
+        return os.path.join(self.directory, CACHE_INDEX)
+
+    @property
+    def index(self):
+        """{"aliases": {identifier key: uid}, "records": {uid: {"file", "fetched"}}}, loaded on first use."""
+        with self._lock:
+            if self._index is None:
+                try:
+                    with open(self.index_path) as f:
+                        self._index = json.load(f)
+                except (OSError, ValueError):
+                    self._index = self._scan()
+            return self._index
+
+    def _scan(self):
+        """Index the JSON files already in the directory (e.g. written before the index existed)."""
+        index = {"aliases": {}, "records": {}}
+        try:
+            names = sorted(os.listdir(self.directory))
+        except OSError:
+            return index
+        for name in names:
+            path = os.path.join(self.directory, name)
+            if not name.endswith(".json") or name == CACHE_INDEX:
+                continue
+            try:
+                with open(path) as f:
+                    uid = str(json.load(f)["uid"])
+            except (OSError, ValueError, KeyError, TypeError):
+                continue
+            index["aliases"][_cache_key(name[:-len(".json")])] = uid
+            index["records"].setdefault(uid, {"file": name, "fetched": os.path.getmtime(path)})
+        return index
+
+    def _fresh(self, meta):
+        return self.ttl is None or time.time() - meta["fetched"] <= self.ttl
+
+    def _remember(self, uid, gene_data):
+        self._records[uid] = gene_data
+        self._records.move_to_end(uid)
+        while len(self._records) > self.maxsize:
+            self._records.popitem(last=False)
+
+    def get_uid(self, uid):
+        """The cached record of NCBI gene `uid`, or None if it is missing or older than the TTL."""
+        uid = str(uid)
+        with self._lock:
+            meta = self.index["records"].get(uid)
+            if meta is None or not self._fresh(meta):
+                self._records.pop(uid, None)
+                return None
+            if uid in self._records:
+                self._records.move_to_end(uid)
+                return self._records[uid]
+            try:
+                with open(os.path.join(self.directory, meta["file"])) as f:
+                    gene_data = json.load(f)
+            except (OSError, ValueError):
+                return None
+            self._remember(uid, gene_data)
+            return gene_data
+
+    def lookup(self, identifier):
+        """The cached record `identifier` resolved to, or None."""
+        uid = self.index["aliases"].get(_cache_key(identifier))
+        return None if uid is None else self.get_uid(uid)
+
+    def store(self, identifier, gene_data):
+        """Save the record `identifier` resolved to and index it under the identifier and its UID."""
+        uid = str(gene_data["uid"])
+        name = f"{identifier}.json"
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, name), "w") as f:
+                json.dump(gene_data, f, indent=4)
+            index = self.index
+            index["aliases"][_cache_key(identifier)] = uid
+            index["records"][uid] = {"file": name, "fetched": time.time()}
+            tmp = self.index_path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(index, f, indent=1)
+            os.replace(tmp, self.index_path)
+            self._remember(uid, gene_data)
+
+    def clear_memory(self):
+        """Drop the in-process records (the on-disk store is kept)."""
+        with self._lock:
+            self._records.clear()
+            self._index = None
+
+
+gene_cache = GeneCache()
+
+
+NCBI_API_KEY = os.environ.get("NCBI_API_KEY")
+# NCBI E-utilities policy: at most 3 requests per second, 10 with an API key
+NCBI_MAX_RPS = 10 if NCBI_API_KEY else 3
+ESUMMARY_BATCH = 200  # UIDs per esummary request
+NCBI_MAX_WORKERS = 8  # concurrent requests (and pooled connections)
+NCBI_RETRIES = 4
+NCBI_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RateLimiter:
+    """
+    Token bucket shared by all threads: wait() takes one token, sleeping until
+    one is available. Tokens refill at `rate` per second up to `burst`, so at most
+    `burst` calls go out back to back and the long-run rate never exceeds `rate`.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # a negative balance is a reservation: later callers queue behind it
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0
+        if delay > 0:
+            time.sleep(delay)
+
+
+ncbi_limiter = RateLimiter(NCBI_MAX_RPS)
+
+
+class NCBIClient:
+    """
+    E-utilities client shared by all lookups:
+      - one requests.Session whose connection pool keeps up to `max_workers`
+        connections alive, so requests skip the TCP/TLS handshake
+      - every request waits for the `ncbi_limiter` token bucket
+      - 429 and 5xx responses and connection errors are retried up to `retries`
+        times, after the Retry-After header or an exponential backoff
+      - map() runs lookups concurrently on a thread pool of `max_workers`, so
+        throughput is set by the rate limit rather than the round-trip time
+    """
+
+    def __init__(self, max_workers=NCBI_MAX_WORKERS, retries=NCBI_RETRIES, backoff=0.5, timeout=30):
+        self.max_workers = max_workers
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = requests.adapters.HTTPAdapter(pool_connections=2, pool_maxsize=max_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="ncbi")
+            return self._executor
+
+    def _retry_delay(self, attempt, resp=None):
+        retry_after = resp.headers.get("Retry-After", "") if resp is not None else ""
+        if retry_after.isdigit():
+            return int(retry_after)
+        return self.backoff * 2 ** attempt
 
-    # --- 2. Build the search term ---
-    if is_flybase_id:
+    def get_json(self, url, params):
+        if NCBI_API_KEY:
+            params = {**params, "api_key": NCBI_API_KEY}
+        for attempt in range(self.retries + 1):
+            ncbi_limiter.wait()
+            try:
+                resp = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt == self.retries:
+                    raise
+                time.sleep(self._retry_delay(attempt))
+                continue
+            if resp.status_code in NCBI_RETRY_STATUSES and attempt < self.retries:
+                time.sleep(self._retry_delay(attempt, resp))
+                continue
+            resp.raise_for_status()
+            return resp.json()
+
+    def map(self, fn, items):
+        """[fn(item) for item in items], run on the thread pool; exceptions are raised in order."""
+        items = list(items)
+        if len(items) <= 1:
+            return [fn(item) for item in items]
+        return list(self.executor.map(fn, items))
+
+
+ncbi_client = NCBIClient()
+
+
+def _get_json(url, params):
+    """GET an E-utilities URL and return the decoded JSON (the only place that talks to NCBI)."""
+    return ncbi_client.get_json(url, params)
+
+
+def search_term(identifier):
+    """esearch term for a FlyBase ID or a gene symbol (see fetch_gene_info())."""
+    if identifier.startswith("FBgn"):
         # Search dbXrefs first, much more accurate than synonym search
-        term = (
+        return (
             f"{identifier}[Gene ID] OR "
             f"{identifier}[All Fields] AND Drosophila melanogaster[Organism]"
         )
-    else:
-        # If it's a gene *name*, search only the symbol field (NOT synonyms!)
-        term = (
-            f"{identifier}[Gene Name] AND "
-            f"Drosophila melanogaster[Organism]"
-        )
+    # If it's a gene *name*, search only the symbol field (NOT synonyms!)
+    return (
+        f"{identifier}[Gene Name] AND "
+        f"Drosophila melanogaster[Organism]"
+    )
+
 
+def gene_location(gene_data, identifier=None):
+    """(chromosome, midpoint in bp) of an esummary gene record; ValueError if NCBI
+    gives it no genomic coordinates (e.g. genes known only from a map position)."""
+    genomicinfo = gene_data.get("genomicinfo") or []
+    if not genomicinfo:
+        name = identifier if identifier is not None else gene_data.get("name")
+        raise ValueError(f"NCBI has no genomic coordinates for gene ID {gene_data.get('uid')} ('{name}').")
+    chromosome = gene_data["chromosome"]
+    start = int(genomicinfo[0]["chrstart"])
+    end = int(genomicinfo[0]["chrstop"])
+    midpoint = (start + end) / 2
+    return chromosome, midpoint
+
+
+def search_gene_id(identifier):
+    """The NCBI UID of `identifier` (one esearch); ValueError if there is no hit or more than one."""
     params = {
         "db": DB,
-        "term": term,
+        "term": search_term(identifier),
         "retmode": "json"
     }
-
-    resp = requests.get(NCBI_BASE_URL, params=params)
-    resp.raise_for_status()
-    search_data = resp.json()
+    search_data = _get_json(NCBI_BASE_URL, params)
 
     id_list = search_data.get("esearchresult", {}).get("idlist", [])
 
-    # --- 3. Handle search results safely ---
     if len(id_list) == 0:
         raise ValueError(f"No NCBI gene found for identifier: {identifier}")
 
@@ -67,38 +319,483 @@ def fetch_gene_info(identifier):
             "Please supply a FlyBase ID (FBgnxxxxx)."
         )
 
-    gene_id = id_list[0]
+    return id_list[0]
+
 
-    # --- 4. Fetch the gene summary ---
-    summary_params = {"db": DB, "id": gene_id, "retmode": "json"}
-    summary_resp = requests.get(NCBI_SUMMARY_URL, params=summary_params)
-    summary_resp.raise_for_status()
-    summary_data = summary_resp.json()
+def summary_record(summary_data, uid):
+    """The esummary record of `uid`, or None if NCBI left it out or reported an error
+    for it (withdrawn or replaced records)."""
+    gene_data = summary_data.get("result", {}).get(uid)
+    if not isinstance(gene_data, dict) or "error" in gene_data:
+        return None
+    return gene_data
 
-    gene_data = summary_data["result"][gene_id]
 
-    # --- 5. Save JSON locally (optional) ---
-    os.makedirs("ncbi_downloads", exist_ok=True)
-    filepath = f"ncbi_downloads/{identifier}.json"
-    with open(filepath, "w") as f:
+def _missing_summary(identifier, uid):
+    return f"NCBI returned no summary for gene ID {uid} ('{identifier}'); it may have been withdrawn or replaced."
+
+
+def _save_gene(identifier, gene_data, cache):
+    if cache:
+        cache.store(identifier, gene_data)
+        return
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    with open(os.path.join(CACHE_DIR, f"{identifier}.json"), "w") as f:
         json.dump(gene_data, f, indent=4)
 
-    chromosome = gene_data["chromosome"]
-    start = int(gene_data["genomicinfo"][0]["chrstart"])
-    end = int(gene_data["genomicinfo"][0]["chrstop"])
-    midpoint = (start + end) / 2
 
-    return chromosome, midpoint
+def fetch_gene_info(identifier, cache=None):
+    """
+    Fetch gene info from NCBI, supporting either:
+      - FlyBase IDs (FBgnxxxxx)
+      - Gene symbols (e.g., 'eve')
+    
+    Behavior:
+      - FlyBase IDs: searched explicitly in dbXrefs and synonyms, forced to unique match.
+      - Gene names: searched in official symbol field; ambiguous hits raise an error.
+
+    Genes already looked up are served from `cache` (default: `gene_cache`, see
+    GeneCache); pass cache=False to always query NCBI. After load_annotation(),
+    genes are resolved from the local annotation instead and NCBI is not used.
+    """
+    if offline_annotation is not None:
+        return offline_annotation.location(identifier)
+    cache = gene_cache if cache is None else cache
+
+    # --- 1. Serve repeat lookups locally ---
+    if cache:
+        gene_data = cache.lookup(identifier)
+        if gene_data is not None:
+            return gene_location(gene_data, identifier)
+
+    # --- 2. Search for the gene (no hit or several hits raise ValueError) ---
+    gene_id = search_gene_id(identifier)
+
+    # --- 3. Fetch the gene summary (unless another identifier already cached it) ---
+    gene_data = cache.get_uid(gene_id) if cache else None
+    if gene_data is None:
+        summary_params = {"db": DB, "id": gene_id, "retmode": "json"}
+        summary_data = _get_json(NCBI_SUMMARY_URL, summary_params)
+        gene_data = summary_record(summary_data, gene_id)
+        if gene_data is None:
+            raise ValueError(_missing_summary(identifier, gene_id))
+
+    # --- 4. Save JSON locally and index it ---
+    _save_gene(identifier, gene_data, cache)
+
+    return gene_location(gene_data, identifier)
+
+
+def fetch_genes_bulk(identifiers, cache=None, batch_size=ESUMMARY_BATCH):
+    """
+    Look up many genes at once; returns {identifier: (chromosome, midpoint)}.
+
+    Cached genes need no request. Every other identifier still needs its own
+    esearch, because the ambiguity check needs each identifier's own hit list.
+    The summaries of all of them are then fetched with one esummary request per
+    `batch_size` UIDs instead of one request per gene. Requests go through the
+    shared rate limiter. Unknown and ambiguous identifiers, genes whose summary
+    NCBI leaves out and genes without genomic coordinates are reported together
+    in one ValueError, after the others have been fetched and saved.
+    After load_annotation(), the local annotation answers instead.
+    """
+    if offline_annotation is not None:
+        return offline_annotation.table(identifiers)
+    cache = gene_cache if cache is None else cache
+    records = {}
+    pending = {}  # identifier -> _cache_key, so 'eve' and 'EVE' are searched once
+    for identifier in dict.fromkeys(identifiers):
+        gene_data = cache.lookup(identifier) if cache else None
+        if gene_data is not None:
+            records[identifier] = gene_data
+        else:
+            pending[identifier] = _cache_key(identifier)
+
+    def search(identifier):
+        try:
+            return search_gene_id(identifier), None
+        except ValueError as e:
+            return None, str(e)
+
+    first = {}
+    for identifier, key in pending.items():
+        first.setdefault(key, identifier)
+    searched = dict(zip(first, ncbi_client.map(search, first.values())))
+    errors = [error for _, error in searched.values() if error]
+    uids = {identifier: searched[key][0] for identifier, key in pending.items() if searched[key][0] is not None}
+
+    summaries = {}
+    for uid in dict.fromkeys(uids.values()):
+        gene_data = cache.get_uid(uid) if cache else None
+        if gene_data is not None:
+            summaries[uid] = gene_data
+    missing = [uid for uid in dict.fromkeys(uids.values()) if uid not in summaries]
+    batches = [missing[i:i + batch_size] for i in range(0, len(missing), batch_size)]
+    summary = lambda batch: _get_json(NCBI_SUMMARY_URL, {"db": DB, "id": ",".join(batch), "retmode": "json"})
+    for batch, summary_data in zip(batches, ncbi_client.map(summary, batches)):
+        for uid in batch:
+            gene_data = summary_record(summary_data, uid)
+            if gene_data is not None:
+                summaries[uid] = gene_data
+
+    for identifier, uid in uids.items():
+        if uid not in summaries:
+            errors.append(_missing_summary(identifier, uid))
+            continue
+        _save_gene(identifier, summaries[uid], cache)
+        records[identifier] = summaries[uid]
+
+    locations = {}
+    for identifier, gene_data in records.items():
+        try:
+            locations[identifier] = gene_location(gene_data, identifier)
+        except ValueError as e:
+            errors.append(str(e))
+
+    if errors:
+        raise ValueError("\n".join(errors))
+    return locations
+
+
+# --- Offline gene annotation (GFF/GTF/tab file) ---
+
+ANNOTATION_MAGIC = b"FLYIDX1\n"
+ANNOTATION_CACHE_VERSION = 1
+
+
+def _open_text(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt")
+    return open(path)
+
+
+def _arm_name(seqid):
+    # UCSC-style 'chr2L' -> '2L', as NCBI reports it
+    return seqid[3:] if seqid.startswith("chr") else seqid
+
+
+def _read_gff(path):
+    """(FBgn, symbol, synonyms, chromosome, start, stop) of each gene feature of a GFF3 file."""
+    with _open_text(path) as f:
+        for line in f:
+            if line.startswith("#"):
+                if line.startswith("##FASTA"):
+                    break
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 9 or not fields[2].endswith("gene"):
+                continue
+            attrs = dict(part.split("=", 1) for part in fields[8].split(";") if "=" in part)
+            gene_id = unquote(attrs.get("ID", ""))
+            if not gene_id:
+                continue
+            synonyms = [unquote(a) for a in attrs.get("Alias", "").split(",") if a]
+            symbol = unquote(attrs.get("Name", gene_id))
+            yield gene_id, symbol, synonyms, _arm_name(fields[0]), int(fields[3]), int(fields[4])
+
+
+def _read_gtf(path):
+    """Genes of a GTF file; a gene spans all rows with its gene_id (many GTFs have no 'gene' rows)."""
+    genes = {}
+    with _open_text(path) as f:
+        for line in f:
+            if line.startswith("#"):
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 9:
+                continue
+            attrs = dict(re.findall(r'(\S+) "([^"]*)"', fields[8]))
+            gene_id = attrs.get("gene_id")
+            if not gene_id:
+                continue
+            start, stop = int(fields[3]), int(fields[4])
+            gene = genes.get(gene_id)
+            if gene is None:
+                symbol = attrs.get("gene_symbol") or attrs.get("gene_name") or gene_id
+                genes[gene_id] = [gene_id, symbol, [], _arm_name(fields[0]), start, stop]
+            else:
+                gene[4] = min(gene[4], start)
+                gene[5] = max(gene[5], stop)
+    return [tuple(g) for g in genes.values()]
+
+
+def _read_tab(path):
+    """Genes of a tab-separated file: FBgn, symbol, synonyms (comma-separated), chromosome, start, stop."""
+    with _open_text(path) as f:
+        for line in f:
+            if line.startswith("#") or not line.strip():
+                continue
+            fields = line.rstrip("\n").split("\t")
+            if len(fields) < 6 or not fields[4].strip().isdigit():
+                continue  # header row
+            synonyms = [s.strip() for s in fields[2].split(",") if s.strip()]
+            yield fields[0].strip(), fields[1].strip(), synonyms, _arm_name(fields[3].strip()), int(fields[4]), int(fields[5])
+
+
+def _annotation_reader(path):
+    name = path[:-3] if path.endswith(".gz") else path
+    if name.endswith((".gff", ".gff3")):
+        return _read_gff
+    if name.endswith(".gtf"):
+        return _read_gtf
+    return _read_tab
+
+
+class GeneAnnotation:
+    """
+    Gene coordinates from a local annotation file, to resolve identifiers with no network.
+
+      - hash maps from FlyBase IDs (including secondary FBgn IDs listed as
+        synonyms) and from lower-cased symbols to gene positions
+      - genes sorted by (chromosome, start), so each arm is one contiguous run
+        of the `starts`/`stops` arrays
+
+    Identifiers resolve like fetch_gene_info(): FBgn IDs must match one gene,
+    symbols are matched case-insensitively against official symbols only (not
+    synonyms) and a symbol shared by several genes raises ValueError.
+
+    load() keeps a binary cache next to the annotation (`<file>.idx`): a JSON
+    header with the IDs, symbols and arms, then the coordinates as raw int64
+    arrays that are memory-mapped instead of parsed. close() (or a `with`
+    block) unmaps them; the annotation can't be used after that.
+    """
+
+    def __init__(self, fbgn, symbols, chromosomes, starts, stops, secondary=None):
+        self.fbgn = fbgn
+        self.symbols = symbols
+        self.chromosomes = chromosomes
+        self.starts = starts
+        self.stops = stops
+        self.secondary = secondary or {}
+        self.from_cache = False
+        self._mmap = None
+        self._views = []  # memoryviews into _mmap, released before it is closed
+
+        self.by_id = {gene_id: i for i, gene_id in enumerate(fbgn)}
+        for old_id, gene_id in self.secondary.items():
+            self.by_id.setdefault(old_id, self.by_id[gene_id])
+        self.by_symbol = {}
+        for i, symbol in enumerate(symbols):
+            self.by_symbol.setdefault(symbol.casefold(), []).append(i)
+        # arm -> (first, end) positions in the sorted arrays, and its longest gene
+        self.arms = {}
+        self._longest = {}
+        for i, arm in enumerate(chromosomes):
+            first, _ = self.arms.get(arm, (i, i))
+            self.arms[arm] = (first, i + 1)
+            self._longest[arm] = max(self._longest.get(arm, 0), stops[i] - starts[i])
+
+    @classmethod
+    def from_records(cls, records):
+        """Build from (FBgn, symbol, synonyms, chromosome, start, stop) tuples."""
+        records = sorted(records, key=lambda r: (r[3], min(r[4], r[5])))
+        primary = {r[0] for r in records}
+        secondary = {}
+        for r in records:
+            for synonym in r[2]:
+                if synonym.startswith("FBgn") and synonym not in primary:
+                    secondary.setdefault(synonym, r[0])
+        return cls(
+            [r[0] for r in records],
+            [r[1] for r in records],
+            [r[3] for r in records],
+            array("q", [min(r[4], r[5]) for r in records]),
+            array("q", [max(r[4], r[5]) for r in records]),
+            secondary,
+        )
+
+    @classmethod
+    def load(cls, path, use_cache=True):
+        """Read a GFF3/GTF/tab annotation (optionally gzipped), through the `<path>.idx` cache while `path` is unchanged."""
+        stat = os.stat(path)
+        source = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+        cache_path = f"{path}.idx"
+        if use_cache:
+            try:
+                annotation = cls._read_cache(cache_path, source)
+                if annotation is not None:
+                    return annotation
+            except (OSError, ValueError, KeyError, TypeError, IndexError, struct.error):
+                # truncated or corrupt cache: rebuild it from the annotation file
+                pass
+        annotation = cls.from_records(_annotation_reader(path)(path))
+        if use_cache:
+            try:
+                annotation._write_cache(cache_path, source)
+            except OSError:
+                pass
+        return annotation
+
+    def _write_cache(self, cache_path, source):
+        header = json.dumps({
+            "version": ANNOTATION_CACHE_VERSION,
+            "source": source,
+            "fbgn": self.fbgn,
+            "symbols": self.symbols,
+            "chromosomes": self.chromosomes,
+            "secondary": self.secondary,
+        }).encode()
+        header += b" " * (-len(header) % 8)  # keep the int64 arrays 8-byte aligned
+        tmp = cache_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(ANNOTATION_MAGIC)
+            f.write(struct.pack("<Q", len(header)))
+            f.write(header)
+            f.write(array("q", self.starts).tobytes())
+            f.write(array("q", self.stops).tobytes())
+        os.replace(tmp, cache_path)
+
+    @classmethod
+    def _read_cache(cls, cache_path, source):
+        with open(cache_path, "rb") as f:
+            if f.read(len(ANNOTATION_MAGIC)) != ANNOTATION_MAGIC:
+                return None
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            annotation = cls._from_mapped_cache(mm, source)
+        except BaseException:
+            mm.close()
+            raise
+        if annotation is None:
+            mm.close()
+        return annotation
+
+    @classmethod
+    def _from_mapped_cache(cls, mm, source):
+        # validate everything before creating any memoryview, so a bad file
+        # leaves nothing that keeps the mapping open
+        offset = len(ANNOTATION_MAGIC) + 8
+        (header_len,) = struct.unpack_from("<Q", mm, len(ANNOTATION_MAGIC))
+        header = json.loads(mm[offset:offset + header_len])
+        if header["version"] != ANNOTATION_CACHE_VERSION or header["source"] != source:
+            return None
+        n = len(header["fbgn"])
+        offset += header_len
+        if (
+            offset % 8 or len(mm) != offset + 16 * n
+            or not len(header["symbols"]) == len(header["chromosomes"]) == n
+            or not isinstance(header["secondary"], dict)
+        ):
+            raise ValueError(f"corrupt annotation cache ({len(mm)} bytes, {n} genes)")
+        coords = memoryview(mm)[offset:].cast("q")
+        if sys.byteorder != "little":
+            coords = array("q", coords)
+            coords.byteswap()
+        views = [coords[:n], coords[n:], coords]
+        try:
+            annotation = cls(header["fbgn"], header["symbols"], header["chromosomes"], views[0], views[1], header["secondary"])
+        except Exception:
+            for view in views:
+                if isinstance(view, memoryview):
+                    view.release()
+            raise
+        annotation.from_cache = True
+        if isinstance(coords, memoryview):
+            annotation._mmap = mm
+            annotation._views = views
+        else:
+            mm.close()
+        return annotation
+
+    def close(self):
+        """Unmap the `.idx` cache this annotation was read from (no-op if it was parsed)."""
+        for view in self._views:
+            view.release()
+        self._views = []
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.fbgn)
+
+    def resolve(self, identifier):
+        """Position of `identifier` in the arrays; ValueError if it is unknown or ambiguous."""
+        identifier = identifier.strip()
+        if identifier.startswith("FBgn"):
+            hits = [self.by_id[identifier]] if identifier in self.by_id else []
+        else:
+            hits = self.by_symbol.get(identifier.casefold(), [])
+        if len(hits) == 0:
+            raise ValueError(f"No annotated gene found for identifier: {identifier}")
+        if len(hits) > 1:
+            raise ValueError(
+                f"Ambiguous gene name '{identifier}'. Candidates: {[self.fbgn[i] for i in hits]}. "
+                "Please supply a FlyBase ID (FBgnxxxxx)."
+            )
+        return hits[0]
+
+    def location(self, identifier):
+        """(chromosome, midpoint) like fetch_gene_info()."""
+        i = self.resolve(identifier)
+        return self.chromosomes[i], (self.starts[i] + self.stops[i]) / 2
+
+    def table(self, identifiers):
+        """{identifier: (chromosome, midpoint)} like fetch_genes_bulk(), with every bad identifier in one ValueError."""
+        genes = {}
+        errors = []
+        for identifier in dict.fromkeys(identifiers):
+            try:
+                genes[identifier] = self.location(identifier)
+            except ValueError as e:
+                errors.append(str(e))
+        if errors:
+            raise ValueError("\n".join(errors))
+        return genes
+
+    def genes_in_region(self, chromosome, start, stop):
+        """FlyBase IDs of the genes on `chromosome` overlapping [start, stop], by binary search on the arm."""
+        if chromosome not in self.arms:
+            return []
+        first, end = self.arms[chromosome]
+        lo = bisect_left(self.starts, start - self._longest[chromosome], first, end)
+        hi = bisect_right(self.starts, stop, first, end)
+        return [self.fbgn[i] for i in range(lo, hi) if self.stops[i] >= start]
+
+
+offline_annotation = None
+
+
+def load_annotation(path, use_cache=True):
+    """
+    Load a local annotation (see GeneAnnotation) and resolve every later
+    fetch_gene_info()/fetch_genes_bulk() call from it, with no network,
+    until unload_annotation(). An annotation loaded before is closed.
+    """
+    global offline_annotation
+    annotation = GeneAnnotation.load(path, use_cache)
+    unload_annotation()
+    offline_annotation = annotation
+    return offline_annotation
+
+
+def unload_annotation():
+    """Go back to NCBI (and the gene cache) for lookups, and close the loaded annotation."""
+    global offline_annotation
+    annotation, offline_annotation = offline_annotation, None
+    if annotation is not None:
+        annotation.close()
+
 
 def check_centromere(chromosome, position):
     arm = chromosome.upper()
     threshold = CENTROMERE_REGIONS.get(arm)
     return threshold and position <= threshold
 
-def compute_genetic_distance(id1, id2):
-    """Return a dictionary with distance, recombination rate, warnings."""
-    chr1, pos1 = fetch_gene_info(id1)
-    chr2, pos2 = fetch_gene_info(id2)
+def compute_genetic_distance(id1, id2, genes=None):
+    """Return a dictionary with distance, recombination rate, warnings.
+
+    `genes` is an optional {identifier: (chromosome, midpoint)} table (see
+    fetch_genes_bulk()) to look the genes up in instead of fetching them.
+    """
+    chr1, pos1 = genes[id1] if genes else fetch_gene_info(id1)
+    chr2, pos2 = genes[id2] if genes else fetch_gene_info(id2)
 
     result = {
         "same_chromosome": chr1 == chr2,
@@ -129,3 +826,94 @@ def compute_genetic_distance(id1, id2):
     })
 
     return result
+
+
+def compute_pairwise_distances(pairs):
+    """compute_genetic_distance() for every (id1, id2) in `pairs`, fetching each gene once with fetch_genes_bulk()."""
+    pairs = list(pairs)
+    genes = fetch_genes_bulk([gene for pair in pairs for gene in pair])
+    return [compute_genetic_distance(id1, id2, genes) for id1, id2 in pairs]
+
+
+def compute_distance_matrix(genes, cache=None):
+    """
+    All-pairs version of compute_genetic_distance() for a gene panel.
+
+    `genes` is a list of identifiers (fetched once each with fetch_genes_bulk())
+    or an {identifier: (chromosome, midpoint)} table. Returns a dict of NumPy
+    arrays over the genes in the given order:
+      - "genes", "chromosomes", "positions" and "near_centromere" (per gene)
+      - "same_chromosome", "distance_bp", "distance_cM", "recomb_rate" and
+        "centromere_warning" (n x n; distances are NaN and the rate 0.5 for
+        genes on different arms, as in compute_genetic_distance())
+    """
+    import numpy as np
+
+    table = genes if isinstance(genes, dict) else fetch_genes_bulk(genes, cache)
+    names = list(table)
+    chromosomes = np.array([table[g][0] for g in names], dtype=str)
+    positions = np.array([table[g][1] for g in names], dtype=float)
+
+    # compare small integer arm codes instead of strings
+    _, arm = np.unique(chromosomes, return_inverse=True)
+    same = arm[:, None] == arm[None, :]
+    threshold = np.array([CENTROMERE_REGIONS.get(c.upper(), np.nan) for c in chromosomes])
+    near = positions <= threshold  # NaN threshold (arm not listed) compares False
+
+    distance_bp = np.where(same, np.abs(positions[:, None] - positions[None, :]), np.nan)
+    distance_cM = distance_bp / BP_PER_CM
+    recomb_rate = np.where(same, np.minimum(distance_cM / 100, 0.5), 0.5)
+
+    return {
+        "genes": np.array(names, dtype=str),
+        "chromosomes": chromosomes,
+        "positions": positions,
+        "near_centromere": near,
+        "same_chromosome": same,
+        "distance_bp": distance_bp,
+        "distance_cM": distance_cM,
+        "recomb_rate": recomb_rate,
+        "centromere_warning": same & (near[:, None] | near[None, :]),
+    }
+
+
+def save_distance_matrix(matrix, path):
+    """
+    Write a compute_distance_matrix() result to `path`:
+      - `.npz`: every array, compressed (load with numpy.load)
+      - `.csv`: one row per gene pair (upper triangle, without the diagonal)
+    """
+    import numpy as np
+
+    if path.endswith(".npz"):
+        np.savez_compressed(path, **matrix)
+        return path
+
+    genes = matrix["genes"]
+    chromosomes = matrix["chromosomes"]
+    i, j = np.triu_indices(len(genes), k=1)
+    columns = [
+        genes[i], genes[j], chromosomes[i], chromosomes[j],
+        matrix["distance_bp"][i, j], matrix["distance_cM"][i, j],
+        matrix["recomb_rate"][i, j], matrix["centromere_warning"][i, j],
+    ]
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["gene1", "gene2", "chromosome1", "chromosome2",
+                         "distance_bp", "distance_cM", "recomb_rate", "centromere_warning"])
+        writer.writerows(zip(*(col.tolist() for col in columns)))
+    return path
+
+
+# --- asyncio API ---
+
+async def fetch_gene_info_async(identifier, cache=None):
+    """fetch_gene_info() on the shared NCBI client's thread pool, for use from asyncio code."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(ncbi_client.executor, fetch_gene_info, identifier, cache)
+
+
+async def compute_genetic_distance_async(id1, id2):
+    """compute_genetic_distance() with both genes looked up concurrently."""
+    loc1, loc2 = await asyncio.gather(fetch_gene_info_async(id1), fetch_gene_info_async(id2))
+    return compute_genetic_distance(id1, id2, {id1: loc1, id2: loc2})
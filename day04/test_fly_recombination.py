@@ -0,0 +1,491 @@
+# test_fly_recombination.py
+
+import asyncio
+import json
+import shutil
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+pytest.importorskip("requests")
+
+import FlyRecombination_BL as fly
+from FlyRecombination_BL import GeneCache, fetch_gene_info
+
+DOWNLOADS = Path(__file__).resolve().parent.parent / "ncbi_downloads"
+
+
+def gene_record(uid, chromosome, start, stop, name="gene"):
+    return {
+        "uid": uid,
+        "name": name,
+        "chromosome": chromosome,
+        "genomicinfo": [{"chrloc": chromosome, "chrstart": start, "chrstop": stop}],
+    }
+
+
+class FakeNCBI:
+    """Stands in for `_get_json`: answers esearch/esummary from dicts and records every call."""
+
+    def __init__(self, search=None, records=None):
+        self.search = search or {}
+        self.records = records or {}
+        self.calls = []
+
+    def __call__(self, url, params):
+        self.calls.append((url, params))
+        if url == fly.NCBI_BASE_URL:
+            symbol = params["term"].split("[")[0]
+            return {"esearchresult": {"idlist": self.search.get(symbol, [])}}
+        # like NCBI, leave out UIDs it has no summary for
+        return {"result": {uid: self.records[uid] for uid in params["id"].split(",") if uid in self.records}}
+
+
+@pytest.fixture
+def downloads(tmp_path):
+    target = tmp_path / "ncbi_downloads"
+    shutil.copytree(DOWNLOADS, target, ignore=shutil.ignore_patterns("index.json"))
+    return target
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    def no_network(url, params):
+        raise AssertionError(f"unexpected NCBI request: {params}")
+    monkeypatch.setattr(fly, "_get_json", no_network)
+
+
+# -----------------------------
+# Tests for the read-through gene cache
+# -----------------------------
+
+def test_downloaded_genes_are_served_without_http(downloads, offline):
+    cache = GeneCache(str(downloads))
+    white = json.loads((downloads / "white.json").read_text())
+    expected = fly.gene_location(white)
+    assert fetch_gene_info("white", cache) == expected
+    assert fetch_gene_info("White", cache) == expected
+    assert cache.get_uid(white["uid"]) is cache.lookup("white")
+
+def test_miss_is_fetched_once_then_indexed(downloads, monkeypatch):
+    ncbi = FakeNCBI({"eve": ["36302"], "FBgn0000606": ["36302"]}, {"36302": gene_record("36302", "2R", 9980000, 9982000)})
+    monkeypatch.setattr(fly, "_get_json", ncbi)
+    cache = GeneCache(str(downloads))
+
+    assert fetch_gene_info("eve", cache) == ("2R", 9981000)
+    assert len(ncbi.calls) == 2
+    assert fetch_gene_info("EVE", cache) == ("2R", 9981000)
+    assert len(ncbi.calls) == 2
+
+    # another identifier of the same gene only needs the search
+    assert fetch_gene_info("FBgn0000606", cache) == ("2R", 9981000)
+    assert [url for url, _ in ncbi.calls] == [fly.NCBI_BASE_URL, fly.NCBI_SUMMARY_URL, fly.NCBI_BASE_URL]
+
+    index = json.loads((downloads / "index.json").read_text())
+    assert index["aliases"]["eve"] == index["aliases"]["fbgn0000606"] == "36302"
+    # a fresh process finds it through the index
+    assert GeneCache(str(downloads)).lookup("eve")["chromosome"] == "2R"
+
+def test_expired_records_are_fetched_again(downloads, monkeypatch):
+    ncbi = FakeNCBI({"white": ["31271"]}, {"31271": gene_record("31271", "X", 100, 300)})
+    monkeypatch.setattr(fly, "_get_json", ncbi)
+    assert fetch_gene_info("white", GeneCache(str(downloads), ttl=0)) == ("X", 200)
+    assert len(ncbi.calls) == 2
+
+def test_ambiguous_names_are_not_cached(downloads, monkeypatch):
+    monkeypatch.setattr(fly, "_get_json", FakeNCBI({"cad": ["1", "2"]}))
+    cache = GeneCache(str(downloads))
+    with pytest.raises(ValueError, match="Ambiguous"):
+        fetch_gene_info("cad", cache)
+    assert cache.lookup("cad") is None
+    assert not (downloads / "cad.json").exists()
+
+def test_lru_keeps_only_maxsize_records(downloads, offline):
+    cache = GeneCache(str(downloads), maxsize=1)
+    fetch_gene_info("white", cache)
+    fetch_gene_info("dpr12", cache)
+    assert list(cache._records) == [cache.index["aliases"]["dpr12"]]
+    assert fetch_gene_info("white", cache)[0] == "X"
+
+def test_genes_without_coordinates_are_reported(downloads, monkeypatch):
+    # 82b.json is an esummary record with "genomicinfo": []
+    monkeypatch.setattr(fly, "_get_json", FakeNCBI())
+    cache = GeneCache(str(downloads))
+    with pytest.raises(ValueError, match=r"no genomic coordinates for gene ID 247844 \('82b'\)"):
+        fetch_gene_info("82b", cache)
+    with pytest.raises(ValueError) as excinfo:
+        fly.fetch_genes_bulk(["white", "82b", "nosuchgene"], cache)
+    assert str(excinfo.value).splitlines() == [
+        "No NCBI gene found for identifier: nosuchgene",
+        "NCBI has no genomic coordinates for gene ID 247844 ('82b').",
+    ]
+    with pytest.raises(ValueError, match="'82b'"):
+        fly.compute_distance_matrix(["white", "82b"], cache)
+
+
+# -----------------------------
+# Tests for batched lookups, against a local stand-in for NCBI
+# -----------------------------
+
+class NCBIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep connections alive, like NCBI
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        query = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.server.requests.append((url.path, query))
+        self.server.ports.add(self.client_address[1])
+        if self.server.failures:
+            self.send_response(self.server.failures.pop(0))
+            self.send_header("Retry-After", "0")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        time.sleep(self.server.delay)
+        if url.path.endswith("esearch.fcgi"):
+            symbol = query["term"].split("[")[0]
+            body = {"esearchresult": {"idlist": self.server.search.get(symbol, [])}}
+        else:
+            ids = query["id"].split(",")
+            body = {"result": {uid: self.server.records[uid] for uid in ids if uid in self.server.records}}
+        data = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def ncbi_server(monkeypatch):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), NCBIHandler)
+    server.search = {
+        "eve": ["36302"],
+        "ftz": ["40834"],
+        "Antp": ["40835"],
+        "cad": ["35165", "41364"],
+        "Ubx": ["42034"],
+        "hb": ["40076"],
+        "Kr": ["34940"],
+        "oldgene": ["99999"],  # withdrawn: esummary has no record for it
+    }
+    server.records = {
+        "36302": gene_record("36302", "2R", 9980000, 9982000, "eve"),
+        "40834": gene_record("40834", "3R", 6860000, 6862000, "ftz"),
+        "40835": gene_record("40835", "3R", 6900000, 7000000, "Antp"),
+        "42034": gene_record("42034", "3R", 16700000, 16800000, "Ubx"),
+        "40076": gene_record("40076", "3R", 8690000, 8700000, "hb"),
+        "34940": gene_record("34940", "2R", 25200000, 25210000, "Kr"),
+    }
+    server.requests = []
+    server.ports = set()
+    server.failures = []
+    server.delay = 0
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setattr(fly, "NCBI_BASE_URL", base + "/esearch.fcgi")
+    monkeypatch.setattr(fly, "NCBI_SUMMARY_URL", base + "/esummary.fcgi")
+    monkeypatch.setattr(fly, "ncbi_limiter", fly.RateLimiter(1000))
+    client = fly.NCBIClient(backoff=0.01)
+    monkeypatch.setattr(fly, "ncbi_client", client)
+    yield server
+    client.session.close()
+    if client._executor is not None:
+        client._executor.shutdown()
+    server.shutdown()
+    server.server_close()
+
+
+def summary_requests(server):
+    return [q["id"] for path, q in server.requests if path.endswith("esummary.fcgi")]
+
+
+def test_bulk_lookup_uses_one_esummary_per_batch(downloads, ncbi_server):
+    cache = GeneCache(str(downloads))
+    genes = fly.fetch_genes_bulk(["eve", "ftz", "EVE", "white", "Antp"], cache)
+    assert genes["eve"] == genes["EVE"] == ("2R", 9981000)
+    assert genes["white"][0] == "X"
+    assert summary_requests(ncbi_server) == ["36302,40834,40835"]
+    # eve/EVE are searched once, white comes from the cache
+    assert len(ncbi_server.requests) == 4
+    assert cache.lookup("ftz")["uid"] == "40834"
+
+def test_bulk_lookup_splits_batches(downloads, ncbi_server):
+    fly.fetch_genes_bulk(["eve", "ftz", "Antp"], GeneCache(str(downloads)), batch_size=2)
+    assert sorted(summary_requests(ncbi_server)) == ["36302,40834", "40835"]
+
+def test_bulk_lookup_reports_every_bad_identifier(downloads, ncbi_server):
+    cache = GeneCache(str(downloads))
+    with pytest.raises(ValueError) as excinfo:
+        fly.fetch_genes_bulk(["cad", "eve", "nosuchgene"], cache)
+    assert "Ambiguous gene name 'cad'" in str(excinfo.value)
+    assert "nosuchgene" in str(excinfo.value)
+    assert cache.lookup("eve") is not None
+
+def test_bulk_lookup_reports_uids_missing_from_esummary(downloads, ncbi_server):
+    cache = GeneCache(str(downloads))
+    with pytest.raises(ValueError, match=r"no summary for gene ID 99999 \('oldgene'\)"):
+        fly.fetch_genes_bulk(["oldgene", "ftz"], cache)
+    assert cache.lookup("ftz")["uid"] == "40834"
+    assert cache.lookup("oldgene") is None
+
+def test_single_lookup_reports_uid_missing_from_esummary(downloads, ncbi_server):
+    with pytest.raises(ValueError, match="withdrawn or replaced"):
+        fetch_gene_info("oldgene", GeneCache(str(downloads)))
+
+def test_pairwise_distances_match_single_pair_path(downloads, ncbi_server, monkeypatch):
+    monkeypatch.setattr(fly, "gene_cache", GeneCache(str(downloads)))
+    pairs = [("ftz", "Antp"), ("eve", "ftz")]
+    results = fly.compute_pairwise_distances(pairs)
+    assert len(summary_requests(ncbi_server)) == 1
+    assert results == [fly.compute_genetic_distance(a, b) for a, b in pairs]
+    assert results[0]["distance_bp"] == 89000
+    assert results[1]["recomb_rate"] == 0.5
+
+def test_rate_limiter_spaces_requests():
+    limiter = fly.RateLimiter(50)
+    start = time.monotonic()
+    for _ in range(6):
+        limiter.wait()
+    assert time.monotonic() - start >= 5 / 50 - 0.005
+
+
+# -----------------------------
+# Tests for the all-pairs distance matrix
+# -----------------------------
+
+PANEL = {
+    "a": ("2L", 200_000.0),
+    "b": ("2L", 5_200_000.0),
+    "c": ("X", 9_000_000.0),
+    "d": ("2L", 90_000_000.0),
+    "e": ("4", 100.0),
+}
+
+def test_distance_matrix_matches_pairwise_results():
+    np = pytest.importorskip("numpy")
+    matrix = fly.compute_distance_matrix(PANEL)
+    names = list(matrix["genes"])
+    assert names == list(PANEL)
+    for i, a in enumerate(names):
+        for j, b in enumerate(names):
+            pair = fly.compute_genetic_distance(a, b, PANEL)
+            assert matrix["same_chromosome"][i, j] == pair["same_chromosome"]
+            assert matrix["recomb_rate"][i, j] == pytest.approx(pair["recomb_rate"])
+            assert matrix["centromere_warning"][i, j] == bool(pair["warnings"])
+            if pair["same_chromosome"]:
+                assert matrix["distance_bp"][i, j] == pair["distance_bp"]
+                assert matrix["distance_cM"][i, j] == pytest.approx(pair["distance_cM"])
+            else:
+                assert np.isnan(matrix["distance_bp"][i, j])
+    assert list(matrix["near_centromere"]) == [True, False, False, False, False]
+
+def test_distance_matrix_fetches_each_gene_once(downloads, ncbi_server):
+    pytest.importorskip("numpy")
+    matrix = fly.compute_distance_matrix(["eve", "ftz", "Antp", "ftz"], GeneCache(str(downloads)))
+    assert list(matrix["genes"]) == ["eve", "ftz", "Antp"]
+    assert matrix["distance_bp"][1, 2] == 89000
+    assert len(summary_requests(ncbi_server)) == 1
+
+def test_save_distance_matrix_npz_and_csv(tmp_path):
+    np = pytest.importorskip("numpy")
+    matrix = fly.compute_distance_matrix(PANEL)
+    loaded = np.load(fly.save_distance_matrix(matrix, str(tmp_path / "panel.npz")))
+    np.testing.assert_array_equal(loaded["distance_bp"], matrix["distance_bp"])
+    assert list(loaded["genes"]) == list(PANEL)
+
+    lines = Path(fly.save_distance_matrix(matrix, str(tmp_path / "panel.csv"))).read_text().splitlines()
+    assert len(lines) == 1 + 5 * 4 // 2
+    assert lines[1] == "a,b,2L,2L,5000000.0,20.0,0.2,True"
+
+
+# -----------------------------
+# Tests for the offline annotation index
+# -----------------------------
+
+GFF = """##gff-version 3
+2L\tFlyBase\tgene\t2428372\t2459822\t.\t+\t.\tID=FBgn0000490;Name=dpp;Alias=FBgn0011495,BMP
+2L\tFlyBase\tmRNA\t2428372\t2459822\t.\t+\t.\tID=FBtr0000001;Parent=FBgn0000490
+X\tFlyBase\tgene\t2790599\t2796466\t.\t-\t.\tID=FBgn0003996;Name=w;Alias=white
+2R\tFlyBase\tgene\t5804712\t5860830\t.\t+\t.\tID=FBgn0085414;Name=dpr12
+2L\tFlyBase\tgene\t100\t900\t.\t+\t.\tID=FBgn0000251;Name=cad
+3R\tFlyBase\tgene\t5000\t6000\t.\t+\t.\tID=FBgn0004878;Name=Cad
+"""
+
+@pytest.fixture
+def gff(tmp_path):
+    path = tmp_path / "dmel.gff3"
+    path.write_text(GFF)
+    return str(path)
+
+
+def test_annotation_resolves_like_fetch_gene_info(gff):
+    annotation = fly.GeneAnnotation.load(gff)
+    assert annotation.location("FBgn0000490") == ("2L", (2428372 + 2459822) / 2)
+    assert annotation.location("DPP") == annotation.location("FBgn0011495")
+    assert annotation.location("w")[0] == "X"
+    with pytest.raises(ValueError, match="No annotated gene"):
+        annotation.location("white")  # synonyms are not searched, as with NCBI
+    with pytest.raises(ValueError, match=r"Ambiguous gene name 'cad'.*FBgn0000251.*FBgn0004878"):
+        annotation.location("cad")
+
+def test_annotation_cache_is_used_until_file_changes(gff):
+    parsed = fly.GeneAnnotation.load(gff)
+    cached = fly.GeneAnnotation.load(gff)
+    assert not parsed.from_cache and cached.from_cache
+    assert cached.fbgn == parsed.fbgn and list(cached.starts) == list(parsed.starts)
+    assert cached.location("dpr12") == parsed.location("dpr12")
+
+    Path(gff).write_text(GFF + "3L\tFlyBase\tgene\t10\t20\t.\t+\t.\tID=FBgn0000001;Name=new\n")
+    reloaded = fly.GeneAnnotation.load(gff)
+    assert not reloaded.from_cache and reloaded.location("new") == ("3L", 15)
+
+@pytest.mark.parametrize("damage", ["magic only", "mid header", "mid coordinates", "not a dict", "bad lengths"])
+def test_corrupt_annotation_cache_is_rebuilt(gff, damage):
+    fly.GeneAnnotation.load(gff).close()
+    idx = Path(gff + ".idx")
+    data = idx.read_bytes()
+    header_len = int.from_bytes(data[8:16], "little")
+    if damage == "magic only":
+        data = data[:8]
+    elif damage == "mid header":
+        data = data[:16 + header_len // 2]
+    elif damage == "mid coordinates":
+        data = data[:-12]
+    else:
+        header = json.loads(data[16:16 + header_len])
+        if damage == "not a dict":
+            header = [header]
+        else:
+            header["symbols"] = header["symbols"][:-1]
+        encoded = json.dumps(header).encode()
+        encoded += b" " * (-len(encoded) % 8)
+        data = data[:8] + len(encoded).to_bytes(8, "little") + encoded + data[16 + header_len:]
+    idx.write_bytes(data)
+    annotation = fly.GeneAnnotation.load(gff)
+    assert not annotation.from_cache and annotation.location("dpr12")[0] == "2R"
+    with fly.GeneAnnotation.load(gff) as cached:
+        assert cached.from_cache and cached.location("dpr12") == annotation.location("dpr12")
+
+def test_closing_annotation_unmaps_cache(gff):
+    fly.GeneAnnotation.load(gff).close()
+    cached = fly.GeneAnnotation.load(gff)
+    assert cached.from_cache and cached._mmap is not None
+    cached.close()
+    assert cached._mmap is None
+    cached.close()  # closing twice is fine
+    with pytest.raises(ValueError):
+        cached.location("dpr12")
+
+def test_gtf_and_tab_annotations(tmp_path):
+    gtf = tmp_path / "genes.gtf"
+    gtf.write_text(
+        '2L\tFlyBase\texon\t100\t200\t.\t+\t.\tgene_id "FBgn0000490"; gene_symbol "dpp";\n'
+        '2L\tFlyBase\texon\t500\t700\t.\t+\t.\tgene_id "FBgn0000490"; gene_symbol "dpp";\n'
+    )
+    assert fly.GeneAnnotation.load(str(gtf), use_cache=False).location("dpp") == ("2L", 400)
+    tab = tmp_path / "genes.tsv"
+    tab.write_text("#FBgn\tsymbol\tsynonyms\tchromosome\tstart\tstop\nFBgn0003996\tw\tFBgn0000001,white\tchrX\t2790599\t2796466\n")
+    annotation = fly.GeneAnnotation.load(str(tab), use_cache=False)
+    assert annotation.location("FBgn0000001") == annotation.location("w") == ("X", 2793532.5)
+
+def test_genes_in_region_uses_sorted_arm_arrays(gff):
+    annotation = fly.GeneAnnotation.load(gff)
+    assert annotation.genes_in_region("2L", 800, 2430000) == ["FBgn0000251", "FBgn0000490"]
+    assert annotation.genes_in_region("2L", 1000, 2000) == []
+    assert annotation.genes_in_region("4", 1, 10**9) == []
+
+def test_loaded_annotation_replaces_ncbi(gff, offline, monkeypatch):
+    monkeypatch.setattr(fly, "offline_annotation", None)
+    fly.load_annotation(gff)
+    assert fly.fetch_gene_info("dpp") == ("2L", 2444097)
+    assert fly.compute_genetic_distance("dpp", "FBgn0085414")["same_chromosome"] is False
+    with pytest.raises(ValueError, match="cad"):
+        fly.fetch_genes_bulk(["dpp", "cad"])
+
+def test_unload_annotation_goes_back_to_ncbi(gff, downloads, offline, monkeypatch):
+    monkeypatch.setattr(fly, "offline_annotation", None)
+    annotation = fly.load_annotation(gff)
+    with pytest.raises(ValueError, match="No annotated gene"):
+        fly.fetch_gene_info("white", GeneCache(str(downloads)))
+    fly.unload_annotation()
+    assert fly.offline_annotation is None and annotation._mmap is None
+    assert fly.fetch_gene_info("white", GeneCache(str(downloads)))[0] == "X"
+    fly.unload_annotation()  # nothing loaded: no-op
+
+def test_reloading_annotation_closes_the_previous_one(gff, offline, monkeypatch):
+    monkeypatch.setattr(fly, "offline_annotation", None)
+    fly.load_annotation(gff)  # parses and writes the .idx cache
+    mapped = fly.load_annotation(gff)
+    assert mapped._mmap is not None
+    reloaded = fly.load_annotation(gff)
+    assert mapped._mmap is None and fly.offline_annotation is reloaded
+    assert fly.fetch_gene_info("dpp") == ("2L", 2444097)
+    fly.unload_annotation()
+
+
+# -----------------------------
+# Tests for the pooled, rate-limited NCBI client
+# -----------------------------
+
+def test_rate_limiter_allows_a_burst_then_the_rate():
+    limiter = fly.RateLimiter(20, burst=3)
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.wait()
+    assert time.monotonic() - start < 0.04
+    for _ in range(2):
+        limiter.wait()
+    assert time.monotonic() - start >= 2 / 20 - 0.005
+
+def test_client_retries_429_and_5xx(downloads, ncbi_server):
+    ncbi_server.failures = [429, 503]
+    assert fetch_gene_info("eve", GeneCache(str(downloads))) == ("2R", 9981000)
+    assert len(ncbi_server.requests) == 4  # two failed searches, the search, the summary
+
+def test_client_gives_up_after_retries(downloads, ncbi_server, monkeypatch):
+    monkeypatch.setattr(fly.ncbi_client, "retries", 2)
+    ncbi_server.failures = [500] * 5
+    with pytest.raises(fly.requests.HTTPError):
+        fetch_gene_info("eve", GeneCache(str(downloads)))
+    assert len(ncbi_server.requests) == 3
+
+def test_client_reuses_connections(ncbi_server, tmp_path):
+    cache = GeneCache(str(tmp_path))
+    for gene in ("eve", "ftz", "Antp"):
+        fetch_gene_info(gene, cache)
+    assert len(ncbi_server.requests) == 6
+    assert len(ncbi_server.ports) == 1
+
+def test_bulk_searches_run_concurrently(downloads, ncbi_server):
+    ncbi_server.delay = 0.2
+    genes = ["eve", "ftz", "Antp", "Ubx", "hb", "Kr"]
+    start = time.monotonic()
+    table = fly.fetch_genes_bulk(genes, GeneCache(str(downloads)))
+    assert time.monotonic() - start < 0.2 * len(genes)
+    assert list(table) == genes
+
+def test_bulk_throughput_is_set_by_the_rate_limit(downloads, ncbi_server, monkeypatch):
+    monkeypatch.setattr(fly, "ncbi_limiter", fly.RateLimiter(20))
+    start = time.monotonic()
+    fly.fetch_genes_bulk(["eve", "ftz", "Antp", "Ubx", "hb", "Kr"], GeneCache(str(downloads)))
+    # 6 searches + 1 summary, 1/20 s apart
+    assert time.monotonic() - start >= 6 / 20 - 0.01
+
+def test_async_compute_genetic_distance(downloads, ncbi_server, monkeypatch):
+    monkeypatch.setattr(fly, "gene_cache", GeneCache(str(downloads)))
+    ncbi_server.delay = 0.2
+    start = time.monotonic()
+    result = asyncio.run(fly.compute_genetic_distance_async("ftz", "Antp"))
+    # both lookups (search + summary each) overlap
+    assert time.monotonic() - start < 4 * 0.2
+    assert result == fly.compute_genetic_distance("ftz", "Antp")
+    assert result["distance_bp"] == 89000
@@ -3,166 +3,1463 @@ Load the provided dataset and generate distribution plots:
 - distribution by gender (or sex column)
 - distribution by occupation (or job/occupation type column)
 - distributions for all other numeric columns (histogram + boxplot)
+- correlations with age at death, and the work-life balance index per occupation
 
-The script saves plots to a `plots/` directory next to this file.
+The script saves plots (and an `index.html` page listing them) to a `plots/`
+directory next to this file. See `--help` and README.md for the other modes.
 """
 import os
 import re
-import pandas as pd
-import numpy as np
-import seaborn as sns
-import matplotlib.pyplot as plt
+import json
+import html
+import time
+import hashlib
 import argparse
+import importlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from urllib.parse import quote
+
+
+class _LazyModule:
+	"""Stand-in for a module that is imported on first attribute access.
+
+	`before` (if given) runs right before the import.
+	"""
+
+	def __init__(self, name, before=None):
+		self.__dict__.update(_name=name, _before=before, _module=None)
+
+	def _load(self):
+		if self._module is None:
+			if self._before is not None:
+				self._before()
+			self.__dict__['_module'] = importlib.import_module(self._name)
+		return self._module
+
+	def __getattr__(self, attr):
+		return getattr(self._load(), attr)
+
+
+def _use_agg():
+	import matplotlib
+	matplotlib.use('Agg')  # render off-screen; must be selected before seaborn imports pyplot
+
+
+# pandas/numpy/matplotlib/seaborn take over a second to import, so they are only
+# imported by the stages that use them: `--help` and bad arguments need none, and
+# `--no-save` and `--stats-only` runs never import matplotlib or seaborn
+pd = _LazyModule('pandas')
+np = _LazyModule('numpy')
+matplotlib = _LazyModule('matplotlib', before=_use_agg)
+mpl_figure = _LazyModule('matplotlib.figure', before=_use_agg)
+pil_image = _LazyModule('PIL.Image')  # Pillow, a matplotlib dependency
+sns = _LazyModule('seaborn', before=_use_agg)
 
 DATA_PATH = '/Users/netah/Library/CloudStorage/OneDrive-weizmann.ac.il/PhD- personal/courses/python/work life balance-longevity dataset.csv'
 # default plots dir next to script; can be overridden by CLI
 DEFAULT_PLOTS_DIR = os.path.join(os.path.dirname(__file__), 'plots')
 
+# DataFrame the plot jobs read from; set in the parent before the pool starts, so
+# forked workers share it copy-on-write, and by `_init_worker()` in spawned ones
+_SHARED_DF = None
+
+MANIFEST_NAME = '.plot_manifest.json'
+# bump when the plotting code changes so cached PNGs are re-rendered
+CACHE_VERSION = 2
+
 
 def safe_fname(s: str) -> str:
 	return re.sub(r"[^0-9a-zA-Z-_]+", '_', s).strip('_')
 
 
-def find_column(df: pd.DataFrame, keywords):
-	"""Return first column name that matches any keyword (case-insensitive), else None."""
-	cols = df.columns
+def find_column(df, keywords):
+	"""Return first column name that matches any keyword (case-insensitive), else None.
+
+	`df` may also be a list of column names.
+	"""
+	cols = list(getattr(df, 'columns', df))
+	lowered = [str(c).lower() for c in cols]
 	for kw in keywords:
-		for c in cols:
-			if kw.lower() in str(c).lower():
+		kw = kw.lower()
+		for c, low in zip(cols, lowered):
+			if kw in low:
 				return c
 	return None
 
 
+# --- Schema profile: column roles, dtypes and cardinalities, computed once per dataset ---
+
+# keywords per column role, in find_column() priority order
+ROLE_KEYWORDS = {
+	'gender': ['gender', 'sex'],
+	'occupation': ['occupation', 'job', 'occupation type', 'work type'],
+	'target': ['age_at_death', 'age at death', 'age'],
+	'work': ['work', 'work_hours', 'work_hours_per_day', 'avg_work'],
+	'rest': ['rest', 'rest_hours', 'avg_rest'],
+	'sleep': ['sleep', 'sleep_hours', 'avg_sleep'],
+	'exercise': ['exercise', 'exercise_hours', 'avg_exercise'],
+}
+PROFILE_VERSION = 1
+PROFILE_SAMPLE_ROWS = 100_000
+
+
+def detect_roles(columns):
+	"""{role: column or None} for every role in ROLE_KEYWORDS, lower-casing the column names only once."""
+	cols = list(columns)
+	lowered = [str(c).lower() for c in cols]
+	roles = {}
+	for role, keywords in ROLE_KEYWORDS.items():
+		roles[role] = next((c for kw in keywords for c, low in zip(cols, lowered) if kw in low), None)
+	return roles
+
+
+def profile_schema(df, sample_rows=PROFILE_SAMPLE_ROWS, seed=0):
+	"""Profile `df` from one random sample of at most `sample_rows` rows.
+
+	Returns {'columns': [...], 'roles': {...}, 'rows': n}. Each column entry has
+	the dtype, whether it is numeric, the share of sampled values that coerce to
+	numbers, and the number of distinct values in the sample (`nunique_exact` is
+	true when the sample was the whole frame).
+	"""
+	exact = len(df) <= sample_rows
+	sample = df if exact else df.sample(n=sample_rows, random_state=seed)
+	columns = []
+	for c in df.columns:
+		col = sample[c]
+		numeric = bool(pd.api.types.is_numeric_dtype(col))
+		if numeric:
+			coercible = float(col.notna().mean()) if len(col) else 0.0
+		else:
+			coerced = pd.to_numeric(col, errors='coerce')
+			coercible = float(coerced.notna().mean()) if len(col) else 0.0
+		columns.append({
+			'name': c,
+			'dtype': str(df[c].dtype),
+			'numeric': numeric,
+			'categorical': bool(pd.api.types.is_object_dtype(col) or isinstance(col.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(col)) and not numeric,
+			'coercible': coercible,
+			'nunique': int(col.nunique(dropna=False)),
+			'nunique_exact': exact,
+		})
+	return {'version': PROFILE_VERSION, 'rows': len(df), 'columns': columns, 'roles': detect_roles(df.columns)}
+
+
+def load_profile(df, data_path=None, use_cache=True):
+	"""`profile_schema(df)`, cached in `<data_path>.schema.json` while the CSV's size and mtime are unchanged."""
+	if not data_path or not use_cache:
+		return profile_schema(df)
+	path = f'{data_path}.schema.json'
+	stat = os.stat(data_path)
+	source = {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+	try:
+		with open(path, encoding='utf-8') as fh:
+			cached = json.load(fh)
+		if (
+			cached.get('version') == PROFILE_VERSION and cached.get('source') == source
+			and [c['name'] for c in cached['columns']] == list(df.columns)
+		):
+			return cached
+	except (OSError, ValueError, KeyError):
+		pass
+	profile = profile_schema(df)
+	profile['source'] = source
+	try:
+		with open(path, 'w', encoding='utf-8') as fh:
+			json.dump(profile, fh, indent=1)
+	except OSError as e:
+		print(f'Could not write schema profile {path}: {e}')
+	return profile
+
+
+def profile_columns(profile, **flags):
+	"""Names of the profiled columns whose entries match every `flag=value` given."""
+	return [c['name'] for c in profile['columns'] if all(c[k] == v for k, v in flags.items())]
+
+
+def _would_write(out):
+	print('(no-save) would write', out)
+	return out
+
+
+def _save(fig, out, dpi, no_save):
+	fig.tight_layout()
+	if no_save:
+		return _would_write(out)
+	fig.savefig(out, dpi=dpi)
+	return out
+
+
+def plot_filename(kind, *args):
+	"""File name (inside the plots dir) of the plot `kind` drawn with `args`."""
+	if kind == 'categorical':
+		return f'{safe_fname(args[0])}_distribution.png'
+	if kind == 'numeric':
+		return f'{safe_fname(args[0])}_hist.png'
+	if kind == 'correlation':
+		col, target_col = args
+		return f'{safe_fname(col)}_vs_{safe_fname(target_col)}_corr.png'
+	if kind == 'wlb_index':
+		occ, target_col = args[1], args[2]
+		return f'work_life_balance_index_vs_{safe_fname(target_col)}_by_{safe_fname(str(occ))}.png'
+	raise ValueError(f'unknown plot kind: {kind}')
+
+
 def plot_categorical(df, col, plots_dir, dpi=100, no_save=False):
 	if col is None:
 		return None
-	plt.figure(figsize=(8, 5))
+	out = os.path.join(plots_dir, plot_filename('categorical', col))
+	if no_save:
+		return _would_write(out)
+	fig = mpl_figure.Figure(figsize=(8, 5))
+	ax = fig.subplots()
 	order = df[col].value_counts(dropna=False).index
-	sns.countplot(data=df, x=col, order=order)
-	plt.xticks(rotation=45, ha='right')
+	sns.countplot(data=df, x=col, order=order, ax=ax)
+	for label in ax.get_xticklabels():
+		label.set_rotation(45)
+		label.set_ha('right')
 	display = str(col).replace('_', ' ')
-	plt.title(f'Distribution of {display}')
-	plt.tight_layout()
-	out = os.path.join(plots_dir, f'{safe_fname(col)}_distribution.png')
-	if no_save:
-		print('(no-save) would write', out)
-	else:
-		plt.savefig(out, dpi=dpi)
-	plt.close()
-	return out
+	ax.set_title(f'Distribution of {display}')
+	return _save(fig, out, dpi, no_save)
 
 
 def plot_numeric(df, col, plots_dir, dpi=100, no_save=False):
 	if col is None:
 		return None
+	out = os.path.join(plots_dir, plot_filename('numeric', col))
+	if no_save:
+		return _would_write(out)
 	# histogram + kde (no boxplot)
-	plt.figure(figsize=(8, 5))
-	sns.histplot(df[col].dropna(), kde=True)
+	fig = mpl_figure.Figure(figsize=(8, 5))
+	ax = fig.subplots()
+	sns.histplot(df[col].dropna(), kde=True, ax=ax)
 	display = str(col).replace('_', ' ')
-	plt.title(f'Histogram of {display}')
-	plt.xlabel(display)
-	plt.tight_layout()
-	out = os.path.join(plots_dir, f'{safe_fname(col)}_hist.png')
-	if no_save:
-		print('(no-save) would write', out)
-	else:
-		plt.savefig(out, dpi=dpi)
-	plt.close()
-	return out
+	ax.set_title(f'Histogram of {display}')
+	ax.set_xlabel(display)
+	return _save(fig, out, dpi, no_save)
+
 
+def plot_correlation(df, col, target_col, plots_dir, dpi=100, no_save=False, max_points=0, large_mode='hexbin', seed=0):
+	"""Scatter plot with regression line comparing `col` to `target_col` and report Pearson r.
 
-def plot_correlation(df, col, target_col, plots_dir, dpi=100, no_save=False):
-	"""Scatter plot with regression line comparing `col` to `target_col` and report Pearson r."""
+	With more than `max_points` pairs (if set) the points are drawn with
+	`draw_large_scatter()` and the line is the closed-form fit on all of them.
+	"""
 	if col is None or target_col is None:
 		return None
-	x = df[col]
-	y = df[target_col]
 	# Drop NA pairs
 	pair = df[[col, target_col]].dropna()
 	if pair.shape[0] < 3:
 		return None
+	out = os.path.join(plots_dir, plot_filename('correlation', col, target_col))
+	if no_save:
+		return _would_write(out)
 	x = pair[col]
 	y = pair[target_col]
-	# compute Pearson correlation
-	try:
-		r = np.corrcoef(x, y)[0, 1]
-	except Exception:
-		r = float('nan')
-
-	plt.figure(figsize=(6, 5))
-	sns.regplot(x=x, y=y, scatter_kws={'s': 15, 'alpha': 0.6}, line_kws={'color': 'red'})
+	fig = mpl_figure.Figure(figsize=(6, 5))
+	ax = fig.subplots()
+	if max_points and len(pair) > max_points:
+		fit = linear_fit(x, y)
+		r = fit['r']
+		draw_large_scatter(ax, x, y, fit, large_mode, max_points, seed, point_size=15)
+	else:
+		# compute Pearson correlation
+		try:
+			r = np.corrcoef(x, y)[0, 1]
+		except Exception:
+			r = float('nan')
+		sns.regplot(x=x, y=y, scatter_kws={'s': 15, 'alpha': 0.6}, line_kws={'color': 'red'}, ax=ax)
 	display_x = str(col).replace('_', ' ')
 	display_y = str(target_col).replace('_', ' ')
-	plt.title(f'{display_x} vs {display_y} (r={r:.2f})')
-	plt.xlabel(display_x)
-	plt.ylabel(display_y)
-	plt.tight_layout()
-	out = os.path.join(plots_dir, f'{safe_fname(col)}_vs_{safe_fname(target_col)}_corr.png')
+	ax.set_title(f'{display_x} vs {display_y} (r={r:.2f})')
+	ax.set_xlabel(display_x)
+	ax.set_ylabel(display_y)
+	return _save(fig, out, dpi, no_save)
+
+
+def plot_wlb_index(df, occupation_col, occ, target_col, rows, fit, plots_dir, dpi=100, no_save=False, max_points=0, large_mode='hexbin', seed=0):
+	"""Scatter plot of the work-life balance index vs `target_col` for one occupation.
+
+	`rows` and `fit` come from `wlb_groups()`: the occupation's row positions and its
+	closed-form regression, drawn as a red line with a 95% confidence band. With
+	more than `max_points` rows (if set) the points go through `draw_large_scatter()`.
+	"""
+	out = os.path.join(plots_dir, plot_filename('wlb_index', occupation_col, occ, target_col))
 	if no_save:
-		print('(no-save) would write', out)
+		return _would_write(out)
+	sub = df.iloc[rows]
+	x = sub[WLB_COL].to_numpy(dtype=float)
+	y = pd.to_numeric(sub[target_col], errors='coerce').to_numpy(dtype=float)
+	fig = mpl_figure.Figure(figsize=(6, 5))
+	ax = fig.subplots()
+	if max_points and len(rows) > max_points:
+		draw_large_scatter(ax, x, y, fit, large_mode, max_points, seed, point_size=20)
+	else:
+		ax.scatter(x, y, s=20, alpha=0.6)
+		xs, ys, band = _fit_line_and_band(fit)
+		ax.plot(xs, ys, color='red', linewidth=2.25)
+		if band is not None:
+			ax.fill_between(xs, ys - band, ys + band, color='red', alpha=0.15, linewidth=0)
+	disp_occ = str(occ).replace('_', ' ')
+	ax.set_title(f'Work-life balance index vs {str(target_col).replace("_", " ")}: {disp_occ}')
+	ax.set_xlabel('Work-life balance index')
+	ax.set_ylabel(str(target_col).replace('_', ' '))
+	return _save(fig, out, dpi, no_save)
+
+
+PLOTTERS = {
+	'categorical': plot_categorical,
+	'numeric': plot_numeric,
+	'correlation': plot_correlation,
+	'wlb_index': plot_wlb_index,
+}
+
+
+def plot_job(kind, group, *args, **options):
+	"""Describe one plot: `PLOTTERS[kind](df, *args, plots_dir, ..., **options)`, listed under `group` in the output."""
+	return {'kind': kind, 'group': group, 'args': args, 'options': options}
+
+
+def render_job(job, plots_dir, dpi=100, no_save=False, thumbnails=False):
+	"""Render one plot job against the shared DataFrame (and its thumbnail); returns the output path or None."""
+	out = PLOTTERS[job['kind']](_SHARED_DF, *job['args'], plots_dir, dpi=dpi, no_save=no_save, **job.get('options', {}))
+	if thumbnails and out and not no_save:
+		make_thumbnail(out)
+	return out
+
+
+def _init_worker(df):
+	global _SHARED_DF
+	_SHARED_DF = df
+
+
+def render_plots(df, jobs, plots_dir, dpi=100, no_save=False, n_jobs=None, thumbnails=False, on_done=None):
+	"""Render `jobs` (see `plot_job()`) with `n_jobs` processes; results are in job order.
+
+	The pool uses the platform's default start method. Jobs are plain dicts and
+	`render_job` is a module-level function, so both pickle; `df` reaches the
+	workers through the pool initializer, except under fork, where they inherit it.
+	`no_save` runs only print the planned paths, so they always run in-process.
+	`on_done(i, out)` is called in this process as each job finishes, in
+	completion order.
+	"""
+	global _SHARED_DF
+	_SHARED_DF = df
+	n_jobs = n_jobs or os.cpu_count() or 1
+	outputs = [None] * len(jobs)
+	if no_save or n_jobs == 1 or len(jobs) <= 1:
+		for i, job in enumerate(jobs):
+			outputs[i] = render_job(job, plots_dir, dpi, no_save, thumbnails)
+			if on_done is not None:
+				on_done(i, outputs[i])
+		return outputs
+
+	if multiprocessing.get_start_method() == 'fork':
+		# import once here so forked workers inherit the modules instead of each importing them
+		mpl_figure._load()
+		sns._load()
+		pool = ProcessPoolExecutor(max_workers=n_jobs)
+	else:
+		pool = ProcessPoolExecutor(max_workers=n_jobs, initializer=_init_worker, initargs=(df,))
+	with pool:
+		futures = {pool.submit(render_job, job, plots_dir, dpi, no_save, thumbnails): i for i, job in enumerate(jobs)}
+		for future in as_completed(futures):
+			i = futures[future]
+			outputs[i] = future.result()
+			if on_done is not None:
+				on_done(i, outputs[i])
+	return outputs
+
+
+def job_data(df, job):
+	"""The slice of `df` a plot job reads; its hash decides whether the plot must be re-rendered."""
+	kind, args = job['kind'], job['args']
+	if kind in ('categorical', 'numeric'):
+		return df[[args[0]]]
+	if kind == 'correlation':
+		return df[list(args)]
+	if kind == 'wlb_index':
+		rows, target_col = args[3], args[2]
+		return df.iloc[rows][[WLB_COL, target_col]]
+	raise ValueError(f'unknown plot kind: {kind}')
+
+
+def _library_versions():
+	return {'matplotlib': matplotlib.__version__, 'seaborn': sns.__version__, 'pandas': pd.__version__, 'numpy': np.__version__}
+
+
+def job_key(df, job, dpi, versions=None):
+	"""Content hash of everything that determines a plot's pixels."""
+	params = {
+		'cache_version': CACHE_VERSION,
+		'kind': job['kind'],
+		# row positions are covered by the data hash below
+		'args': [str(a) for a in job['args'] if not isinstance(a, np.ndarray)],
+		'options': job.get('options', {}),
+		'dpi': dpi,
+		'versions': versions or _library_versions(),
+	}
+	data = job_data(df, job)
+	h = hashlib.sha256(json.dumps(params, sort_keys=True).encode())
+	h.update(json.dumps([str(c) for c in data.columns]).encode())
+	h.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+	return h.hexdigest()
+
+
+def load_manifest(plots_dir):
+	path = os.path.join(plots_dir, MANIFEST_NAME)
+	try:
+		with open(path, encoding='utf-8') as fh:
+			return json.load(fh)
+	except (OSError, ValueError):
+		return {}
+
+
+def save_manifest(plots_dir, manifest):
+	path = os.path.join(plots_dir, MANIFEST_NAME)
+	tmp = path + '.tmp'
+	with open(tmp, 'w', encoding='utf-8') as fh:
+		json.dump(manifest, fh, indent=1, sort_keys=True)
+	os.replace(tmp, path)
+
+
+def _is_fresh(entry, key, plots_dir):
+	if not entry or entry.get('key') != key:
+		return False
+	if entry.get('out') is None:
+		# the job had too little data to plot last time, and its data is unchanged
+		return True
+	path = os.path.join(plots_dir, entry['out'])
+	# the PNG must still be the one we wrote: same size (cheap check first) and same bytes
+	try:
+		if os.path.getsize(path) != entry.get('size'):
+			return False
+		return _file_sha256(path) == entry.get('sha256')
+	except OSError:
+		return False
+
+
+def render_cached(df, jobs, plots_dir, dpi=100, n_jobs=None, force=False, thumbnails=False, on_done=None):
+	"""Like `render_plots()`, but only renders jobs whose manifest entry is missing or stale.
+
+	Returns (outputs in job order, number of jobs skipped as unchanged).
+	"""
+	manifest = {} if force else load_manifest(plots_dir)
+	versions = _library_versions()
+	keys = [job_key(df, job, dpi, versions) for job in jobs]
+	names = [plot_filename(job['kind'], *job['args']) for job in jobs]
+
+	outputs = [None] * len(jobs)
+	todo = []
+	for i, (name, key) in enumerate(zip(names, keys)):
+		entry = manifest.get(name)
+		if _is_fresh(entry, key, plots_dir):
+			outputs[i] = os.path.join(plots_dir, entry['out']) if entry['out'] else None
+			if thumbnails and outputs[i]:
+				make_thumbnail(outputs[i])
+			if on_done is not None:
+				on_done(i, outputs[i])
+		else:
+			todo.append(i)
+
+	done = None if on_done is None else (lambda j, out: on_done(todo[j], out))
+	rendered = render_plots(df, [jobs[i] for i in todo], plots_dir, dpi=dpi, n_jobs=n_jobs, thumbnails=thumbnails, on_done=done)
+	for i, out in zip(todo, rendered):
+		outputs[i] = out
+		manifest[names[i]] = {
+			'key': keys[i],
+			'out': os.path.basename(out) if out else None,
+			'size': os.path.getsize(out) if out else None,
+			'sha256': _file_sha256(out) if out else None,
+		}
+	save_manifest(plots_dir, manifest)
+	return outputs, len(jobs) - len(todo)
+
+
+# --- HTML index of the plots, replacing the notebook export ---
+
+HTML_INDEX_NAME = 'index.html'
+HTML_TITLE = 'Work-life balance vs longevity'
+THUMBNAIL_DIR = 'thumbs'
+THUMBNAIL_SCALE = 0.3
+# plot groups (see plot_job()) in page order, with their headings
+HTML_GROUPS = (
+	('created', 'Distributions'),
+	('corr', 'Correlations'),
+	('wlb', 'Work-life balance index by occupation'),
+)
+HTML_STYLE = (
+	'body{font-family:sans-serif;margin:1.5em;color:#222}'
+	'table{border-collapse:collapse;margin-bottom:1em}th,td{padding:.25em .6em;border-bottom:1px solid #ddd;text-align:right}'
+	'th:first-child,td:first-child{text-align:left}'
+	'.grid{display:grid;grid-template-columns:repeat(auto-fill,minmax(280px,1fr));gap:1em}'
+	'figure{margin:0}img{width:100%;height:auto;border:1px solid #eee}figcaption{font-size:.85em;color:#555}'
+)
+
+
+def thumbnail_path(out):
+	"""Path of the thumbnail of plot `out` (in the `thumbs/` folder next to it)."""
+	return os.path.join(os.path.dirname(out), THUMBNAIL_DIR, os.path.basename(out))
+
+
+def make_thumbnail(out, scale=THUMBNAIL_SCALE):
+	"""Write a `scale`-sized copy of the PNG `out`, unless an up-to-date one exists; returns its path."""
+	thumb = thumbnail_path(out)
+	if os.path.exists(thumb) and os.path.getmtime(thumb) >= os.path.getmtime(out):
+		return thumb
+	os.makedirs(os.path.dirname(thumb), exist_ok=True)
+	with pil_image.open(out) as img:
+		img.thumbnail((max(1, round(img.width * scale)), max(1, round(img.height * scale))))
+		img.save(thumb, optimize=True)
+	return thumb
+
+
+class HtmlIndex:
+	"""`index.html` in the plots dir: the summary table plus a grid of links to the plot files.
+
+	Images are referenced, not inlined, and the page has no scripts, so it is small
+	and works offline. `add()` rewrites the page as plots finish (at most every
+	`min_interval` seconds; the unfinished page reloads itself) and `close()`
+	writes the final one, with the plots in the order they were planned.
+	"""
+
+	def __init__(self, plots_dir, title, summary=None, thumbnails=False, min_interval=0.5):
+		self.plots_dir = plots_dir
+		self.path = os.path.join(plots_dir, HTML_INDEX_NAME)
+		self.title = title
+		self.summary = summary
+		self.thumbnails = thumbnails
+		self.min_interval = min_interval
+		self.entries = []  # (position, group, path)
+		self._written = 0.0
+
+	def add(self, group, out, position=None):
+		if not out:
+			return
+		self.entries.append((len(self.entries) if position is None else position, group, out))
+		if time.monotonic() - self._written >= self.min_interval:
+			self.write(done=False)
+
+	def close(self):
+		self.write(done=True)
+		return self.path
+
+	def _figure(self, out):
+		name = os.path.relpath(out, self.plots_dir).replace(os.sep, '/')
+		src = thumbnail_path(name).replace(os.sep, '/') if self.thumbnails else name
+		caption = html.escape(os.path.splitext(os.path.basename(out))[0].replace('_', ' '))
+		return (
+			f'<figure><a href="{html.escape(quote(name))}"><img src="{html.escape(quote(src))}" alt="{caption}" '
+			f'loading="lazy" decoding="async"></a><figcaption>{caption}</figcaption></figure>'
+		)
+
+	def render(self, done=True):
+		title = html.escape(self.title)
+		lines = ['<!DOCTYPE html>', '<html lang="en">', '<head>', '<meta charset="utf-8">']
+		if not done:
+			lines.append('<meta http-equiv="refresh" content="2">')
+		lines += [f'<title>{title}</title>', f'<style>{HTML_STYLE}</style>', '</head>', '<body>', f'<h1>{title}</h1>']
+		if not done:
+			lines.append(f'<p>Rendering: {len(self.entries)} plots so far.</p>')
+		if self.summary is not None and len(self.summary):
+			lines += ['<h2>Summary</h2>', self.summary.to_html(index=False, border=0, na_rep='', float_format=lambda v: f'{v:.4f}')]
+		entries = sorted(self.entries, key=lambda e: e[0])
+		for group, heading in HTML_GROUPS:
+			outs = [out for _, g, out in entries if g == group]
+			if outs:
+				lines += [f'<h2>{html.escape(heading)}</h2>', '<div class="grid">']
+				lines += [self._figure(out) for out in outs]
+				lines.append('</div>')
+		lines += ['</body>', '</html>', '']
+		return '\n'.join(lines)
+
+	def write(self, done=True):
+		tmp = self.path + '.tmp'
+		with open(tmp, 'w', encoding='utf-8') as fh:
+			fh.write(self.render(done))
+		os.replace(tmp, self.path)
+		self._written = time.monotonic()
+
+
+# --- Work-life balance index, split by occupation ---
+
+WLB_COL = 'work_life_balance_index'
+
+
+def wlb_index(rest, sleep, exercise, work):
+	"""Work-life balance index (rest + sleep + exercise) / (rest + sleep + exercise + work).
+
+	Computed in one vectorized pass over a single (rows x 4) array; values are
+	coerced to numbers, missing hours count as 0 and a row with no hours gets NaN.
+	Returns a Series aligned with `rest`.
+	"""
+	hours = np.empty((len(rest), 4))
+	for j, col in enumerate((rest, sleep, exercise, work)):
+		hours[:, j] = pd.to_numeric(col, errors='coerce')
+	hours[np.isnan(hours)] = 0.0
+	leisure = hours[:, :3].sum(axis=1)
+	with np.errstate(divide='ignore', invalid='ignore'):
+		index = leisure / (leisure + hours[:, 3])
+	index[~np.isfinite(index)] = np.nan
+	return pd.Series(index, index=getattr(rest, 'index', None), name=WLB_COL)
+
+
+def wlb_groups(df, occupation_col, target_col, min_rows=5):
+	"""Split the (index, target) pairs by occupation in one groupby and fit all regression lines at once.
+
+	Returns (fits, rows). `fits` has one row per occupation with at least `min_rows`
+	complete pairs, in order of first appearance: n, x/y means, min/max of x, the
+	centered sums of squares sxx/sxy/syy, slope, intercept and r. `rows` maps each
+	occupation to the positions of its rows in `df`.
+	"""
+	x = df[WLB_COL].to_numpy(dtype=float)
+	y = pd.to_numeric(df[target_col], errors='coerce').to_numpy(dtype=float)
+	occ = df[occupation_col]
+	pos = np.flatnonzero(~np.isnan(x) & ~np.isnan(y) & occ.notna().to_numpy())
+	pairs = pd.DataFrame({'occ': occ.to_numpy()[pos], 'x': x[pos], 'y': y[pos]})
+
+	grouped = pairs.groupby('occ', sort=False, observed=True)
+	means = grouped[['x', 'y']].transform('mean')
+	dx = pairs['x'] - means['x']
+	dy = pairs['y'] - means['y']
+	pairs['dxx'], pairs['dxy'], pairs['dyy'] = dx * dx, dx * dy, dy * dy
+
+	grouped = pairs.groupby('occ', sort=False, observed=True)
+	fits = grouped.agg(
+		n=('x', 'size'), mean_x=('x', 'mean'), mean_y=('y', 'mean'),
+		min_x=('x', 'min'), max_x=('x', 'max'),
+		sxx=('dxx', 'sum'), sxy=('dxy', 'sum'), syy=('dyy', 'sum'),
+	)
+	with np.errstate(divide='ignore', invalid='ignore'):
+		fits['slope'] = fits['sxy'] / fits['sxx']
+		fits['r'] = fits['sxy'] / np.sqrt(fits['sxx'] * fits['syy'])
+	fits['intercept'] = fits['mean_y'] - fits['slope'] * fits['mean_x']
+	fits = fits[fits['n'] >= min_rows]
+	rows = {name: pos[idx] for name, idx in grouped.indices.items() if name in fits.index}
+	return fits, rows
+
+
+def _fit_line_and_band(fit, num=100):
+	"""x grid, fitted y and the 95% confidence band of the mean from a closed-form fit (row of `wlb_groups()`)."""
+	xs = np.linspace(fit['min_x'], fit['max_x'], num)
+	ys = fit['intercept'] + fit['slope'] * xs
+	n = fit['n']
+	if n <= 2 or not fit['sxx'] > 0:
+		return xs, ys, None
+	mse = max(fit['syy'] - fit['slope'] * fit['sxy'], 0.0) / (n - 2)
+	se = np.sqrt(mse * (1.0 / n + (xs - fit['mean_x']) ** 2 / fit['sxx']))
+	return xs, ys, 1.96 * se
+
+
+# --- Large scatter plots: density rendering or stratified subsampling ---
+
+# above this many points, scatter plots switch to --large-mode (0 = never)
+DEFAULT_MAX_POINTS = 50_000
+LARGE_MODES = ('hexbin', 'sample')
+
+
+def linear_fit(x, y):
+	"""Closed-form least-squares fit of y on x (NaN pairs dropped), in the shape `_fit_line_and_band()` takes."""
+	x = np.asarray(x, dtype=float)
+	y = np.asarray(y, dtype=float)
+	ok = ~(np.isnan(x) | np.isnan(y))
+	x, y = x[ok], y[ok]
+	mean_x, mean_y = x.mean(), y.mean()
+	dx, dy = x - mean_x, y - mean_y
+	sxx, sxy, syy = (dx * dx).sum(), (dx * dy).sum(), (dy * dy).sum()
+	with np.errstate(divide='ignore', invalid='ignore'):
+		slope = sxy / sxx
+		r = sxy / np.sqrt(sxx * syy)
+	return {
+		'n': x.size, 'mean_x': mean_x, 'mean_y': mean_y, 'min_x': x.min(), 'max_x': x.max(),
+		'sxx': sxx, 'sxy': sxy, 'syy': syy, 'slope': slope, 'intercept': mean_y - slope * mean_x, 'r': float(r),
+	}
+
+
+def _grid_bins(values, grid):
+	lo, hi = values.min(), values.max()
+	if hi == lo:
+		return np.zeros(values.size, dtype=np.int64)
+	return np.clip(((values - lo) / (hi - lo) * grid).astype(np.int64), 0, grid - 1)
+
+
+def stratified_sample(x, y, size, grid=30, seed=0):
+	"""Sorted positions of at most `size` (x, y) points, stratified over a grid x grid raster.
+
+	Every cell keeps up to the same number k of randomly chosen points, with k as
+	large as the budget allows: dense regions are thinned, sparse regions and
+	outliers keep all their points.
+	"""
+	x = np.asarray(x, dtype=float)
+	y = np.asarray(y, dtype=float)
+	n = x.size
+	if n <= size:
+		return np.arange(n)
+	cell = _grid_bins(x, grid) * grid + _grid_bins(y, grid)
+	counts = np.bincount(cell, minlength=grid * grid)
+	lo, hi = 0, int(counts.max())
+	while lo < hi:
+		mid = (lo + hi + 1) // 2
+		if np.minimum(counts, mid).sum() <= size:
+			lo = mid
+		else:
+			hi = mid - 1
+	rng = np.random.default_rng(seed)
+	order = np.lexsort((rng.random(n), cell))
+	sorted_cells = cell[order]
+	rank = np.arange(n) - np.searchsorted(sorted_cells, sorted_cells, side='left')
+	return np.sort(order[rank < max(lo, 1)])
+
+
+def draw_large_scatter(ax, x, y, fit, mode='hexbin', max_points=DEFAULT_MAX_POINTS, seed=0, point_size=15):
+	"""Scatter too many points to draw one by one: hexbin density or a stratified sample, plus the full-data fit."""
+	x = np.asarray(x, dtype=float)
+	y = np.asarray(y, dtype=float)
+	if mode == 'hexbin':
+		ax.hexbin(x, y, gridsize=60, mincnt=1, cmap='Blues', bins='log')
+	elif mode == 'sample':
+		keep = stratified_sample(x, y, max_points, seed=seed)
+		ax.scatter(x[keep], y[keep], s=point_size, alpha=0.6)
 	else:
-		plt.savefig(out, dpi=dpi)
-	plt.close()
+		raise ValueError(f'large mode must be one of {LARGE_MODES}')
+	xs, ys, band = _fit_line_and_band(fit)
+	ax.plot(xs, ys, color='red', linewidth=2.25)
+	if band is not None:
+		ax.fill_between(xs, ys - band, ys + band, color='red', alpha=0.15, linewidth=0)
+
+
+# --- Summary statistics without rendering (--stats-only) ---
+
+# resampled values per bootstrap batch; each one costs about 40 bytes across the
+# index and resample arrays, so a batch stays under ~100 MB
+BOOTSTRAP_BATCH_ELEMENTS = 2_000_000
+
+
+def bootstrap_corr_ci(x, y, n_boot=1000, alpha=0.05, seed=0):
+	"""Percentile bootstrap confidence interval (low, high) for Pearson r of the complete (x, y) pairs.
+
+	Resamples are drawn as a (batch, n) index matrix and all their correlations
+	are computed at once with array operations, in batches that bound memory.
+	"""
+	x = np.asarray(x, dtype=float)
+	y = np.asarray(y, dtype=float)
+	ok = ~(np.isnan(x) | np.isnan(y))
+	x, y = x[ok], y[ok]
+	n = x.size
+	if n < 3 or n_boot < 1:
+		return float('nan'), float('nan')
+	rng = np.random.default_rng(seed)
+	batch = max(1, min(n_boot, BOOTSTRAP_BATCH_ELEMENTS // n))
+	rs = np.empty(n_boot)
+	for start in range(0, n_boot, batch):
+		stop = min(start + batch, n_boot)
+		idx = rng.integers(0, n, size=(stop - start, n))
+		xs, ys = x[idx], y[idx]
+		xs -= xs.mean(axis=1, keepdims=True)
+		ys -= ys.mean(axis=1, keepdims=True)
+		with np.errstate(divide='ignore', invalid='ignore'):
+			rs[start:stop] = (xs * ys).sum(axis=1) / np.sqrt((xs * xs).sum(axis=1) * (ys * ys).sum(axis=1))
+	low, high = np.nanquantile(rs, [alpha / 2, 1 - alpha / 2])
+	return float(low), float(high)
+
+
+def grouped_summary(df, by, cols, target_col=None):
+	"""n/mean/median/std per (group, column) in long format, plus each column's r with `target_col` within the group."""
+	grouped = df.groupby(by, sort=True, observed=True)[cols]
+	stats = grouped.agg(['count', 'mean', 'median', 'std'])
+	# one block per column, then a stable sort by group keeps the columns in `cols` order
+	# (DataFrame.stack would need pandas >= 2.1 for that)
+	rows = pd.concat([stats[c].assign(column=c) for c in cols]).sort_index(kind='stable').reset_index()
+	rows = rows[[by, 'column', 'count', 'mean', 'median', 'std']]
+	rows.columns = [by, 'column', 'n', 'mean', 'median', 'std']
+	if target_col is not None:
+		corr = _grouped_corr(df, by, cols, target_col)
+		rows[f'corr_with_{target_col}'] = [corr.at[g, c] for g, c in zip(rows[by], rows['column'])]
+	return rows
+
+
+def _grouped_corr(df, by, cols, target_col):
+	"""Pearson r of each column with `target_col` within each group (complete pairs), from grouped centered sums."""
+	result = {}
+	for c in cols:
+		pair = df.loc[df[c].notna() & df[target_col].notna(), list(dict.fromkeys([by, c, target_col]))]
+		grouped = pair.groupby(by, sort=True, observed=True)
+		dx = pair[c] - grouped[c].transform('mean')
+		dy = pair[target_col] - grouped[target_col].transform('mean')
+		sums = pd.DataFrame({'xy': dx * dy, 'xx': dx * dx, 'yy': dy * dy}).groupby(pair[by], sort=True, observed=True).sum()
+		with np.errstate(divide='ignore', invalid='ignore'):
+			result[c] = sums['xy'] / np.sqrt(sums['xx'] * sums['yy'])
+	return pd.DataFrame(result)
+
+
+def numeric_summary(numeric, target=None, target_col=None):
+	"""plots_summary table: n, mean, median and std of each column of `numeric`, plus its Pearson r with `target`."""
+	summary = pd.DataFrame({
+		'column': list(numeric.columns),
+		'n': numeric.count().to_numpy(),
+		'mean': numeric.mean().to_numpy(),
+		'median': numeric.median().to_numpy(),
+		'std': numeric.std().to_numpy(),
+	})
+	if target is not None:
+		summary[f'corr_with_{target_col}'] = numeric.corrwith(target).to_numpy()
+	return summary
+
+
+def compute_statistics(df, numeric_cols, target_col=None, gender_col=None, occupation_col=None, fits=None, rows=None, n_boot=1000, seed=0):
+	"""All numbers behind the plots, as DataFrames keyed by output name (see `write_statistics()`)."""
+	# float64 throughout, also for the downcast integer columns
+	numeric = df[numeric_cols].apply(pd.to_numeric, errors='coerce').astype('float64')
+	out = {}
+	summary = numeric_summary(numeric)
+	out['correlation_matrix'] = numeric.corr()
+	if target_col is not None:
+		target = pd.to_numeric(df[target_col], errors='coerce')
+		summary[f'corr_with_{target_col}'] = out['correlation_matrix'][target_col].to_numpy() if target_col in numeric_cols else numeric.corrwith(target).to_numpy()
+		cis = [bootstrap_corr_ci(numeric[c], target, n_boot=n_boot, seed=seed) for c in numeric_cols]
+		out['correlation_ci'] = pd.DataFrame({
+			'column': numeric_cols,
+			'r': summary[f'corr_with_{target_col}'],
+			'ci_low': [lo for lo, _ in cis],
+			'ci_high': [hi for _, hi in cis],
+			'n_boot': n_boot,
+		})
+	out['plots_summary'] = summary
+
+	frame = numeric.copy()
+	for label, col in (('gender', gender_col), ('occupation', occupation_col)):
+		if col is not None:
+			frame[col] = df[col]
+			out[f'summary_by_{label}'] = grouped_summary(frame, col, numeric_cols, target_col if target_col in numeric_cols else None)
+
+	if fits is not None and len(fits):
+		wlb = fits[['n', 'slope', 'intercept', 'r']].copy()
+		x = df[WLB_COL].to_numpy(dtype=float)
+		y = pd.to_numeric(df[target_col], errors='coerce').to_numpy(dtype=float)
+		cis = [bootstrap_corr_ci(x[rows[occ]], y[rows[occ]], n_boot=n_boot, seed=seed) for occ in wlb.index]
+		wlb['r_ci_low'] = [lo for lo, _ in cis]
+		wlb['r_ci_high'] = [hi for _, hi in cis]
+		out['wlb_by_occupation'] = wlb.rename_axis('occupation').reset_index()
 	return out
 
 
+def write_statistics(stats, out_dir, no_save=False):
+	"""Write each table of `compute_statistics()` as `<name>.csv`, and all of them to `stats.json`."""
+	written = []
+	for name, table in stats.items():
+		path = os.path.join(out_dir, f'{name}.csv')
+		if no_save:
+			print('(no-save) would write', path)
+		else:
+			table.to_csv(path, index=(name == 'correlation_matrix'))
+		written.append(path)
+	path = os.path.join(out_dir, 'stats.json')
+	if no_save:
+		print('(no-save) would write', path)
+	else:
+		payload = {
+			name: json.loads(table.to_json(orient='split' if name == 'correlation_matrix' else 'records'))
+			for name, table in stats.items()
+		}
+		with open(path, 'w', encoding='utf-8') as fh:
+			json.dump(payload, fh, indent=1)
+	written.append(path)
+	return written
+
+
+# --- Typed columnar cache of the CSV, reused while the CSV is unchanged ---
+
+DATA_CACHE_VERSION = 2
+# text columns with at most this share of distinct values are stored as categoricals
+CATEGORY_MAX_RATIO = 0.5
+
+
+def compact_dtypes(df):
+	"""Return `df` with compact dtypes: low-cardinality text -> category, integers downcast.
+
+	Only lossless conversions: floats stay float64, so statistics match a plain `read_csv()`.
+	"""
+	out = {}
+	for c in df.columns:
+		col = df[c]
+		if pd.api.types.is_bool_dtype(col):
+			out[c] = col
+		elif pd.api.types.is_integer_dtype(col):
+			out[c] = pd.to_numeric(col, downcast='integer')
+		elif (pd.api.types.is_object_dtype(col) or pd.api.types.is_string_dtype(col)) and col.nunique(dropna=True) <= CATEGORY_MAX_RATIO * max(len(col), 1):
+			out[c] = col.astype('category')
+		else:
+			out[c] = col
+	return pd.DataFrame(out)
+
+
+def read_csv_typed(data_path):
+	"""Read the CSV with stripped column names and compact dtypes."""
+	df = pd.read_csv(data_path)
+	df.columns = [str(c).strip() for c in df.columns]
+	return compact_dtypes(df)
+
+
+def _file_sha256(path):
+	h = hashlib.sha256()
+	with open(path, 'rb') as fh:
+		for block in iter(lambda: fh.read(1 << 20), b''):
+			h.update(block)
+	return h.hexdigest()
+
+
+def _has_pyarrow():
+	try:
+		import pyarrow.feather  # noqa: F401
+	except ImportError:
+		return False
+	return True
+
+
+def data_cache_paths(data_path):
+	"""(data file, metadata file) of the columnar cache stored next to `data_path`."""
+	return f'{data_path}.cache.feather', f'{data_path}.cache.json'
+
+
+def _write_data_cache(data_path, df, stat):
+	cache_path, meta_path = data_cache_paths(data_path)
+	tmp = cache_path + '.tmp'
+	# uncompressed, so --mmap can map the columns straight from the page cache
+	df.reset_index(drop=True).to_feather(tmp, compression='uncompressed')
+	os.replace(tmp, cache_path)
+	meta = {
+		'version': DATA_CACHE_VERSION,
+		'cache': os.path.basename(cache_path),
+		'size': stat.st_size,
+		'mtime_ns': stat.st_mtime_ns,
+		'sha256': _file_sha256(data_path),
+	}
+	with open(meta_path, 'w', encoding='utf-8') as fh:
+		json.dump(meta, fh, indent=1)
+
+
+def _read_data_cache(cache_path, memory_map=False):
+	import pyarrow.feather as feather
+	return feather.read_table(cache_path, memory_map=memory_map).to_pandas()
+
+
+def load_dataset(data_path, use_cache=True, memory_map=False):
+	"""Load the CSV, from the typed columnar cache next to it when that is still valid.
+
+	The cache is a Feather file (memory-mapped with `memory_map`) and needs pyarrow;
+	without it the CSV is parsed every time, with a warning. It is valid while the CSV's size and
+	mtime match; if only the mtime changed, the CSV's sha256 decides. A missing or
+	stale cache is rebuilt after parsing the CSV. Returns (df, 'cache' or 'csv').
+	"""
+	if not use_cache:
+		return read_csv_typed(data_path), 'csv'
+	if not _has_pyarrow():
+		# no pickle fallback: the CSV is the source of truth, and unpickling runs code
+		print('pyarrow is not installed: parsing the CSV without the data cache (pip install pyarrow)')
+		return read_csv_typed(data_path), 'csv'
+
+	stat = os.stat(data_path)
+	cache_path, meta_path = data_cache_paths(data_path)
+	try:
+		with open(meta_path, encoding='utf-8') as fh:
+			meta = json.load(fh)
+	except (OSError, ValueError):
+		meta = None
+
+	if (
+		meta and meta.get('version') == DATA_CACHE_VERSION and meta.get('cache') == os.path.basename(cache_path)
+		and meta.get('size') == stat.st_size and os.path.exists(cache_path)
+	):
+		fresh = meta.get('mtime_ns') == stat.st_mtime_ns
+		if not fresh and meta.get('sha256') == _file_sha256(data_path):
+			# touched but not changed: keep the cache, remember the new mtime
+			fresh = True
+			meta['mtime_ns'] = stat.st_mtime_ns
+			with open(meta_path, 'w', encoding='utf-8') as fh:
+				json.dump(meta, fh, indent=1)
+		if fresh:
+			try:
+				return _read_data_cache(cache_path, memory_map), 'cache'
+			except (OSError, ValueError, ImportError) as e:
+				print(f'Ignoring unreadable data cache {cache_path}: {e}')
+
+	df = read_csv_typed(data_path)
+	try:
+		_write_data_cache(data_path, df, stat)
+	except (OSError, ValueError, ImportError) as e:
+		print(f'Could not write data cache next to {data_path}: {e}')
+	return df, 'csv'
+
+
+# --- Streaming mode: statistics accumulated chunk by chunk, never holding the full frame ---
+
+class RunningStats:
+	"""Count, mean, sample std, min and max of a stream of value batches (NaNs skipped).
+
+	Welford's update, applied a batch at a time with Chan's pairwise merge, so the
+	result matches a single pass over all values to floating-point precision.
+	"""
+
+	__slots__ = ('n', 'mean', 'm2', 'min', 'max')
+
+	def __init__(self):
+		self.n = 0
+		self.mean = 0.0
+		self.m2 = 0.0
+		self.min = np.inf
+		self.max = -np.inf
+
+	def update(self, values):
+		values = np.asarray(values, dtype=float)
+		values = values[~np.isnan(values)]
+		nb = values.size
+		if not nb:
+			return
+		mean_b = values.mean()
+		n = self.n + nb
+		delta = mean_b - self.mean
+		self.m2 += ((values - mean_b) ** 2).sum() + delta * delta * self.n * nb / n
+		self.mean += delta * nb / n
+		self.n = n
+		self.min = min(self.min, values.min())
+		self.max = max(self.max, values.max())
+
+	@property
+	def std(self):
+		# ddof=1, like pandas
+		return float(np.sqrt(self.m2 / (self.n - 1))) if self.n > 1 else float('nan')
+
+
+class RunningCorr:
+	"""Pearson r and least-squares line of y on x from a stream of (x, y) batches (NaN pairs skipped)."""
+
+	__slots__ = ('n', 'mean_x', 'mean_y', 'm2x', 'm2y', 'cxy')
+
+	def __init__(self):
+		self.n = 0
+		self.mean_x = self.mean_y = 0.0
+		self.m2x = self.m2y = self.cxy = 0.0
+
+	def update(self, x, y):
+		x = np.asarray(x, dtype=float)
+		y = np.asarray(y, dtype=float)
+		ok = ~(np.isnan(x) | np.isnan(y))
+		x, y = x[ok], y[ok]
+		nb = x.size
+		if not nb:
+			return
+		mean_xb, mean_yb = x.mean(), y.mean()
+		dxb, dyb = x - mean_xb, y - mean_yb
+		n = self.n + nb
+		dx, dy = mean_xb - self.mean_x, mean_yb - self.mean_y
+		weight = self.n * nb / n
+		self.m2x += (dxb * dxb).sum() + dx * dx * weight
+		self.m2y += (dyb * dyb).sum() + dy * dy * weight
+		self.cxy += (dxb * dyb).sum() + dx * dy * weight
+		self.mean_x += dx * nb / n
+		self.mean_y += dy * nb / n
+		self.n = n
+
+	@property
+	def r(self):
+		denom = np.sqrt(self.m2x * self.m2y)
+		return float(self.cxy / denom) if self.n > 1 and denom > 0 else float('nan')
+
+	def line(self):
+		"""(slope, intercept) of the least-squares fit y = slope * x + intercept."""
+		slope = self.cxy / self.m2x if self.m2x > 0 else float('nan')
+		return slope, self.mean_y - slope * self.mean_x
+
+
+# a categorical column with more distinct values than this is dropped from streaming counts
+STREAM_MAX_CATEGORIES = 10_000
+
+
+def _bin_edges(stats, bins):
+	lo, hi = stats.min, stats.max
+	if lo == hi:
+		lo, hi = lo - 0.5, hi + 0.5
+	return np.linspace(lo, hi, bins + 1)
+
+
+def _numeric(chunk, col):
+	return pd.to_numeric(chunk[col], errors='coerce').to_numpy(dtype=float)
+
+
+def stream_statistics(data_path, chunksize=1_000_000, bins=50):
+	"""Summarize a CSV of any size in two chunked passes with bounded memory.
+
+	Pass 1 collects category counts, RunningStats per numeric column, Pearson
+	accumulators against the age-at-death column and per-occupation accumulators
+	for the work-life balance index. Pass 2, now that the value ranges are known,
+	fills `bins`-bin histograms and 2D histograms for the correlation plots.
+	Pass 3 keeps only the values in each column's median bin, for exact medians.
+	Column roles are detected on the first chunk the same way `main()` does.
+	"""
+	summary = None
+	for chunk in pd.read_csv(data_path, chunksize=chunksize):
+		raw_cols = list(chunk.columns)
+		chunk.columns = [str(c).strip() for c in raw_cols]
+		if summary is None:
+			summary = _stream_roles(chunk, raw_cols)
+		roles = summary['roles']
+		summary['rows'] += len(chunk)
+
+		for c in list(summary['counts']):
+			merged = summary['counts'][c].add(chunk[c].value_counts(dropna=False), fill_value=0)
+			summary['counts'][c] = merged if len(merged) <= STREAM_MAX_CATEGORIES else None
+		summary['counts'] = {c: v for c, v in summary['counts'].items() if v is not None}
+
+		target = _numeric(chunk, roles['target']) if roles['target'] else None
+		for c, st in summary['stats'].items():
+			values = _numeric(chunk, c)
+			st.update(values)
+			if c in summary['corr']:
+				summary['corr'][c].update(values, target)
+
+		if roles['wlb']:
+			index = wlb_index(*(chunk[c] for c in roles['wlb'])).to_numpy()
+			summary['wlb_stats'].update(index)
+			for name, rows in chunk.groupby(roles['occupation'], sort=False).indices.items():
+				summary['wlb'].setdefault(name, RunningCorr()).update(index[rows], target[rows])
+
+	if summary is None:
+		raise ValueError(f'{data_path} has no data rows')
+
+	roles = summary['roles']
+	edges = {c: _bin_edges(st, bins) for c, st in summary['stats'].items() if st.n}
+	summary['edges'] = edges
+	summary['hist'] = {c: np.zeros(bins, dtype=np.int64) for c in edges}
+	summary['hist2d'] = {c: np.zeros((bins, bins), dtype=np.int64) for c in roles['corr'] if c in edges and roles['target'] in edges}
+	if roles['wlb'] and summary['wlb_stats'].n and roles['target'] in edges:
+		summary['wlb_edges'] = _bin_edges(summary['wlb_stats'], bins)
+		summary['wlb_hist2d'] = {occ: np.zeros((bins, bins), dtype=np.int64) for occ in summary['wlb']}
+
+	usecols = sorted({summary['raw'][c] for c in edges} | {summary['raw'][c] for c in (roles['wlb'] or ())} | ({summary['raw'][roles['occupation']]} if roles['wlb'] else set()))
+	for chunk in pd.read_csv(data_path, chunksize=chunksize, usecols=usecols):
+		chunk.columns = [str(c).strip() for c in chunk.columns]
+		values = {c: _numeric(chunk, c) for c in edges}
+		for c, hist in summary['hist'].items():
+			v = values[c]
+			hist += np.histogram(v[~np.isnan(v)], bins=edges[c])[0]
+		if summary['hist2d']:
+			y = values[roles['target']]
+			for c, hist in summary['hist2d'].items():
+				x = values[c]
+				ok = ~(np.isnan(x) | np.isnan(y))
+				hist += np.histogram2d(x[ok], y[ok], bins=(edges[c], edges[roles['target']]))[0].astype(np.int64)
+		if 'wlb_hist2d' in summary:
+			index = wlb_index(*(chunk[c] for c in roles['wlb'])).to_numpy()
+			y = values[roles['target']]
+			occ = chunk[roles['occupation']].to_numpy()
+			ok = ~(np.isnan(index) | np.isnan(y)) & pd.notna(occ)
+			for name, hist in summary['wlb_hist2d'].items():
+				sel = ok & (occ == name)
+				hist += np.histogram2d(index[sel], y[sel], bins=(summary['wlb_edges'], edges[roles['target']]))[0].astype(np.int64)
+
+	summary['median'] = _stream_medians(data_path, chunksize, summary)
+	return summary
+
+
+def _stream_roles(chunk, raw_cols):
+	"""Detect column roles on the first chunk (same rules as the in-memory path) and set up the accumulators."""
+	detected = detect_roles(chunk.columns)
+	gender_col, occupation_col, target_col = detected['gender'], detected['occupation'], detected['target']
+	numeric_cols = [c for c in chunk.columns if pd.api.types.is_numeric_dtype(chunk[c]) and str(c).lower() != 'id']
+	categorical_cols = [c for c in (gender_col, occupation_col) if c]
+	# 'string' selects both StringDtype and pandas 3's default str columns ('str' itself is rejected before pandas 3)
+	text = chunk.select_dtypes(include=['object', 'category', 'string']).columns
+	categorical_cols += [c for c in text if c not in categorical_cols]
+	all_cols = list(chunk.columns)
+	if target_col is None:
+		corr_cols = []
+	elif len(all_cols) >= 7:
+		corr_cols = all_cols[3:7]
+	else:
+		corr_cols = [c for c in numeric_cols if c != target_col]
+	wlb_cols = [detected[role] for role in ('rest', 'sleep', 'exercise', 'work')]
+	if not all(wlb_cols) or not target_col or not occupation_col:
+		wlb_cols = None
+
+	stat_cols = list(dict.fromkeys(numeric_cols + corr_cols + ([target_col] if target_col else [])))
+	return {
+		'rows': 0,
+		'raw': dict(zip(chunk.columns, raw_cols)),
+		'roles': {
+			'gender': gender_col,
+			'occupation': occupation_col,
+			'target': target_col,
+			'numeric': numeric_cols,
+			'categorical': categorical_cols,
+			'corr': corr_cols,
+			'wlb': wlb_cols,
+		},
+		'counts': {c: pd.Series(dtype='float64') for c in categorical_cols},
+		'stats': {c: RunningStats() for c in stat_cols},
+		'corr': {c: RunningCorr() for c in stat_cols} if target_col else {},
+		'wlb': {},
+		'wlb_stats': RunningStats(),
+	}
+
+
+def _median_bins(hist):
+	"""(first bin, last bin, values before the first bin) of the bins holding the middle value(s)."""
+	total = int(hist.sum())
+	cum = np.cumsum(hist)
+	# 0-based ranks of the middle value(s): equal for an odd count
+	lo = int(np.searchsorted(cum, (total - 1) // 2, side='right'))
+	hi = int(np.searchsorted(cum, total // 2, side='right'))
+	return lo, hi, int(cum[lo - 1]) if lo else 0
+
+
+def _bin_index(values, edges):
+	# same bins as np.histogram: half-open, except that the last bin includes its right edge
+	idx = np.searchsorted(edges, values, side='right') - 1
+	idx[values == edges[-1]] = len(edges) - 2
+	return idx
+
+
+def _stream_medians(data_path, chunksize, summary):
+	"""Exact medians of the histogram columns, from one more pass that keeps only the median bins' values."""
+	hist = {c: h for c, h in summary['hist'].items() if h.sum()}
+	bins = {c: _median_bins(h) for c, h in hist.items()}
+	kept = {c: [] for c in hist}
+	usecols = sorted({summary['raw'][c] for c in hist})
+	if usecols:
+		for chunk in pd.read_csv(data_path, chunksize=chunksize, usecols=usecols):
+			chunk.columns = [str(c).strip() for c in chunk.columns]
+			for c, (lo, hi, _) in bins.items():
+				v = _numeric(chunk, c)
+				v = v[~np.isnan(v)]
+				idx = _bin_index(v, summary['edges'][c])
+				kept[c].append(v[(idx >= lo) & (idx <= hi)])
+	medians = {}
+	for c, (lo, hi, before) in bins.items():
+		values = np.sort(np.concatenate(kept[c]))
+		total = int(hist[c].sum())
+		medians[c] = float((values[(total - 1) // 2 - before] + values[total // 2 - before]) / 2)
+	return medians
+
+
+def stream_summary_rows(summary):
+	"""Rows of plots_summary.csv (column, n, mean, median, std, corr with the target) for the numeric columns."""
+	target = summary['roles']['target']
+	rows = []
+	for c in summary['roles']['numeric']:
+		st = summary['stats'][c]
+		rows.append({
+			'column': c,
+			'n': st.n,
+			'mean': st.mean,
+			'median': summary['median'].get(c, float('nan')),
+			'std': st.std,
+			f'corr_with_{target}': summary['corr'][c].r if target else float('nan'),
+		})
+	return rows
+
+
+def _density_plot(ax, hist, xedges, yedges, acc):
+	"""Draw a 2D histogram (counts in place of a scatter) with the closed-form regression line of `acc`."""
+	counts = np.ma.masked_equal(hist.T, 0)
+	ax.pcolormesh(xedges, yedges, counts, cmap='Blues', shading='flat')
+	slope, intercept = acc.line()
+	xs = np.array([xedges[0], xedges[-1]])
+	ax.plot(xs, slope * xs + intercept, color='red')
+
+
+def render_stream_plots(summary, plots_dir, dpi=100, no_save=False):
+	"""Render the plots `main()` would draw, from the aggregates of `stream_statistics()`.
+
+	Histograms have no KDE and scatter plots become 2D histograms; file names match
+	the in-memory path. Returns {'created': [...], 'corr': [...], 'wlb': [...]}.
+	"""
+	roles = summary['roles']
+	created = {'created': [], 'corr': [], 'wlb': []}
+
+	for c, counts in summary['counts'].items():
+		if c not in (roles['gender'], roles['occupation']) and len(counts) > 30:
+			continue
+		counts = counts.sort_values(ascending=False, kind='stable')
+		fig = mpl_figure.Figure(figsize=(8, 5))
+		ax = fig.subplots()
+		ax.bar([str(k) for k in counts.index], counts.to_numpy())
+		for label in ax.get_xticklabels():
+			label.set_rotation(45)
+			label.set_ha('right')
+		ax.set_title(f"Distribution of {str(c).replace('_', ' ')}")
+		ax.set_xlabel(c)
+		ax.set_ylabel('count')
+		created['created'].append(_save(fig, os.path.join(plots_dir, plot_filename('categorical', c)), dpi, no_save))
+
+	for c in roles['numeric']:
+		if c not in summary['hist']:
+			continue
+		fig = mpl_figure.Figure(figsize=(8, 5))
+		ax = fig.subplots()
+		ax.stairs(summary['hist'][c], summary['edges'][c], fill=True, alpha=0.6)
+		display = str(c).replace('_', ' ')
+		ax.set_title(f'Histogram of {display}')
+		ax.set_xlabel(display)
+		ax.set_ylabel('Count')
+		created['created'].append(_save(fig, os.path.join(plots_dir, plot_filename('numeric', c)), dpi, no_save))
+
+	target = roles['target']
+	for c, hist in summary['hist2d'].items():
+		acc = summary['corr'][c]
+		if acc.n < 3:
+			continue
+		fig = mpl_figure.Figure(figsize=(6, 5))
+		ax = fig.subplots()
+		_density_plot(ax, hist, summary['edges'][c], summary['edges'][target], acc)
+		display_x = str(c).replace('_', ' ')
+		display_y = str(target).replace('_', ' ')
+		ax.set_title(f'{display_x} vs {display_y} (r={acc.r:.2f})')
+		ax.set_xlabel(display_x)
+		ax.set_ylabel(display_y)
+		created['corr'].append(_save(fig, os.path.join(plots_dir, plot_filename('correlation', c, target)), dpi, no_save))
+
+	for occ, hist in summary.get('wlb_hist2d', {}).items():
+		acc = summary['wlb'][occ]
+		if acc.n < 5:
+			continue
+		fig = mpl_figure.Figure(figsize=(6, 5))
+		ax = fig.subplots()
+		_density_plot(ax, hist, summary['wlb_edges'], summary['edges'][target], acc)
+		disp_occ = str(occ).replace('_', ' ')
+		ax.set_title(f'Work-life balance index vs {str(target).replace("_", " ")}: {disp_occ}')
+		ax.set_xlabel('Work-life balance index')
+		ax.set_ylabel(str(target).replace('_', ' '))
+		out = os.path.join(plots_dir, plot_filename('wlb_index', roles['occupation'], occ, target))
+		created['wlb'].append(_save(fig, out, dpi, no_save))
+	return created
+
+
+def _print_created(by_group):
+	if by_group['corr']:
+		print('Created correlation plots:')
+		for p in by_group['corr']:
+			print('-', p)
+	if by_group['wlb']:
+		print('Created work-life-balance index plots per occupation:')
+		for p in by_group['wlb']:
+			print('-', p)
+
+	print('Created plots:')
+	for p in by_group['created']:
+		print('-', p)
+
+
+def run_streaming(data_path, plots_dir, chunksize, bins, dpi=100, no_save=False, html_index=True, thumbnails=False):
+	"""`--stream`: summarize the CSV chunk by chunk, write plots_summary.csv and render from the aggregates."""
+	summary = stream_statistics(data_path, chunksize=chunksize, bins=bins)
+	roles = summary['roles']
+	print(f"Streamed {summary['rows']} rows in chunks of {chunksize}")
+	print('Columns:', list(summary['raw']))
+	print('Numeric columns detected:', roles['numeric'])
+
+	rows = stream_summary_rows(summary)
+	out = os.path.join(plots_dir, 'plots_summary.csv')
+	if no_save:
+		print('(no-save) would write', out)
+	else:
+		pd.DataFrame(rows).to_csv(out, index=False)
+		print('Wrote summary statistics to', out)
+	created = render_stream_plots(summary, plots_dir, dpi=dpi, no_save=no_save)
+	_print_created(created)
+	if html_index and not no_save:
+		index = HtmlIndex(plots_dir, HTML_TITLE, pd.DataFrame(rows), thumbnails=thumbnails)
+		for group, outs in created.items():
+			for out in outs:
+				if thumbnails:
+					make_thumbnail(out)
+				index.add(group, out)
+		print('Wrote HTML index:', index.close())
+
+
 def main():
 	parser = argparse.ArgumentParser(description='Plot distributions and correlations from work-life dataset')
 	parser.add_argument('--data-path', default=DATA_PATH, help='Path to the CSV dataset')
 	parser.add_argument('--out-dir', default=None, help='Directory to save plots (defaults to script/plots)')
 	parser.add_argument('--dpi', type=int, default=100, help='DPI for saved plots')
 	parser.add_argument('--no-save', action='store_true', help="Don't write plot files; just print what would be written")
+	parser.add_argument('--force', action='store_true', help='Re-render every plot, even those unchanged since the last run')
+	parser.add_argument('--jobs', type=int, default=None, help='Worker processes for rendering plots (default: one per CPU; 1 renders in-process)')
+	parser.add_argument('--no-cache', action='store_true', help="Always parse the CSV; don't read or write the typed columnar cache next to it")
+	parser.add_argument('--mmap', action='store_true', help='Memory-map the columnar cache (Feather cache, needs pyarrow)')
+	parser.add_argument('--stats-only', action='store_true', help='Only compute summary statistics (correlation matrix, grouped summaries, bootstrap CIs) and write CSV/JSON; no plots')
+	parser.add_argument('--bootstrap', type=int, default=1000, help='Bootstrap resamples for the r confidence intervals (--stats-only)')
+	parser.add_argument('--seed', type=int, default=0, help='Random seed for the bootstrap and --large-mode sample')
+	parser.add_argument('--max-points', type=int, default=DEFAULT_MAX_POINTS, help='Scatter plots with more points than this use --large-mode (0: always draw every point)')
+	parser.add_argument('--large-mode', choices=LARGE_MODES, default='hexbin', help='How to draw large scatter plots: hexbin density or a stratified sample of --max-points points; the regression line always uses all rows')
+	parser.add_argument('--stream', action='store_true', help='Read the CSV in chunks and plot from running aggregates (for files too large for memory)')
+	parser.add_argument('--chunksize', type=int, default=1_000_000, help='Rows per chunk for --stream')
+	parser.add_argument('--bins', type=int, default=50, help='Histogram bins per axis for --stream')
+	parser.add_argument('--no-html', action='store_true', help=f"Don't write the {HTML_INDEX_NAME} page of plots and summary statistics")
+	parser.add_argument('--thumbnails', action='store_true', help=f'Also write small copies of the plots to {THUMBNAIL_DIR}/ (in the render workers) and show those in {HTML_INDEX_NAME}')
 	args = parser.parse_args()
 
 	data_path = args.data_path
 	plots_dir = args.out_dir or DEFAULT_PLOTS_DIR
 	dpi = args.dpi
 	no_save = args.no_save
+	if args.jobs is not None and args.jobs < 1:
+		parser.error('--jobs must be at least 1')
 
 	if not no_save:
 		os.makedirs(plots_dir, exist_ok=True)
 
-	# Try to read the CSV
+	if args.stream:
+		try:
+			run_streaming(data_path, plots_dir, args.chunksize, args.bins, dpi=dpi, no_save=no_save, html_index=not args.no_html, thumbnails=args.thumbnails)
+		except (OSError, ValueError) as e:
+			print(f'Error reading CSV at {data_path}: {e}')
+		return
+
+	# Try to read the CSV (or its typed columnar cache); column names come back stripped
 	try:
-		df = pd.read_csv(data_path)
+		df, source = load_dataset(data_path, use_cache=not args.no_cache, memory_map=args.mmap)
 	except Exception as e:
 		print(f'Error reading CSV at {data_path}: {e}')
 		return
 
-	print('Loaded dataset with shape:', df.shape)
+	print('Loaded dataset with shape:', df.shape, '(from cache)' if source == 'cache' else '')
 	print('Columns:', list(df.columns))
 
-	# Basic cleaning of column names
-	df.columns = [str(c).strip() for c in df.columns]
+	# One schema profile (column roles, dtypes, cardinalities) serves every stage below
+	profile = load_profile(df, data_path, use_cache=not args.no_cache)
+	roles = profile['roles']
 
 	# Find gender and occupation columns with common keywords
-	gender_col = find_column(df, ['gender', 'sex'])
-	occupation_col = find_column(df, ['occupation', 'job', 'occupation type', 'work type'])
+	gender_col = roles['gender']
+	occupation_col = roles['occupation']
 
-	created = []
+	# Plan every plot first (adding any derived columns to df), then render them all at once
+	jobs = []
+	fits = rows = None
+	large = {'max_points': args.max_points, 'large_mode': args.large_mode, 'seed': args.seed}
 
 	if gender_col:
 		print('Found gender column:', gender_col)
-		created.append(plot_categorical(df, gender_col, plots_dir, dpi=dpi, no_save=no_save))
+		jobs.append(plot_job('categorical', 'created', gender_col))
 	else:
 		print('No gender/sex column detected automatically.')
 
 	if occupation_col:
 		print('Found occupation column:', occupation_col)
-		created.append(plot_categorical(df, occupation_col, plots_dir, dpi=dpi, no_save=no_save))
+		jobs.append(plot_job('categorical', 'created', occupation_col))
 	else:
 		print('No occupation/job column detected automatically.')
 
 	# Numeric columns: plot distribution for each (exclude id)
-	numeric_cols = [c for c in df.columns if pd.api.types.is_numeric_dtype(df[c]) and str(c).lower() != 'id']
+	numeric_cols = [c for c in profile_columns(profile, numeric=True) if str(c).lower() != 'id']
 	if numeric_cols:
 		print('Numeric columns detected:', numeric_cols)
 		for c in numeric_cols:
-			created.append(plot_numeric(df, c, plots_dir, dpi=dpi, no_save=no_save))
+			jobs.append(plot_job('numeric', 'created', c))
 	else:
-		# Try to coerce columns to numeric and retry
+		# Try to coerce columns to numeric and retry (only those the profile found numeric-like)
 		coerced = []
-		for c in df.columns:
+		for c in [col['name'] for col in profile['columns'] if col['coercible'] > 0 and col['nunique'] > 1]:
 			coerced_col = pd.to_numeric(df[c], errors='coerce')
 			if coerced_col.notna().sum() > 0 and coerced_col.nunique() > 1:
 				df[c + '_coerced_num'] = coerced_col
@@ -170,33 +1467,21 @@ def main():
 		if coerced:
 			print('Coerced numeric-like columns:', coerced)
 			for c in coerced:
-				created.append(plot_numeric(df, c, plots_dir, dpi=dpi, no_save=no_save))
+				jobs.append(plot_job('numeric', 'created', c))
 		else:
 			print('No numeric columns found to plot.')
 
 	# For non-numeric columns other than gender/occupation, plot top categories
-	other_object_cols = [c for c in df.select_dtypes(include=['object', 'category']).columns if c not in (gender_col, occupation_col)]
-	for c in other_object_cols:
-		# only plot if not too many unique values
-		if df[c].nunique(dropna=False) <= 30:
-			plt.figure(figsize=(8, 5))
-			order = df[c].value_counts(dropna=False).index
-			sns.countplot(data=df, x=c, order=order)
-			plt.xticks(rotation=45, ha='right')
-			display = str(c).replace('_', ' ')
-			plt.title(f'Distribution of {display}')
-			plt.tight_layout()
-			out = os.path.join(plots_dir, f'{safe_fname(c)}_distribution.png')
-			if no_save:
-				print('(no-save) would write', out)
-			else:
-				plt.savefig(out, dpi=dpi)
-			plt.close()
-			created.append(out)
+	other_object_cols = [c for c in profile_columns(profile, categorical=True) if c not in (gender_col, occupation_col)]
+	for col in profile['columns']:
+		# only plot if not too many unique values (more than 30 in the sample settles it)
+		if col['name'] in other_object_cols and col['nunique'] <= 30:
+			if col['nunique_exact'] or df[col['name']].nunique(dropna=False) <= 30:
+				jobs.append(plot_job('categorical', 'created', col['name']))
 
 	# Create correlation plots for columns 4-7 (1-based) vs age_at_death
 	# Use positional selection to satisfy the user's request: columns 4-7 correspond to indices 3..6
-	target_col = find_column(df, ['age_at_death', 'age at death', 'age'])
+	target_col = roles['target']
 	if target_col is None:
 		print('Could not detect age/age_at_death column for correlation plots.')
 	else:
@@ -212,86 +1497,69 @@ def main():
 		except Exception:
 			cols_for_corr = [c for c in numeric_cols if c != target_col]
 
-		corr_created = []
 		for c in cols_for_corr:
 			# ensure column is numeric or coercible
 			if not pd.api.types.is_numeric_dtype(df[c]):
 				coerced = pd.to_numeric(df[c], errors='coerce')
 				if coerced.notna().sum() < 3:
 					continue
-				df['_tmp_coerced'] = coerced
-				src_col = '_tmp_coerced'
+				# one column per source: the plots are rendered after planning finishes
+				src_col = c + '_coerced_num'
+				df[src_col] = coerced
 			else:
 				src_col = c
-			out = plot_correlation(df, src_col, target_col, plots_dir, dpi=dpi, no_save=no_save)
-			if out:
-				corr_created.append(out)
-		if corr_created:
-			print('Created correlation plots:')
-			for p in corr_created:
-				print('-', p)
+			jobs.append(plot_job('correlation', 'corr', src_col, target_col, **large))
 
 		# --- Work-life balance index: compute and plot per occupation type ---
 		# Identify columns for work/rest/sleep/exercise
-		work_col = find_column(df, ['work', 'work_hours', 'work_hours_per_day', 'avg_work'])
-		rest_col = find_column(df, ['rest', 'rest_hours', 'avg_rest'])
-		sleep_col = find_column(df, ['sleep', 'sleep_hours', 'avg_sleep'])
-		exercise_col = find_column(df, ['exercise', 'exercise_hours', 'avg_exercise'])
+		work_col, rest_col, sleep_col, exercise_col = (roles[r] for r in ('work', 'rest', 'sleep', 'exercise'))
 
 		if not all([work_col, rest_col, sleep_col, exercise_col, target_col, occupation_col]):
 			print('Could not compute work-life balance index — missing one of required columns:')
 			print('work_col, rest_col, sleep_col, exercise_col, target_col, occupation_col ->',
 				  work_col, rest_col, sleep_col, exercise_col, target_col, occupation_col)
 		else:
-			# Coerce numeric
-			df['_w'] = pd.to_numeric(df[work_col], errors='coerce')
-			df['_r'] = pd.to_numeric(df[rest_col], errors='coerce')
-			df['_s'] = pd.to_numeric(df[sleep_col], errors='coerce')
-			df['_e'] = pd.to_numeric(df[exercise_col], errors='coerce')
-
-			# compute index: (rest + sleep + exercise) / (rest + sleep + exercise + work)
-			df['work_life_balance_index'] = (
-				df['_r'].fillna(0) + df['_s'].fillna(0) + df['_e'].fillna(0)
-			) / (
-				(df['_r'].fillna(0) + df['_s'].fillna(0) + df['_e'].fillna(0)) + df['_w'].fillna(0)
-			)
-
-			# replace infinities and NaN with NaN
-			df['work_life_balance_index'].replace([np.inf, -np.inf], np.nan, inplace=True)
-
-			# For each occupation, create a scatter+regression plot of index vs age_at_death
-			occs = df[occupation_col].dropna().unique()
-			wl_created = []
-			for occ in occs:
-				sub = df[df[occupation_col] == occ]
-				sub = sub[[ 'work_life_balance_index', target_col]].dropna()
-				if sub.shape[0] < 5:
-					continue
-				plt.figure(figsize=(6, 5))
-				sns.regplot(x=sub['work_life_balance_index'], y=sub[target_col], scatter_kws={'s': 20, 'alpha': 0.6}, line_kws={'color': 'red'})
-				disp_occ = str(occ).replace('_', ' ')
-				plt.title(f'Work-life balance index vs {str(target_col).replace("_", " ")}: {disp_occ}')
-				plt.xlabel('Work-life balance index')
-				plt.ylabel(str(target_col).replace('_', ' '))
-				plt.tight_layout()
-				out = os.path.join(plots_dir, f'work_life_balance_index_vs_{safe_fname(target_col)}_by_{safe_fname(occ)}.png')
-				if no_save:
-					print('(no-save) would write', out)
-				else:
-					plt.savefig(out, dpi=dpi)
-				plt.close()
-				wl_created.append(out)
-
-			if wl_created:
-				print('Created work-life-balance index plots per occupation:')
-				for p in wl_created:
-					print('-', p)
+			# index in one vectorized pass, then one groupby for every occupation's rows and fit
+			df[WLB_COL] = wlb_index(df[rest_col], df[sleep_col], df[exercise_col], df[work_col])
+			fits, rows = wlb_groups(df, occupation_col, target_col)
+			for occ, fit in fits.iterrows():
+				jobs.append(plot_job('wlb_index', 'wlb', occupation_col, occ, target_col, rows[occ], fit.to_dict(), **large))
 
-	print('Created plots:')
-	for p in [p for p in created if p]:
-		print('-', p)
+	if args.stats_only:
+		stat_cols = numeric_cols or [c for c in df.columns if str(c).endswith('_coerced_num')]
+		stats = compute_statistics(
+			df, stat_cols, target_col, gender_col, occupation_col,
+			fits=fits, rows=rows, n_boot=args.bootstrap, seed=args.seed,
+		)
+		print('Wrote statistics:')
+		for p in write_statistics(stats, plots_dir, no_save=no_save):
+			print('-', p)
+		return
+
+	index = on_done = None
+	if not no_save and not args.no_html:
+		# the page is rewritten as plots finish, so it can be opened while they render
+		stat_cols = numeric_cols or [c for c in df.columns if str(c).endswith('_coerced_num')]
+		numeric = df[stat_cols].apply(pd.to_numeric, errors='coerce').astype('float64')
+		target = pd.to_numeric(df[target_col], errors='coerce') if target_col is not None else None
+		index = HtmlIndex(plots_dir, HTML_TITLE, numeric_summary(numeric, target, target_col), thumbnails=args.thumbnails)
+		on_done = lambda i, out: index.add(jobs[i]['group'], out, i)
+
+	if no_save:
+		outputs = render_plots(df, jobs, plots_dir, dpi=dpi, no_save=True, n_jobs=args.jobs)
+	else:
+		outputs, skipped = render_cached(df, jobs, plots_dir, dpi=dpi, n_jobs=args.jobs, force=args.force, thumbnails=args.thumbnails, on_done=on_done)
+		if skipped:
+			print(f'Skipped {skipped} of {len(jobs)} plots unchanged since the last run (use --force to re-render)')
+	by_group = {'created': [], 'corr': [], 'wlb': []}
+	for job, out in zip(jobs, outputs):
+		if out:
+			by_group[job['group']].append(out)
+
+	_print_created(by_group)
+	if index is not None:
+		print('Wrote HTML index:', index.close())
 
 
 if __name__ == '__main__':
 	main()
-
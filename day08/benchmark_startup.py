@@ -0,0 +1,89 @@
+"""
+Time the startup cost of `Work life balance vs longevity.py`.
+
+Each scenario runs the script in a fresh interpreter `--rounds` times and
+reports min/median wall time:
+- `--help`: argument parsing only, no data libraries should be imported
+- `--no-save`: loads the dataset and plans every plot without drawing any
+- full run: renders every plot (`--force`, into a temporary directory)
+
+For reference it also times a bare `import pandas, numpy, matplotlib, seaborn`,
+the cost every invocation paid before the imports became lazy, and lists the
+slowest top-level imports of each scenario from `python -X importtime`.
+
+Usage:
+  python benchmark_startup.py [--data-path data.csv] [--rounds 5] [--jobs 1]
+"""
+import os
+import re
+import sys
+import argparse
+import tempfile
+import statistics
+import subprocess
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+SCRIPT = os.path.join(HERE, 'Work life balance vs longevity.py')
+DATASET = os.path.join(HERE, 'work life balance-longevity dataset.csv')
+EAGER_IMPORTS = 'import matplotlib; matplotlib.use("Agg"); import pandas, numpy, seaborn'
+
+
+def scenarios(data_path, out_dir, jobs):
+	"""Scenario name -> argv (without the interpreter)."""
+	common = ['--data-path', data_path, '--out-dir', out_dir, '--jobs', str(jobs)]
+	return {
+		'eager imports': ['-c', EAGER_IMPORTS],
+		'--help': [SCRIPT, '--help'],
+		'--no-save': [SCRIPT, '--no-save', *common],
+		'full run': [SCRIPT, '--force', *common],
+	}
+
+
+def time_run(argv, rounds):
+	times = []
+	for _ in range(rounds):
+		start = time.perf_counter()
+		subprocess.run([sys.executable, *argv], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+		times.append(time.perf_counter() - start)
+	return times
+
+
+def slowest_imports(argv, top=5):
+	"""(cumulative seconds, module) of the `top` slowest top-level imports, from `-X importtime`."""
+	proc = subprocess.run([sys.executable, '-X', 'importtime', *argv], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+	found = []
+	for line in proc.stderr.splitlines():
+		# "import time: self [us] | cumulative | imported package"; nested imports are indented
+		m = re.match(r'import time:\s+\d+ \|\s+(\d+) \| (\S.*)$', line)
+		if m:
+			found.append((int(m.group(1)) / 1e6, m.group(2)))
+	return sorted(found, reverse=True)[:top]
+
+
+def main():
+	parser = argparse.ArgumentParser(description='Benchmark the startup time of the work-life balance script')
+	parser.add_argument('--data-path', default=DATASET, help='CSV to run the script on')
+	parser.add_argument('--rounds', type=int, default=5, help='Runs per scenario')
+	parser.add_argument('--jobs', type=int, default=1, help='--jobs passed to the script')
+	parser.add_argument('--imports', type=int, default=5, help='Slowest imports to list per scenario (0 to skip)')
+	args = parser.parse_args()
+
+	with tempfile.TemporaryDirectory() as out_dir:
+		runs = scenarios(args.data_path, out_dir, args.jobs)
+		# warm the OS file cache and the script's data/schema caches first
+		subprocess.run([sys.executable, *runs['--no-save']], check=True, stdout=subprocess.DEVNULL)
+		print(f"{'scenario':<14} {'min s':>7} {'median s':>9} {'rounds':>6}")
+		for name, argv in runs.items():
+			times = time_run(argv, args.rounds)
+			print(f'{name:<14} {min(times):>7.3f} {statistics.median(times):>9.3f} {len(times):>6}')
+		if args.imports:
+			for name, argv in runs.items():
+				if name == 'full run':
+					continue
+				listed = ', '.join(f'{module} {s:.3f}s' for s, module in slowest_imports(argv, args.imports))
+				print(f'{name}: {listed}')
+
+
+if __name__ == '__main__':
+	main()
@@ -0,0 +1,426 @@
+# test_work_life_balance.py
+
+import importlib.util
+import os
+import subprocess
+import sys
+import warnings
+from pathlib import Path
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+np = pytest.importorskip("numpy")
+pytest.importorskip("matplotlib")
+pytest.importorskip("seaborn")
+
+HERE = Path(__file__).parent
+DATASET = HERE / "work life balance-longevity dataset.csv"
+
+# the script's file name has spaces, so it can't be imported by name
+_spec = importlib.util.spec_from_file_location("work_life_balance", HERE / "Work life balance vs longevity.py")
+wlb = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(wlb)
+
+
+@pytest.fixture(scope="module")
+def df():
+    return pd.read_csv(DATASET)
+
+
+# -----------------------------
+# Tests for streaming statistics
+# -----------------------------
+
+def test_running_stats_skip_nan_and_merge_batches():
+    values = np.array([1.0, 2.0, np.nan, 4.0, 8.0, 16.0])
+    st = wlb.RunningStats()
+    st.update(values[:2])
+    st.update(values[2:])
+    clean = values[~np.isnan(values)]
+    assert st.n == 5
+    assert st.mean == pytest.approx(clean.mean())
+    assert st.std == pytest.approx(clean.std(ddof=1))
+    assert (st.min, st.max) == (1.0, 16.0)
+
+def test_running_corr_line_matches_polyfit():
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=500)
+    y = 3 * x + rng.normal(size=500)
+    acc = wlb.RunningCorr()
+    for i in range(0, 500, 70):
+        acc.update(x[i:i + 70], y[i:i + 70])
+    slope, intercept = acc.line()
+    assert (slope, intercept) == pytest.approx(tuple(np.polyfit(x, y, 1)))
+    assert acc.r == pytest.approx(np.corrcoef(x, y)[0, 1])
+
+def test_stream_statistics_match_in_memory(df):
+    summary = wlb.stream_statistics(DATASET, chunksize=777, bins=20)
+    assert summary["rows"] == len(df)
+    for c in summary["roles"]["numeric"]:
+        st = summary["stats"][c]
+        assert st.n == df[c].count()
+        assert st.mean == pytest.approx(df[c].mean())
+        assert st.std == pytest.approx(df[c].std())
+        assert summary["hist"][c].sum() == df[c].count()
+        assert summary["median"][c] == df[c].median()
+        assert summary["corr"][c].r == pytest.approx(df[c].corr(df["age_at_death"]))
+    assert summary["counts"]["occupation_type"].sort_index().to_dict() == df["occupation_type"].value_counts().sort_index().to_dict()
+
+@pytest.mark.parametrize("values", [[5.0, 1.0, 3.0, 9.0, 9.0], [2.0, 2.0, 2.0, 2.0], [0.1, 0.7, 0.3, 0.9, float("nan"), 0.5, 0.2]])
+def test_stream_median_is_exact(tmp_path, values):
+    csv = tmp_path / "data.csv"
+    pd.DataFrame({"x": values, "age_at_death": range(len(values))}).to_csv(csv, index=False)
+    summary = wlb.stream_statistics(str(csv), chunksize=2, bins=3)
+    assert summary["median"]["x"] == pd.Series(values).median()
+
+def test_stream_roles_keep_text_columns_of_every_string_dtype():
+    chunk = pd.DataFrame({
+        "plain": pd.Series(["a", "b"], dtype=object),
+        "text": pd.Series(["c", "d"], dtype="string"),
+        "kind": pd.Series(["e", "f"], dtype="category"),
+        "age_at_death": [70.0, 80.0],
+    })
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        roles = wlb._stream_roles(chunk, list(chunk.columns))["roles"]
+    assert roles["categorical"] == ["plain", "text", "kind"]
+
+def test_stream_wlb_fits_match_per_occupation(df):
+    summary = wlb.stream_statistics(DATASET, chunksize=1000)
+    index = wlb.wlb_index(df["avg_rest_hours_per_day"], df["avg_sleep_hours_per_day"], df["avg_exercise_hours_per_day"], df["avg_work_hours_per_day"])
+    for occ, acc in summary["wlb"].items():
+        mask = df["occupation_type"] == occ
+        assert acc.r == pytest.approx(np.corrcoef(index[mask], df.loc[mask, "age_at_death"])[0, 1])
+
+
+# -----------------------------
+# Tests for the columnar data cache
+# -----------------------------
+
+def test_load_dataset_uses_cache_until_csv_changes(tmp_path, df):
+    pytest.importorskip("pyarrow")
+    csv = tmp_path / "data.csv"
+    df.head(200).to_csv(csv, index=False)
+
+    first, source = wlb.load_dataset(str(csv))
+    assert source == "csv"
+    assert str(first["occupation_type"].dtype) == "category"
+    assert first["avg_work_hours_per_day"].dtype == np.float64
+
+    cached, source = wlb.load_dataset(str(csv))
+    assert source == "cache"
+    pd.testing.assert_frame_equal(cached, first)
+
+    df.head(150).to_csv(csv, index=False)
+    changed, source = wlb.load_dataset(str(csv))
+    assert source == "csv" and len(changed) == 150
+
+def test_load_dataset_keeps_cache_when_csv_only_touched(tmp_path, df):
+    pytest.importorskip("pyarrow")
+    csv = tmp_path / "data.csv"
+    df.head(50).to_csv(csv, index=False)
+    wlb.load_dataset(str(csv))
+    stat = csv.stat()
+    os.utime(csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert wlb.load_dataset(str(csv))[1] == "cache"
+
+def test_load_dataset_without_pyarrow_never_reads_a_pickle(tmp_path, df, monkeypatch, capsys):
+    monkeypatch.setattr(wlb, "_has_pyarrow", lambda: False)
+    csv = tmp_path / "data.csv"
+    df.head(50).to_csv(csv, index=False)
+    df.head(10).to_pickle(tmp_path / "data.csv.cache.pkl")
+    for _ in range(2):
+        loaded, source = wlb.load_dataset(str(csv))
+        assert source == "csv" and len(loaded) == 50
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data.csv", "data.csv.cache.pkl"]
+    assert "pyarrow is not installed" in capsys.readouterr().out
+    wlb.load_dataset(str(csv), use_cache=False)
+    assert capsys.readouterr().out == ""
+
+def test_typed_csv_keeps_float_values_exact(tmp_path, df):
+    csv = tmp_path / "data.csv"
+    df.to_csv(csv, index=False)
+    typed = wlb.read_csv_typed(str(csv))
+    plain = pd.read_csv(csv)
+    floats = plain.select_dtypes("float").columns
+    assert len(floats)
+    pd.testing.assert_frame_equal(typed[floats], plain[floats])
+    assert (typed[floats].median() == plain[floats].median()).all()
+
+
+# -----------------------------
+# Tests for the work-life balance index and per-occupation fits
+# -----------------------------
+
+def test_wlb_index_treats_missing_hours_as_zero():
+    nan = float("nan")
+    index = wlb.wlb_index(pd.Series([2, nan, 0]), pd.Series([4, 8, 0]), pd.Series([2, nan, 0]), pd.Series([8, 8, nan]))
+    assert index[0] == pytest.approx(0.5)
+    assert index[1] == pytest.approx(0.5)
+    assert np.isnan(index[2])
+
+def test_wlb_groups_fit_every_occupation_in_one_pass(df):
+    frame = df.copy()
+    frame[wlb.WLB_COL] = wlb.wlb_index(frame["avg_rest_hours_per_day"], frame["avg_sleep_hours_per_day"], frame["avg_exercise_hours_per_day"], frame["avg_work_hours_per_day"])
+    fits, rows = wlb.wlb_groups(frame, "occupation_type", "age_at_death")
+    assert list(fits.index) == list(frame["occupation_type"].unique())
+    for occ, fit in fits.iterrows():
+        sub = frame[frame["occupation_type"] == occ]
+        assert sorted(rows[occ]) == sorted(np.flatnonzero(frame["occupation_type"] == occ))
+        slope, intercept = np.polyfit(sub[wlb.WLB_COL], sub["age_at_death"], 1)
+        assert (fit["slope"], fit["intercept"]) == pytest.approx((slope, intercept))
+        assert fit["r"] == pytest.approx(np.corrcoef(sub[wlb.WLB_COL], sub["age_at_death"])[0, 1])
+
+
+# -----------------------------
+# Tests for --stats-only statistics
+# -----------------------------
+
+def test_bootstrap_corr_ci_brackets_r_and_is_reproducible():
+    rng = np.random.default_rng(1)
+    x = rng.normal(size=300)
+    y = 0.5 * x + rng.normal(size=300)
+    r = np.corrcoef(x, y)[0, 1]
+    low, high = wlb.bootstrap_corr_ci(x, y, n_boot=500, seed=3)
+    assert low < r < high
+    assert (low, high) == wlb.bootstrap_corr_ci(x, y, n_boot=500, seed=3)
+
+def test_bootstrap_batches_give_same_result(monkeypatch):
+    x = np.arange(50, dtype=float)
+    y = x ** 1.5
+    whole = wlb.bootstrap_corr_ci(x, y, n_boot=200, seed=0)
+    monkeypatch.setattr(wlb, "BOOTSTRAP_BATCH_ELEMENTS", 50 * 7)
+    assert wlb.bootstrap_corr_ci(x, y, n_boot=200, seed=0) == pytest.approx(whole)
+
+def test_compute_statistics_matches_pandas(df):
+    cols = ["avg_work_hours_per_day", "avg_sleep_hours_per_day", "age_at_death"]
+    stats = wlb.compute_statistics(df, cols, "age_at_death", gender_col="gender", n_boot=50)
+    pd.testing.assert_frame_equal(stats["correlation_matrix"], df[cols].corr())
+    summary = stats["summary_by_gender"].set_index(["gender", "column"])
+    expected = df.groupby("gender")["avg_work_hours_per_day"]
+    assert summary.loc[("Male", "avg_work_hours_per_day"), "mean"] == pytest.approx(expected.mean()["Male"])
+    assert summary.loc[("Male", "avg_work_hours_per_day"), "corr_with_age_at_death"] == pytest.approx(
+        expected.corr(df["age_at_death"])["Male"])
+    assert list(stats["plots_summary"]["column"]) == cols
+
+
+# -----------------------------
+# Tests for large scatter plots
+# -----------------------------
+
+def test_linear_fit_matches_polyfit():
+    x = np.array([0.0, 1.0, 2.0, np.nan, 4.0])
+    y = np.array([1.0, 3.2, 4.9, 2.0, 9.1])
+    fit = wlb.linear_fit(x, y)
+    ok = ~np.isnan(x)
+    assert (fit["slope"], fit["intercept"]) == pytest.approx(tuple(np.polyfit(x[ok], y[ok], 1)))
+    assert fit["n"] == 4
+
+def test_stratified_sample_thins_dense_cells_and_keeps_outliers():
+    rng = np.random.default_rng(0)
+    x = np.concatenate([rng.normal(0, 0.1, 20000), [5.0, -5.0]])
+    y = np.concatenate([rng.normal(0, 0.1, 20000), [5.0, -5.0]])
+    keep = wlb.stratified_sample(x, y, 1000)
+    assert len(keep) <= 1000
+    assert {20000, 20001} <= set(keep)
+    assert list(keep) == sorted(set(keep))
+
+@pytest.mark.parametrize("mode", wlb.LARGE_MODES)
+def test_plot_correlation_large_mode_writes_png(df, tmp_path, mode):
+    out = wlb.plot_correlation(df, "avg_work_hours_per_day", "age_at_death", str(tmp_path), max_points=500, large_mode=mode)
+    assert Path(out).stat().st_size > 0
+
+
+# -----------------------------
+# Tests for the schema profile
+# -----------------------------
+
+def test_detect_roles_matches_find_column(df):
+    roles = wlb.detect_roles(df.columns)
+    for role, keywords in wlb.ROLE_KEYWORDS.items():
+        assert roles[role] == wlb.find_column(df, keywords)
+    assert roles["target"] == "age_at_death"
+    assert roles["occupation"] == "occupation_type"
+
+def test_load_profile_is_cached_until_csv_changes(tmp_path, df):
+    csv = tmp_path / "data.csv"
+    df.head(100).to_csv(csv, index=False)
+    frame = pd.read_csv(csv)
+    profile = wlb.load_profile(frame, str(csv))
+    assert (tmp_path / "data.csv.schema.json").exists()
+    assert "age_at_death" in wlb.profile_columns(profile, numeric=True)
+    assert wlb.profile_columns(profile, categorical=True) == ["gender", "occupation_type"]
+    assert wlb.load_profile(frame, str(csv)) == profile
+
+    df.head(60).to_csv(csv, index=False)
+    assert wlb.load_profile(pd.read_csv(csv), str(csv))["rows"] == 60
+
+
+# -----------------------------
+# Tests for lazy imports
+# -----------------------------
+
+def test_help_and_import_skip_heavy_libraries():
+    code = (
+        "import importlib.util, sys\n"
+        "spec = importlib.util.spec_from_file_location('m', sys.argv[1])\n"
+        "m = importlib.util.module_from_spec(spec)\n"
+        "spec.loader.exec_module(m)\n"
+        "sys.argv = ['m', '--help']\n"
+        "try:\n"
+        "    m.main()\n"
+        "except SystemExit:\n"
+        "    pass\n"
+        "print(sorted({'pandas', 'numpy', 'matplotlib', 'seaborn'} & set(sys.modules)))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code, str(HERE / "Work life balance vs longevity.py")],
+                         check=True, capture_output=True, text=True).stdout
+    assert out.strip().splitlines()[-1] == "[]"
+
+def test_no_save_plans_plots_without_drawing(df, tmp_path, capsys):
+    out = wlb.plot_categorical(df, "gender", str(tmp_path), no_save=True)
+    assert out == str(tmp_path / "gender_distribution.png")
+    assert "would write" in capsys.readouterr().out
+    assert not (tmp_path / "gender_distribution.png").exists()
+    assert wlb.plot_correlation(df.head(2), "avg_work_hours_per_day", "age_at_death", str(tmp_path), no_save=True) is None
+
+
+
+# -----------------------------
+# Tests for render_plots / --jobs
+# -----------------------------
+
+PLOT_JOBS = [
+    ("categorical", "created", "gender"),
+    ("numeric", "created", "age_at_death"),
+    ("correlation", "corr", "avg_work_hours_per_day", "age_at_death"),
+]
+
+def test_render_plots_in_pool_matches_in_process(df, tmp_path, monkeypatch):
+    # the pool pickles render_job by module name
+    monkeypatch.setitem(sys.modules, wlb.__name__, wlb)
+    jobs = [wlb.plot_job(*job) for job in PLOT_JOBS]
+    (tmp_path / "serial").mkdir()
+    (tmp_path / "pooled").mkdir()
+    done = []
+    serial = wlb.render_plots(df, jobs, str(tmp_path / "serial"), dpi=30, n_jobs=1)
+    pooled = wlb.render_plots(df, jobs, str(tmp_path / "pooled"), dpi=30, n_jobs=2, on_done=lambda i, out: done.append(i))
+    assert [Path(p).name for p in pooled] == [Path(p).name for p in serial]
+    assert all(Path(p).stat().st_size > 0 for p in pooled)
+    assert sorted(done) == [0, 1, 2]
+
+def test_render_plots_no_save_runs_in_process_in_order(df, tmp_path, monkeypatch, capsys):
+    def no_pool(*args, **kwargs):
+        raise AssertionError("--no-save should not start a process pool")
+
+    monkeypatch.setattr(wlb, "ProcessPoolExecutor", no_pool)
+    jobs = [wlb.plot_job(*job) for job in PLOT_JOBS]
+    outputs = wlb.render_plots(df, jobs, str(tmp_path), no_save=True, n_jobs=4)
+    printed = [line.split()[-1] for line in capsys.readouterr().out.splitlines()]
+    assert printed == outputs
+    assert not any(tmp_path.iterdir())
+
+def test_jobs_cli_works_with_spawn(df, tmp_path):
+    data = tmp_path / "sample.csv"
+    df.head(300).to_csv(data, index=False)
+    # run the script as __main__ with the spawn start method (the macOS/Windows default)
+    code = (
+        "import multiprocessing, runpy, sys\n"
+        "multiprocessing.set_start_method('spawn')\n"
+        "sys.argv = sys.argv[1:]\n"
+        "runpy.run_path(sys.argv[0], run_name='__main__')\n"
+    )
+    args = ["--data-path", str(data), "--no-cache", "--no-html", "--dpi", "30"]
+    script = str(HERE / "Work life balance vs longevity.py")
+    for jobs, out in (("2", "spawn"), ("1", "serial")):
+        subprocess.run([sys.executable, "-c", code, script, *args, "--jobs", jobs, "--out-dir", str(tmp_path / out)],
+                       check=True, capture_output=True, text=True)
+    spawned = sorted(p.name for p in (tmp_path / "spawn").glob("*.png"))
+    assert spawned and spawned == sorted(p.name for p in (tmp_path / "serial").glob("*.png"))
+
+
+
+# -----------------------------
+# Tests for the plot manifest (render_cached)
+# -----------------------------
+
+@pytest.fixture
+def small_df(df):
+    return df.head(200).copy()
+
+def _render_cached(frame, plots_dir, **kwargs):
+    jobs = [wlb.plot_job(*job) for job in PLOT_JOBS]
+    return wlb.render_cached(frame, jobs, str(plots_dir), dpi=30, n_jobs=1, **kwargs)
+
+def _mtimes(plots_dir):
+    return {p.name: p.stat().st_mtime_ns for p in plots_dir.glob("*.png")}
+
+def test_render_cached_skips_unchanged_plots(small_df, tmp_path):
+    outputs, skipped = _render_cached(small_df, tmp_path)
+    assert skipped == 0 and all(Path(out).exists() for out in outputs)
+    before = _mtimes(tmp_path)
+    assert _render_cached(small_df, tmp_path) == (outputs, len(PLOT_JOBS))
+    assert _mtimes(tmp_path) == before
+
+def test_render_cached_rerenders_only_plots_whose_data_changed(small_df, tmp_path):
+    _render_cached(small_df, tmp_path)
+    changed = small_df.copy()
+    changed.loc[changed.index[0], "age_at_death"] = changed["age_at_death"].max() + 10
+    before = _mtimes(tmp_path)
+    _, skipped = _render_cached(changed, tmp_path)
+    assert skipped == 1  # only the gender plot doesn't read age_at_death
+    after = _mtimes(tmp_path)
+    assert after["gender_distribution.png"] == before["gender_distribution.png"]
+    assert after["age_at_death_hist.png"] != before["age_at_death_hist.png"]
+
+def test_render_cached_rerenders_after_library_upgrade(small_df, tmp_path, monkeypatch):
+    _render_cached(small_df, tmp_path)
+    versions = wlb._library_versions()
+    monkeypatch.setattr(wlb, "_library_versions", lambda: {**versions, "matplotlib": "99.0"})
+    assert _render_cached(small_df, tmp_path)[1] == 0
+
+def test_render_cached_force_ignores_manifest(small_df, tmp_path):
+    _render_cached(small_df, tmp_path)
+    assert _render_cached(small_df, tmp_path, force=True)[1] == 0
+    assert _render_cached(small_df, tmp_path)[1] == len(PLOT_JOBS)
+
+def test_render_cached_rerenders_deleted_or_replaced_png(small_df, tmp_path):
+    outputs, _ = _render_cached(small_df, tmp_path)
+    Path(outputs[0]).unlink()
+    # same size, different bytes
+    replaced = Path(outputs[1])
+    data = bytearray(replaced.read_bytes())
+    data[-1] ^= 0xFF
+    replaced.write_bytes(bytes(data))
+    _, skipped = _render_cached(small_df, tmp_path)
+    assert skipped == len(PLOT_JOBS) - 2
+    assert Path(outputs[0]).exists()
+    assert Path(outputs[1]).read_bytes() != bytes(data)
+
+
+# -----------------------------
+# Tests for the HTML index
+# -----------------------------
+
+def test_html_index_links_plots_in_planned_order(tmp_path):
+    summary = pd.DataFrame({"column": ["age_at_death"], "n": [3], "mean": [70.0]})
+    index = wlb.HtmlIndex(str(tmp_path), "Plots & more", summary, min_interval=0)
+    index.add("wlb", str(tmp_path / "by Teacher.png"), position=2)
+    page = (tmp_path / "index.html").read_text()
+    assert 'http-equiv="refresh"' in page and "by%20Teacher.png" in page
+    index.add("created", str(tmp_path / "a_hist.png"), position=1)
+    index.add("created", None, position=0)
+    page = Path(index.close()).read_text()
+    assert "refresh" not in page and "<script" not in page and "base64" not in page
+    assert "Plots &amp; more" in page and "<td>age_at_death</td>" in page
+    assert page.index("Distributions") < page.index("a_hist.png") < page.index("by%20Teacher.png")
+    assert page.count("<figure>") == 2
+
+def test_make_thumbnail_scales_down_and_is_reused(df, tmp_path):
+    out = wlb.plot_categorical(df, "gender", str(tmp_path))
+    thumb = wlb.make_thumbnail(out, scale=0.25)
+    assert Path(thumb).parent.name == wlb.THUMBNAIL_DIR
+    assert Path(thumb).stat().st_size < Path(out).stat().st_size
+    mtime = Path(thumb).stat().st_mtime_ns
+    assert wlb.make_thumbnail(out) == thumb and Path(thumb).stat().st_mtime_ns == mtime
@@ -0,0 +1,333 @@
+("""Benchmark `progress_report.py` on a large synthetic subjects file.
+
+Default mode compares peak memory (max RSS) and wall time of the list-of-dicts
+path (`load_subjects()` + the report functions), the streaming path
+(`iter_subjects()` + `summarize_subjects()`) and the columnar path
+(`load_subjects_table()` + the same report functions). Each approach runs in
+its own subprocess so the RSS numbers don't contaminate each other.
+
+With `--suite`, instead times every hot path on its own (parsing, streaming
+summary, table load, title classification, completeness report, late
+classification, XLSX export): each stage runs `--rounds` times and is reported
+pytest-benchmark style (min/mean/stddev/median), plus its peak traced memory.
+
+With `--classify`, instead runs a micro-benchmark of the assignment-title
+classifier (uncached vs the memoized `classify_assignment()`).
+
+With `--xlsx`, instead compares the export as it was before the write-only
+path (`export_report_xlsx_previous()`: in-memory workbook, then a second pass
+re-parsing every Students cell to colour it) with `export_report_xlsx()`
+building a regular in-memory workbook and in its default write-only mode.
+
+The synthetic data can be shaped with `--students`, `--days`, `--malformed`
+(fraction of unparsable lines) and `--variants` (number of title spellings).
+
+Usage:
+  python3 benchmark_progress_report.py [--rows 2000000] [--students 500]
+  python3 benchmark_progress_report.py --suite --rows 200000 --malformed 0.01 --rounds 5
+  python3 benchmark_progress_report.py --classify [--rows 200000]
+  python3 benchmark_progress_report.py --xlsx --students 10000 --rows 80000
+""")
+
+from __future__ import annotations
+
+import argparse
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import progress_report as pr
+
+
+# title spellings seen in the real subjects.txt, most common first
+TITLE_TEMPLATES = [
+	"Day{day:02d} by {name}",
+	"day{day:02d} by {name}",
+	"Day {day:02d} {name}",
+	"Day{day:02d} - {name}",
+	"Final Project proposal by {name}",
+	"Day{day} By {name}",
+	"day {day:02d}-{name}",
+	"Day{day:02d} and Day{next_day:02d} by {name}",
+	"day {day:02d} and proposal for final project-{name}",
+]
+
+MALFORMED_LINES = ["garbage", "12\tOPEN", "\t\t\t", "13 CLOSED"]
+
+DEFAULT_DAYS = (1, 2, 3, 4, 5, 6, 8)
+
+
+def generate_subjects(
+	path: str | Path,
+	rows: int,
+	students: int = 500,
+	seed: int = 0,
+	days: Tuple[int, ...] = DEFAULT_DAYS,
+	malformed: float = 0.0,
+	variants: int = 5,
+):
+	"""Write a synthetic subjects file with `rows` lines in the real file's layout.
+
+	`days` are the day numbers used in titles, `malformed` the fraction of lines
+	replaced by unparsable ones and `variants` how many of TITLE_TEMPLATES to use.
+	"""
+	rng = random.Random(seed)
+	names = [f"Student {i:05d}" for i in range(students)]
+	templates = TITLE_TEMPLATES[:max(1, variants)]
+	with open(path, "w", encoding="utf-8") as fh:
+		for serial in range(rows, 0, -1):
+			if malformed and rng.random() < malformed:
+				fh.write(rng.choice(MALFORMED_LINES) + "\n")
+				continue
+			template = rng.choice(templates)
+			day = rng.choice(days)
+			title = template.format(day=day, next_day=min(day + 1, 8), name=rng.choice(names))
+			status = "CLOSED" if rng.random() < 0.85 else "OPEN"
+			ts = f"2025-{rng.randint(11, 12)}-{rng.randint(1, 28):02d}T{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00Z"
+			fh.write(f"{serial}\t{status}\t{title}\t\t{ts}\n")
+
+
+def _max_rss_mb() -> float:
+	# ru_maxrss is KiB on Linux, bytes on macOS
+	rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+	return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def _run_list(path: str):
+	records = pr.load_subjects(path)
+	pr.closed_assignments(records)
+	pr.open_assignments(records)
+	pr.submission_completeness_report(records)
+
+
+def _run_stream(path: str):
+	pr.summarize_subjects(pr.iter_subjects(path))
+
+
+def _run_table(path: str):
+	table = pr.load_subjects_table(path)
+	pr.closed_assignments(table)
+	pr.open_assignments(table)
+	pr.submission_completeness_report(table)
+
+
+STAGES = {"list": _run_list, "stream": _run_stream, "table": _run_table}
+
+
+def export_report_xlsx_previous(records: List[Dict[str, str]], filename: str):
+	"""The export before the write-only path, kept as the `--xlsx` baseline.
+
+	Builds the whole workbook in memory, then walks the Students sheet again and
+	re-parses every ISO string to pick a font, creating a new `Font` per cell.
+	"""
+	from datetime import datetime
+
+	from openpyxl import Workbook
+	from openpyxl.styles import Font
+
+	assignment_keys = pr.ASSIGNMENT_KEYS
+	deadlines = pr.DEFAULT_DEADLINES
+	students_map = pr.summarize_subjects(records).earliest
+
+	wb = Workbook()
+	ws1 = wb.active
+	ws1.title = "Assignments"
+	ws1.append(["serial", "status", "assignment", "submitted_at"])
+	for r in records:
+		ws1.append([r.get("serial", ""), r.get("status", ""), r.get("assignment", ""), r.get("submitted_at", "")])
+
+	ws2 = wb.create_sheet("Students")
+	header = ["student"] + [k.upper() for k in assignment_keys]
+	ws2.append(header)
+	for name, entry in sorted(students_map.items()):
+		row = [name]
+		for key in assignment_keys:
+			dt = entry.get(key)
+			if dt is None:
+				row.append("Not submitted")
+			elif deadlines.get(key) is None:
+				row.append("Submitted")
+			else:
+				row.append(dt.isoformat(sep=" ", timespec="seconds"))
+		ws2.append(row)
+
+	for row in ws2.iter_rows(min_row=2, max_col=len(header), max_row=ws2.max_row):
+		for c_idx, cell in enumerate(row[1:]):
+			if cell.value == "Not submitted":
+				cell.font = Font(color="FF0000")
+				continue
+			try:
+				parsed = datetime.fromisoformat(cell.value.replace(" ", "T"))
+				dl = deadlines.get(assignment_keys[c_idx])
+				cell.font = Font(color="FFFF00" if dl is not None and parsed > dl else "000000")
+			except Exception:
+				cell.font = Font(color="000000")
+
+	wb.save(filename)
+
+
+def _run_xlsx(path: str, write_only: bool):
+	with tempfile.TemporaryDirectory() as tmp:
+		pr.export_report_xlsx(pr.iter_subjects(path), str(Path(tmp) / "report.xlsx"), write_only=write_only)
+
+
+def _run_xlsx_previous(path: str):
+	with tempfile.TemporaryDirectory() as tmp:
+		# the old export took a list and iterated it twice
+		export_report_xlsx_previous(pr.load_subjects(path), str(Path(tmp) / "report.xlsx"))
+
+
+XLSX_STAGES = {
+	"previous": _run_xlsx_previous,
+	"memory": lambda path: _run_xlsx(path, write_only=False),
+	"write-only": lambda path: _run_xlsx(path, write_only=True),
+}
+
+
+def suite_stages(path: str | Path) -> Dict[str, Callable[[], object]]:
+	"""Stage name -> zero-argument callable for `run_suite()`.
+
+	Inputs a stage only reads (the loaded table, the summary) are built once here,
+	so each stage's timing covers just its own work.
+	"""
+	table = pr.load_subjects_table(path)
+	summary = pr.summarize_subjects(table)
+	titles = [table.titles[code] for code in table.title_codes]
+	schedule = pr.DeadlineSchedule()
+
+	def classify_cold():
+		pr.classify_assignment.cache_clear()
+		for t in titles:
+			pr.classify_assignment(t)
+
+	def export():
+		with tempfile.TemporaryDirectory() as tmp:
+			pr.export_report_xlsx(table, str(Path(tmp) / "report.xlsx"), schedule=schedule)
+
+	stages = {
+		"load_subjects": lambda: pr.load_subjects(path),
+		"iter_subjects+summary": lambda: pr.summarize_subjects(pr.iter_subjects(path)),
+		"load_subjects_table": lambda: pr.load_subjects_table(path),
+		"classify_assignment": classify_cold,
+		"completeness_report": lambda: pr.submission_completeness_report(table),
+		"late_classification": lambda: schedule.classify(summary.earliest),
+	}
+	try:
+		import openpyxl  # noqa: F401
+		stages["export_report_xlsx"] = export
+	except ImportError:
+		print("(openpyxl not installed, skipping export_report_xlsx)")
+	return stages
+
+
+def run_suite(path: str | Path, rounds: int = 5, only: List[str] | None = None):
+	"""Time each stage `rounds` times, then trace its peak memory in one extra round.
+
+	tracemalloc slows allocation-heavy code down a lot, so it is kept out of the timed rounds.
+	"""
+	stages = suite_stages(path)
+	print(f"{'stage':<24} {'min s':>8} {'mean s':>8} {'stddev':>8} {'median s':>9} {'rounds':>6} {'peak MB':>8}")
+	for name, fn in stages.items():
+		if only and name not in only:
+			continue
+		times = []
+		for _ in range(rounds):
+			start = time.perf_counter()
+			fn()
+			times.append(time.perf_counter() - start)
+
+		tracemalloc.start()
+		fn()
+		peak_mb = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+		tracemalloc.stop()
+
+		stddev = statistics.stdev(times) if len(times) > 1 else 0.0
+		print(
+			f"{name:<24} {min(times):>8.3f} {statistics.mean(times):>8.3f} {stddev:>8.3f} "
+			f"{statistics.median(times):>9.3f} {len(times):>6} {peak_mb:>8.1f}"
+		)
+
+
+def bench_classifier(rows: int, students: int):
+	"""Time title classification for `rows` synthetic titles, with and without the cache."""
+	rng = random.Random(0)
+	names = [f"Student {i:05d}" for i in range(students)]
+	titles = [
+		rng.choice(TITLE_TEMPLATES[:5]).format(day=rng.choice(DEFAULT_DAYS), name=rng.choice(names))
+		for _ in range(rows)
+	]
+	uncached = pr.classify_assignment.__wrapped__
+
+	start = time.perf_counter()
+	for t in titles:
+		uncached(t)
+	uncached_s = time.perf_counter() - start
+
+	pr.classify_assignment.cache_clear()
+	start = time.perf_counter()
+	for t in titles:
+		pr.classify_assignment(t)
+	cached_s = time.perf_counter() - start
+	info = pr.classify_assignment.cache_info()
+
+	print(f"{rows:,} titles ({info.currsize:,} distinct)")
+	print(f"uncached: {uncached_s:.3f}s ({uncached_s / rows * 1e6:.2f} us/title)")
+	print(f"cached:   {cached_s:.3f}s ({cached_s / rows * 1e6:.2f} us/title), hit rate {info.hits / rows:.1%}")
+
+
+def _child(stage: str, path: str):
+	start = time.perf_counter()
+	{**STAGES, **XLSX_STAGES}[stage](path)
+	print(f"{time.perf_counter() - start:.3f} {_max_rss_mb():.1f}")
+
+
+def main():
+	parser = argparse.ArgumentParser(description="Benchmark the progress_report hot paths on synthetic data")
+	parser.add_argument("--rows", type=int, default=2_000_000, help="Number of synthetic rows")
+	parser.add_argument("--students", type=int, default=500, help="Number of distinct students")
+	parser.add_argument("--days", default=",".join(map(str, DEFAULT_DAYS)), help="Comma-separated day numbers used in titles")
+	parser.add_argument("--malformed", type=float, default=0.0, help="Fraction of malformed lines (0-1)")
+	parser.add_argument("--variants", type=int, default=5, help=f"Number of title spellings to use (1-{len(TITLE_TEMPLATES)})")
+	parser.add_argument("--suite", action="store_true", help="Time every stage separately instead")
+	parser.add_argument("--rounds", type=int, default=5, help="Rounds per stage for --suite")
+	parser.add_argument("--stage", action="append", help="With --suite, only run this stage (repeatable)")
+	parser.add_argument("--classify", action="store_true", help="Run the title-classifier micro-benchmark instead")
+	parser.add_argument("--xlsx", action="store_true", help="Benchmark the previous, in-memory and write-only XLSX exports instead")
+	parser.add_argument("--child", nargs=2, metavar=("STAGE", "PATH"), help=argparse.SUPPRESS)
+	args = parser.parse_args()
+
+	if args.child:
+		_child(*args.child)
+		return
+	if args.classify:
+		bench_classifier(args.rows, args.students)
+		return
+	if not 0 <= args.malformed < 1:
+		parser.error("--malformed must be in [0, 1)")
+
+	with tempfile.TemporaryDirectory() as tmp:
+		path = Path(tmp) / "subjects.txt"
+		days = tuple(int(d) for d in args.days.split(","))
+		print(f"Generating {args.rows:,} rows for {args.students} students...")
+		generate_subjects(path, args.rows, args.students, days=days, malformed=args.malformed, variants=args.variants)
+		if args.suite:
+			run_suite(path, args.rounds, args.stage)
+			return
+		print(f"{'approach':<10} {'seconds':>9} {'max RSS MB':>11}")
+		for stage in (XLSX_STAGES if args.xlsx else STAGES):
+			out = subprocess.run(
+				[sys.executable, __file__, "--child", stage, str(path)],
+				check=True, capture_output=True, text=True,
+			).stdout.split()
+			print(f"{stage:<10} {float(out[0]):>9.2f} {float(out[1]):>11.1f}")
+
+
+if __name__ == "__main__":
+	main()
@@ -1,16 +1,84 @@
 ("""Parse `subjects.txt` and return open/closed assignments.
 
 Usage:
-  - Import functions: `load_subjects`, `open_assignments`, `closed_assignments`.
-  - Run as script: `python3 progress_report.py [--json]`
+  - Import functions: `load_subjects`, `iter_subjects`, `summarize_subjects`,
+    `classify_assignment`, `open_assignments`, `closed_assignments`.
+  - Run as script: `python3 progress_report.py [--json] [--profile]`
 """)
 
 from __future__ import annotations
 
 import argparse
+import calendar
+import glob
+import hashlib
+import io
 import json
+import math
+import os
+import re
+import sqlite3
+import sys
+import time
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager, redirect_stdout
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from itertools import compress
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+# assignment keys in column order (day07 had no assignment)
+ASSIGNMENT_KEYS = [f"day{d:02d}" for d in (1, 2, 3, 4, 5, 6)] + ["day08", "proposal"]
+
+# Day07 had no assignment — ignore day 7
+REQUIRED_DAYS = {1, 2, 3, 4, 5, 6, 8}
+
+
+def _parse_line(raw: str) -> Dict[str, str] | None:
+	"""Parse one line of the subjects file into a record dict, or None if malformed."""
+	line = raw.strip()
+	if not line:
+		return None
+	# Split on tabs and drop empty fragments (some lines have extra tabs)
+	parts = [part.strip() for part in line.split("\t") if part.strip() != ""]
+	if len(parts) < 4:
+		# If fewer than 4 parts, try splitting on multiple spaces as fallback
+		parts = [part.strip() for part in line.split() if part.strip() != ""]
+	if len(parts) < 4:
+		# skip malformed line
+		return None
+
+	return {
+		"serial": parts[0],
+		"status": parts[1].upper(),
+		"assignment": parts[2],
+		"submitted_at": parts[3],
+	}
+
+
+def _iter_subject_lines(p: Path) -> Iterator[Dict[str, str]]:
+	with p.open(encoding="utf-8") as fh:
+		for raw in fh:
+			record = _parse_line(raw)
+			if record is not None:
+				yield record
+
+
+def iter_subjects(path: str | Path = "subjects.txt") -> Iterator[Dict[str, str]]:
+	"""Lazily parse the subjects file, yielding one record dict per valid line.
+
+	Same parsing rules and record keys as `load_subjects()`, but only one line is
+	held in memory at a time. Raises FileNotFoundError right away (not on first
+	iteration) if the file does not exist.
+	"""
+	p = Path(path)
+	if not p.exists():
+		raise FileNotFoundError(f"Subjects file not found: {p}")
+	return _iter_subject_lines(p)
 
 
 def load_subjects(path: str | Path = "subjects.txt") -> List[Dict[str, str]]:
@@ -24,83 +92,313 @@ def load_subjects(path: str | Path = "subjects.txt") -> List[Dict[str, str]]:
 
 	Returns a list of dicts with keys: `serial`, `status`, `assignment`, `submitted_at`.
 	"""
-	p = Path(path)
-	records: List[Dict[str, str]] = []
-	if not p.exists():
-		raise FileNotFoundError(f"Subjects file not found: {p}")
+	return list(iter_subjects(path))
+
+
+_EPOCH = datetime(1970, 1, 1)
+_ISO_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
 
-	with p.open(encoding="utf-8") as fh:
-		for raw in fh:
-			line = raw.strip()
-			if not line:
-				continue
-			# Split on tabs and drop empty fragments (some lines have extra tabs)
-			parts = [part.strip() for part in line.split("\t") if part.strip() != ""]
-			if len(parts) < 4:
-				# If fewer than 4 parts, try splitting on multiple spaces as fallback
-				parts = [part.strip() for part in line.split() if part.strip() != ""]
-			if len(parts) < 4:
-				# skip malformed line
-				continue
 
-			serial = parts[0]
-			status = parts[1]
-			assignment = parts[2]
-			submitted_at = parts[3]
+def _iso_to_epoch(s: str) -> tuple[float, bool]:
+	"""Return (epoch seconds, exact) for a submission timestamp.
 
-			records.append({
-				"serial": serial,
-				"status": status.upper(),
-				"assignment": assignment,
-				"submitted_at": submitted_at,
-			})
+	`exact` is True when `s` can be rebuilt from the epoch (the usual
+	'2026-01-04T09:32:25Z' form). Unparsable strings give (nan, False).
+	"""
+	if len(s) == 20 and s[4] == "-" and s[10] == "T" and s[19] == "Z":
+		try:
+			epoch = calendar.timegm((int(s[0:4]), int(s[5:7]), int(s[8:10]), int(s[11:13]), int(s[14:16]), int(s[17:19])))
+		except ValueError:
+			epoch = None
+		if epoch is not None and time.strftime(_ISO_FORMAT, time.gmtime(epoch)) == s:
+			return float(epoch), True
+	try:
+		dt = _parse_iso_datetime(s)
+	except Exception:
+		return math.nan, False
+	return (dt - _EPOCH).total_seconds(), False
+
+
+# status codes are stored as uint16
+_MAX_STATUSES = 1 << 16
+
+
+class SubjectsTable:
+	"""Column-oriented, compact store for subjects records.
+
+	Instead of one dict per row, each field is kept in its own column:
+	  - `serial`: array of ints
+	  - `status_codes`: one uint16 per row, indexing the shared `statuses` list
+	  - `title_codes`: one uint per row, indexing the shared `titles` list (titles repeat a lot)
+	  - `submitted_epoch`: array of float seconds since 1970 (nan if unparsable)
+
+	The rare values that can't be rebuilt from the columns (non-numeric serials,
+	non-standard timestamps) are kept verbatim in small side dicts, so iterating
+	the table yields exactly the dicts `load_subjects()` would have returned.
+	"""
+
+	__slots__ = ("serial", "status_codes", "title_codes", "submitted_epoch",
+				 "statuses", "titles", "_status_index", "_title_index",
+				 "_raw_serial", "_raw_submitted")
+
+	def __init__(self):
+		self.serial = array("q")
+		self.status_codes = array("H")
+		self.title_codes = array("I")
+		self.submitted_epoch = array("d")
+		self.statuses: List[str] = []
+		self.titles: List[str] = []
+		self._status_index: Dict[str, int] = {}
+		self._title_index: Dict[str, int] = {}
+		self._raw_serial: Dict[int, str] = {}
+		self._raw_submitted: Dict[int, str] = {}
+
+	@classmethod
+	def from_records(cls, records: Iterable[Dict[str, str]]) -> SubjectsTable:
+		table = cls()
+		for r in records:
+			table.append(r)
+		return table
+
+	def _code(self, index: Dict[str, int], values: List[str], value: str, limit: int | None = None) -> int:
+		code = index.get(value)
+		if code is None:
+			if limit is not None and len(values) >= limit:
+				raise ValueError(f"SubjectsTable holds at most {limit} distinct values per column")
+			code = index[value] = len(values)
+			values.append(value)
+		return code
+
+	def append(self, record: Dict[str, str]):
+		row = len(self.serial)
+		serial = record.get("serial", "")
+		try:
+			number = int(serial)
+		except ValueError:
+			number = -1
+		if str(number) != serial:
+			self._raw_serial[row] = serial
+		self.serial.append(number)
+
+		self.status_codes.append(self._code(self._status_index, self.statuses, record.get("status", ""), _MAX_STATUSES))
+		self.title_codes.append(self._code(self._title_index, self.titles, record.get("assignment", "")))
+
+		submitted_at = record.get("submitted_at", "")
+		epoch, exact = _iso_to_epoch(submitted_at)
+		if not exact:
+			self._raw_submitted[row] = submitted_at
+		self.submitted_epoch.append(epoch)
+
+	def __len__(self) -> int:
+		return len(self.serial)
+
+	def record(self, row: int) -> Dict[str, str]:
+		"""Rebuild the record dict for one row."""
+		serial = self._raw_serial.get(row)
+		submitted_at = self._raw_submitted.get(row)
+		return {
+			"serial": str(self.serial[row]) if serial is None else serial,
+			"status": self.statuses[self.status_codes[row]],
+			"assignment": self.titles[self.title_codes[row]],
+			"submitted_at": time.strftime(_ISO_FORMAT, time.gmtime(self.submitted_epoch[row])) if submitted_at is None else submitted_at,
+		}
+
+	def __iter__(self) -> Iterator[Dict[str, str]]:
+		for row in range(len(self)):
+			yield self.record(row)
+
+	def to_records(self) -> List[Dict[str, str]]:
+		return list(self)
+
+	def count_status(self, status: str) -> int:
+		"""Number of rows with the given status (a single C-level scan)."""
+		code = self._status_index.get(status)
+		if code is None:
+			return 0
+		return self.status_codes.count(code)
+
+	def where_status(self, status: str, negate: bool = False) -> SubjectsTable:
+		"""Return a new table with the rows whose status equals (or, with `negate`, differs from) `status`."""
+		code = self._status_index.get(status)
+		# look each status code up in a 0/1 table, one entry per distinct status
+		keep = bytearray([1 if negate else 0]) * len(self.statuses)
+		if code is not None:
+			keep[code] = 0 if negate else 1
+		mask = map(keep.__getitem__, self.status_codes)
+		return self.take(list(compress(range(len(self)), mask)))
+
+	def take(self, rows: List[int]) -> SubjectsTable:
+		"""Return a new table with the given rows; the status/title vocabularies are shared."""
+		out = SubjectsTable()
+		out.statuses, out._status_index = self.statuses, self._status_index
+		out.titles, out._title_index = self.titles, self._title_index
+		out.serial = array("q", map(self.serial.__getitem__, rows))
+		out.status_codes = array("H", map(self.status_codes.__getitem__, rows))
+		out.title_codes = array("I", map(self.title_codes.__getitem__, rows))
+		out.submitted_epoch = array("d", map(self.submitted_epoch.__getitem__, rows))
+		for new_row, row in enumerate(rows):
+			if row in self._raw_serial:
+				out._raw_serial[new_row] = self._raw_serial[row]
+			if row in self._raw_submitted:
+				out._raw_submitted[new_row] = self._raw_submitted[row]
+		return out
+
+	def extend(self, other: SubjectsTable):
+		"""Append all rows of `other`, re-mapping its status/title codes onto this table's vocabularies."""
+		offset = len(self)
+		status_map = [self._code(self._status_index, self.statuses, v, _MAX_STATUSES) for v in other.statuses]
+		title_map = [self._code(self._title_index, self.titles, v) for v in other.titles]
+		self.serial.extend(other.serial)
+		self.status_codes.extend(array("H", map(status_map.__getitem__, other.status_codes)))
+		self.title_codes.extend(array("I", map(title_map.__getitem__, other.title_codes)))
+		self.submitted_epoch.extend(other.submitted_epoch)
+		self._raw_serial.update({offset + row: v for row, v in other._raw_serial.items()})
+		self._raw_submitted.update({offset + row: v for row, v in other._raw_submitted.items()})
+
+	def earliest_by_title(self) -> Dict[int, float]:
+		"""Map each title code to its earliest submission epoch (nan if none parsed)."""
+		return {code: self.submitted_epoch[row] for code, row in self.earliest_rows_by_title().items()}
+
+	def earliest_rows_by_title(self) -> Dict[int, int]:
+		"""Map each title code to the row of its earliest submission (its first row if none parsed)."""
+		first: Dict[int, int] = {}
+		epochs = self.submitted_epoch
+		for row, code in enumerate(self.title_codes):
+			prev = first.get(code)
+			if prev is None or epochs[row] < epochs[prev] or epochs[prev] != epochs[prev]:
+				first[code] = row
+		return first
+
+	def submitted_datetime(self, row: int) -> datetime | None:
+		"""The submission time of a row as `ProgressSummary.add()` parses it: naive UTC, or None if unparsable."""
+		raw = self._raw_submitted.get(row)
+		if raw is None:
+			return _EPOCH + timedelta(seconds=self.submitted_epoch[row])
+		try:
+			return _parse_iso_datetime(raw)
+		except Exception:
+			return None
+
+
+def load_subjects_table(path: str | Path = "subjects.txt") -> SubjectsTable:
+	"""Like `load_subjects()`, but return a compact `SubjectsTable`."""
+	return SubjectsTable.from_records(iter_subjects(path))
+
+
+def resolve_subject_files(specs: str | Iterable[str]) -> List[Path]:
+	"""Expand subjects file specs (one per course section) into a sorted list of files.
+
+	Each spec may be a file, a directory (searched recursively for `subjects*.txt`)
+	or a glob pattern (`**` allowed). Duplicates are dropped.
+	"""
+	if isinstance(specs, (str, Path)):
+		specs = [specs]
+	files: Dict[Path, None] = {}
+	for spec in specs:
+		p = Path(spec)
+		if p.is_dir():
+			matches = sorted(p.rglob("subjects*.txt"))
+		elif p.exists():
+			matches = [p]
+		else:
+			matches = sorted(Path(m) for m in glob.glob(str(spec), recursive=True) if Path(m).is_file())
+		if not matches:
+			raise FileNotFoundError(f"Subjects file not found: {spec}")
+		for m in matches:
+			files.setdefault(m.resolve(), None)
+	return list(files)
+
+
+def _load_section(path: Path) -> tuple[SubjectsTable, ProgressSummary]:
+	# runs in a worker process: parse one file and reduce it to its summary
+	table = load_subjects_table(path)
+	return table, summarize_subjects(table)
+
+
+def load_sections(paths: List[Path], jobs: int | None = None) -> tuple[SubjectsTable, ProgressSummary]:
+	"""Load several subjects files and combine them into one table and one summary.
+
+	With more than one file, each file is parsed and summarized in its own worker
+	process (`jobs` workers, default: one per CPU) and the per-file results are
+	merged in the parent.
+	"""
+	if len(paths) == 1 or jobs == 1:
+		results = map(_load_section, paths)
+	else:
+		with ProcessPoolExecutor(max_workers=jobs) as pool:
+			results = list(pool.map(_load_section, paths))
 
-	return records
+	table = SubjectsTable()
+	summary = ProgressSummary()
+	for section_table, section_summary in results:
+		table.extend(section_table)
+		summary.merge(section_summary)
+	return table, summary
 
 
-def closed_assignments(records: List[Dict[str, str]]) -> List[Dict[str, str]]:
-	"""Return records where status == 'CLOSED'."""
+def closed_assignments(records: Iterable[Dict[str, str]]) -> List[Dict[str, str]] | SubjectsTable:
+	"""Return records where status == 'CLOSED' (a filtered table if given a `SubjectsTable`)."""
+	if isinstance(records, SubjectsTable):
+		return records.where_status("CLOSED")
 	return [r for r in records if r.get("status", "") == "CLOSED"]
 
 
-def open_assignments(records: List[Dict[str, str]]) -> List[Dict[str, str]]:
-	"""Return records where status != 'CLOSED'."""
+def open_assignments(records: Iterable[Dict[str, str]]) -> List[Dict[str, str]] | SubjectsTable:
+	"""Return records where status != 'CLOSED' (a filtered table if given a `SubjectsTable`)."""
+	if isinstance(records, SubjectsTable):
+		return records.where_status("CLOSED", negate=True)
 	return [r for r in records if r.get("status", "") != "CLOSED"]
 
 
-def _print_list(title: str, items: List[Dict[str, str]]):
-	print(f"{title} ({len(items)})")
+def _print_list(title: str, items: Iterable[Dict[str, str]], count: int | None = None):
+	if count is None:
+		items = list(items)
+		count = len(items)
+	print(f"{title} ({count})")
 	for r in items:
 		print(f"- {r['serial']}\t{r['assignment']}\t{r['submitted_at']}")
 
 
-def _extract_days_and_final(assignment_text: str) -> tuple[set[int], bool]:
-	"""From the assignment text, return a set of day numbers (1-8) and whether it's a final proposal.
+# title classification patterns, compiled once
+_DAY_RE = re.compile(r"day\s*0*([1-8])")
+_DAY_NOSPACE_RE = re.compile(r"day0*([1-8])")
+_BY_NAME_RE = re.compile(r"\bby\b\s*(.+)$", flags=re.IGNORECASE)
+_ASSIGNMENT_WORDS_RE = re.compile(r"(?i)day\s*0*[1-8]|day[s]?|final|project|proposal|and|for|the")
+_PUNCT_RE = re.compile(r"[\-_:]+")
 
-	Matching is case-insensitive and ignores spaces/variations like 'Day05', 'day 05', 'Day 05 and 06'.
-	"""
-	import re
 
+@lru_cache(maxsize=65536)
+def classify_assignment(assignment_text: str) -> tuple[frozenset[int], bool, str]:
+	"""Classify an assignment title in one call: return (days, is_final, student_name).
+
+	Titles repeat heavily ("Day08 by X" for every submission), so results are
+	memoized by title text; `submission_completeness_report()`, the summary and
+	the export all go through here. `days` is a frozenset because it is shared
+	between callers.
+	"""
 	text = assignment_text.lower()
 	days = set()
 
 	# find occurrences like 'day01', 'day 01', 'day1', 'day 1'
-	for m in re.findall(r"day\s*0*([1-8])", text):
-		try:
-			days.add(int(m))
-		except ValueError:
-			pass
+	for m in _DAY_RE.findall(text):
+		days.add(int(m))
 
 	# also catch patterns like 'day03andday04' if spaces removed
-	for m in re.findall(r"day0*([1-8])", text.replace(" ", "")):
-		try:
-			days.add(int(m))
-		except ValueError:
-			pass
+	for m in _DAY_NOSPACE_RE.findall(text.replace(" ", "")):
+		days.add(int(m))
 
 	is_final = "final" in text and ("proposal" in text or "project" in text)
 
-	return days, is_final
+	return frozenset(days), is_final, _student_name(assignment_text)
+
+
+def _extract_days_and_final(assignment_text: str) -> tuple[set[int], bool]:
+	"""From the assignment text, return a set of day numbers (1-8) and whether it's a final proposal.
+
+	Matching is case-insensitive and ignores spaces/variations like 'Day05', 'day 05', 'Day 05 and 06'.
+	"""
+	days, is_final, _ = classify_assignment(assignment_text)
+	return set(days), is_final
 
 
 def _extract_student_name(assignment_text: str) -> str:
@@ -111,11 +409,13 @@ def _extract_student_name(assignment_text: str) -> str:
 	  - text after the last '-' character
 	  - remove known assignment words and return the leftover
 	"""
-	import re
+	return classify_assignment(assignment_text)[2]
+
 
+def _student_name(assignment_text: str) -> str:
 	text = assignment_text.strip()
 	# try 'by' pattern
-	m = re.search(r"\bby\b\s*(.+)$", text, flags=re.IGNORECASE)
+	m = _BY_NAME_RE.search(text)
 	if m:
 		return m.group(1).strip()
 
@@ -126,177 +426,588 @@ def _extract_student_name(assignment_text: str) -> str:
 			return name
 
 	# fallback: remove assignment-related words
-	cleaned = re.sub(r"(?i)day\s*0*[1-8]|day[s]?|final|project|proposal|and|for|the", "", text)
+	cleaned = _ASSIGNMENT_WORDS_RE.sub("", text)
 	# remove leftover punctuation
-	cleaned = re.sub(r"[\-_:]+", " ", cleaned)
+	cleaned = _PUNCT_RE.sub(" ", cleaned)
 	cleaned = " ".join(cleaned.split())
 	return cleaned.strip()
 
 
-def submission_completeness_report(records: List[Dict[str, str]]) -> Dict[str, Dict[str, object]]:
-	"""Return a report mapping student name -> {'days': set[int], 'final': bool, 'complete': bool}.
+class ProgressSummary:
+	"""Per-student progress accumulated in a single pass over the records.
 
-	Full submission is defined as having days 1 through 8 and a final project proposal.
+	Feed records one at a time with `add()` (or use `summarize_subjects()`); memory grows
+	with the number of students, not the number of rows. Tracks:
+	  - `open_count` / `closed_count`: the open/closed split
+	  - `students`: name -> {'days': set[int], 'final': bool}
+	  - `earliest`: name -> {assignment key -> earliest submission as a naive UTC datetime, or None}
 	"""
-	students: Dict[str, Dict[str, object]] = {}
 
-	for r in records:
-		assignment = r.get("assignment", "")
-		days, is_final = _extract_days_and_final(assignment)
-		name = _extract_student_name(assignment)
+	def __init__(self):
+		self.open_count = 0
+		self.closed_count = 0
+		self.students: Dict[str, Dict[str, object]] = {}
+		self.earliest: Dict[str, Dict[str, datetime | None]] = {}
+
+	def add(self, record: Dict[str, str]):
+		if record.get("status", "") == "CLOSED":
+			self.closed_count += 1
+		else:
+			self.open_count += 1
+
+		try:
+			sub_dt = _parse_iso_datetime(record.get("submitted_at", ""))
+		except Exception:
+			sub_dt = None
+		self._add_assignment(record.get("assignment", ""), sub_dt)
+
+	def add_table(self, table: SubjectsTable):
+		"""Add every row of a `SubjectsTable`, classifying each distinct title only once."""
+		closed = table.count_status("CLOSED")
+		self.closed_count += closed
+		self.open_count += len(table) - closed
+
+		for code, row in table.earliest_rows_by_title().items():
+			self._add_assignment(table.titles[code], table.submitted_datetime(row))
+
+	def merge(self, other: ProgressSummary):
+		"""Fold another summary (e.g. of a different course section) into this one."""
+		self.open_count += other.open_count
+		self.closed_count += other.closed_count
+		for name, info in other.students.items():
+			entry = self.students.setdefault(name, {"days": set(), "final": False})
+			entry["days"].update(info["days"])
+			entry["final"] = entry["final"] or info["final"]
+		for name, other_earliest in other.earliest.items():
+			earliest = self.earliest.setdefault(name, {k: None for k in ASSIGNMENT_KEYS})
+			for key, dt in other_earliest.items():
+				prev = earliest[key]
+				if dt is not None and (prev is None or dt < prev):
+					earliest[key] = dt
+
+	def _add_assignment(self, assignment: str, sub_dt: datetime | None):
+		days, is_final, name = classify_assignment(assignment)
 		if not name:
 			# if we couldn't parse a name, skip
-			continue
+			return
 
-		entry = students.setdefault(name, {"days": set(), "final": False})
+		entry = self.students.setdefault(name, {"days": set(), "final": False})
 		entry["days"].update(days)
 		if is_final:
 			entry["final"] = True
 
-	# compute completeness
-	# Day07 had no assignment — ignore day 7
-	required_days = {1, 2, 3, 4, 5, 6, 8}
-	for name, info in students.items():
-		info["complete"] = info["final"] and (required_days.issubset(info["days"]))
+		earliest = self.earliest.setdefault(name, {k: None for k in ASSIGNMENT_KEYS})
+		if sub_dt is None:
+			return
+		keys = [f"day{d:02d}" for d in days if d != 7]
+		if is_final:
+			keys.append("proposal")
+		for key in keys:
+			prev = earliest[key]
+			if prev is None or sub_dt < prev:
+				earliest[key] = sub_dt
+
+	def completeness_report(self) -> Dict[str, Dict[str, object]]:
+		"""Return the same structure as `submission_completeness_report()`."""
+		report: Dict[str, Dict[str, object]] = {}
+		for name, info in self.students.items():
+			report[name] = {
+				"days": set(info["days"]),
+				"final": info["final"],
+				"complete": info["final"] and REQUIRED_DAYS.issubset(info["days"]),
+			}
+		return report
+
+	def to_state(self) -> Dict[str, object]:
+		"""Return a JSON-serializable snapshot (see `from_state()`)."""
+		return {
+			"open_count": self.open_count,
+			"closed_count": self.closed_count,
+			"students": {
+				name: {"days": sorted(info["days"]), "final": info["final"]}
+				for name, info in self.students.items()
+			},
+			"earliest": {
+				name: {key: None if dt is None else dt.isoformat() for key, dt in entry.items()}
+				for name, entry in self.earliest.items()
+			},
+		}
+
+	@classmethod
+	def from_state(cls, state: Dict[str, object]) -> ProgressSummary:
+		summary = cls()
+		summary.open_count = state["open_count"]
+		summary.closed_count = state["closed_count"]
+		summary.students = {
+			name: {"days": set(info["days"]), "final": info["final"]}
+			for name, info in state["students"].items()
+		}
+		summary.earliest = {
+			name: {key: None if iso is None else _naive_utc(datetime.fromisoformat(iso)) for key, iso in entry.items()}
+			for name, entry in state["earliest"].items()
+		}
+		return summary
+
+
+def summarize_subjects(records: Iterable[Dict[str, str]]) -> ProgressSummary:
+	"""Consume `records` (e.g. `iter_subjects(path)` or a `SubjectsTable`) once and return a `ProgressSummary`."""
+	summary = ProgressSummary()
+	if isinstance(records, SubjectsTable):
+		summary.add_table(records)
+		return summary
+	for r in records:
+		summary.add(r)
+	return summary
+
+
+def submission_completeness_report(records: Iterable[Dict[str, str]]) -> Dict[str, Dict[str, object]]:
+	"""Return a report mapping student name -> {'days': set[int], 'final': bool, 'complete': bool}.
+
+	Full submission is defined as having days 1 through 8 and a final project proposal.
+	"""
+	return summarize_subjects(records).completeness_report()
+
+
+STATE_VERSION = 2
+
+# bytes hashed at the start of the file and just before the saved offset to
+# detect a rewritten (rather than appended-to) subjects file
+_HASH_WINDOW = 4096
+
+
+def _window_hash(fh, start: int, end: int) -> str:
+	fh.seek(start)
+	return hashlib.sha256(fh.read(end - start)).hexdigest()
+
 
-	return students
+def _fingerprint(fh, offset: int) -> Dict[str, str]:
+	return {
+		"head_hash": _window_hash(fh, 0, min(offset, _HASH_WINDOW)),
+		"tail_hash": _window_hash(fh, max(0, offset - _HASH_WINDOW), offset),
+	}
+
+
+def _serial_number(serial: str) -> int | None:
+	try:
+		return int(serial)
+	except ValueError:
+		return None
+
+
+# required state fields and their JSON types
+_STATE_FIELDS = {
+	"path": str,
+	"offset": int,
+	"last_serial": (int, type(None)),
+	"pending_serial_floor": (int, type(None)),
+	"head_hash": str,
+	"tail_hash": str,
+	"summary": dict,
+}
+
+
+def _load_state(state_path: Path) -> Dict[str, object] | None:
+	try:
+		with state_path.open(encoding="utf-8") as fh:
+			state = json.load(fh)
+	except (OSError, ValueError):
+		return None
+	if not isinstance(state, dict) or state.get("version") != STATE_VERSION:
+		return None
+	# a state missing a field (hand-edited, or written by an interrupted older run) means rebuild
+	for key, types in _STATE_FIELDS.items():
+		if not isinstance(state.get(key), types) or isinstance(state.get(key), bool):
+			return None
+	if not all(isinstance(state["summary"].get(key), dict) for key in ("students", "earliest")):
+		return None
+	return state
+
+
+def _save_state(state_path: Path, state: Dict[str, object]):
+	# write next to the target and rename, so an interrupted run never leaves a half-written state
+	tmp = state_path.with_name(state_path.name + ".tmp")
+	with tmp.open("w", encoding="utf-8") as fh:
+		json.dump(state, fh, ensure_ascii=False)
+	os.replace(tmp, state_path)
+
+
+def default_state_path(path: str | Path) -> Path:
+	p = Path(path)
+	return p.with_name(p.name + ".state.json")
+
+
+def _iter_from_offset(fh, offset: int) -> Iterator[tuple[Dict[str, str] | None, int, bool]]:
+	"""Read a binary file handle from `offset`, yielding (record or None, end offset, line complete?).
+
+	The end offset only advances past newline-terminated lines; an unterminated last
+	line (still being written) is yielded with complete=False.
+	"""
+	fh.seek(offset)
+	for raw in fh:
+		complete = raw.endswith(b"\n")
+		if complete:
+			offset += len(raw)
+		yield _parse_line(raw.decode("utf-8")), offset, complete
+
+
+def update_incremental(path: str | Path = "subjects.txt", state_path: str | Path | None = None) -> tuple[ProgressSummary, int, bool]:
+	"""Bring the saved progress state up to date with `path` and return it.
+
+	The state file (default: `<path>.state.json`) stores the summary, the last serial
+	seen, the byte offset reached and hashes of the file around that offset. If the
+	file was only appended to, only the bytes after the offset are parsed, and rows
+	whose serial is not above the last serial seen are skipped. Otherwise (file
+	rewritten, truncated, or no usable state) the state is rebuilt from scratch.
+	An unterminated last line (possibly still being written) is counted in the returned
+	summary but not saved, so the next run reads it again.
+
+	Returns (summary, number of new rows processed, whether a full rebuild happened).
+	"""
+	p = Path(path)
+	if not p.exists():
+		raise FileNotFoundError(f"Subjects file not found: {p}")
+	state_path = Path(state_path) if state_path is not None else default_state_path(p)
+	state = _load_state(state_path)
+
+	with p.open("rb") as fh:
+		size = fh.seek(0, os.SEEK_END)
+		resume = (
+			state is not None
+			and state.get("path") == str(p.resolve())
+			and state["offset"] <= size
+			and _fingerprint(fh, state["offset"]) == {"head_hash": state["head_hash"], "tail_hash": state["tail_hash"]}
+		)
+		if resume:
+			try:
+				summary = ProgressSummary.from_state(state["summary"])
+			except (KeyError, TypeError, ValueError):
+				resume = False
+		if resume:
+			offset = state["offset"]
+			last_serial = state["last_serial"]
+			# serials at or below this are skipped for the line at `offset`, which is
+			# the unterminated line left by the last run, if there was one
+			serial_floor = state["pending_serial_floor"]
+		else:
+			summary = ProgressSummary()
+			offset = 0
+			last_serial = serial_floor = None
+
+		max_serial = last_serial
+		new_rows = 0
+		tail = None
+		for record, end, complete in _iter_from_offset(fh, offset):
+			if not complete:
+				# last line may still be being written: count it below, but leave the
+				# saved offset before it so the next run reads it again once complete
+				tail = record
+				break
+			offset = end
+			floor, serial_floor = serial_floor, last_serial
+			if record is None:
+				continue
+			serial = _serial_number(record["serial"])
+			if serial is not None:
+				if floor is not None and serial <= floor:
+					continue
+				if max_serial is None or serial > max_serial:
+					max_serial = serial
+			summary.add(record)
+			new_rows += 1
+
+		_save_state(state_path, {
+			"version": STATE_VERSION,
+			"path": str(p.resolve()),
+			"offset": offset,
+			"last_serial": max_serial,
+			"pending_serial_floor": serial_floor if tail is not None else max_serial,
+			**_fingerprint(fh, offset),
+			"summary": summary.to_state(),
+		})
+
+	if tail is not None:
+		serial = _serial_number(tail["serial"])
+		if serial is None or serial_floor is None or serial > serial_floor:
+			summary.add(tail)
+			new_rows += 1
+
+	return summary, new_rows, not resume
+
+
+def watch_subjects(path: str | Path = "subjects.txt", interval: float = 0.5, max_polls: int | None = None) -> Iterator[tuple[SubjectsTable, ProgressSummary]]:
+	"""Tail the subjects file and yield (table, summary) whenever it changes.
+
+	The first yield is the whole file. After that the file is polled every `interval`
+	seconds; only bytes appended after the last complete line are read, and the
+	in-memory table and summary are updated in place before the next yield. If the
+	file shrinks or its contents before the offset change (a rewrite, e.g. a fresh
+	export), everything is rebuilt from scratch. Stops after `max_polls` polls if given.
+	"""
+	p = Path(path)
+	if not p.exists():
+		raise FileNotFoundError(f"Subjects file not found: {p}")
+
+	offset = 0
+	fingerprint = None
+	table = summary = None
+	polls = 0
+	while max_polls is None or polls < max_polls:
+		if polls:
+			time.sleep(interval)
+		polls += 1
+		try:
+			fh = p.open("rb")
+		except FileNotFoundError:
+			# being replaced; try again next poll
+			continue
+		with fh:
+			size = fh.seek(0, os.SEEK_END)
+			rebuild = table is None or size < offset or _fingerprint(fh, offset) != fingerprint
+			if rebuild:
+				table, summary, offset = SubjectsTable(), ProgressSummary(), 0
+			elif size == offset:
+				continue
+
+			new_rows = 0
+			for record, end, complete in _iter_from_offset(fh, offset):
+				if not complete:
+					break
+				offset = end
+				if record is not None:
+					table.append(record)
+					summary.add(record)
+					new_rows += 1
+			fingerprint = _fingerprint(fh, offset)
+
+		if rebuild or new_rows:
+			yield table, summary
+
+
+def _naive_utc(dt: datetime) -> datetime:
+	"""`dt` as a naive UTC datetime (naive input is taken to be UTC already).
+
+	Every stored or compared timestamp goes through here, so '...Z' and '...+02:00'
+	submissions can be compared with each other and with the deadlines.
+	"""
+	if dt.tzinfo is None:
+		return dt
+	return dt.astimezone(timezone.utc).replace(tzinfo=None)
 
 
 def _parse_iso_datetime(s: str) -> datetime:
-	from datetime import datetime
 	# input looks like: 2026-01-04T09:32:25Z
 	try:
 		return datetime.strptime(s, "%Y-%m-%dT%H:%M:%SZ")
 	except Exception:
-		# fallback: try without trailing Z
-		return datetime.fromisoformat(s)
+		# fallback: other ISO forms, e.g. with a UTC offset (converted to naive UTC)
+		return _naive_utc(datetime.fromisoformat(s))
+
+
+# default deadlines (naive datetimes); day07 had no assignment
+DEFAULT_DEADLINES = {
+	"day01": datetime(2025, 11, 1, 22, 0),
+	"day02": datetime(2025, 11, 9, 22, 0),
+	"day03": datetime(2025, 11, 16, 22, 0),
+	"day04": datetime(2025, 11, 23, 22, 0),
+	"day05": datetime(2025, 11, 29, 22, 0),
+	"day06": datetime(2025, 12, 6, 22, 0),
+	"day08": datetime(2025, 12, 30, 22, 0),
+	"proposal": datetime(2026, 1, 11, 22, 0),
+}
+
+# submission statuses returned by DeadlineSchedule.classify()
+ON_TIME = "on time"
+LATE = "late"
+MISSING = "missing"
+SUBMITTED = "submitted"  # submitted, but the assignment has no deadline
+
+
+def _whole_seconds(dt: datetime) -> int:
+	return int((dt.replace(microsecond=0) - _EPOCH).total_seconds())
+
+
+class DeadlineSchedule:
+	"""Assignment deadlines plus per-student extensions.
+
+	`deadlines` maps assignment key ('day01' .. 'proposal') -> datetime;
+	`extensions` maps student name -> {assignment key -> extended deadline}.
+	Both are stored as naive UTC, like the submission times they are compared with.
+	"""
+
+	def __init__(self, deadlines: Dict[str, datetime] | None = None, extensions: Dict[str, Dict[str, datetime]] | None = None):
+		deadlines = DEFAULT_DEADLINES if deadlines is None else deadlines
+		self.deadlines = {key: _naive_utc(dt) for key, dt in deadlines.items()}
+		self.extensions = {
+			name: {key: _naive_utc(dt) for key, dt in ext.items()}
+			for name, ext in (extensions or {}).items()
+		}
+
+	@classmethod
+	def from_file(cls, path: str | Path) -> DeadlineSchedule:
+		"""Load a JSON config: {"deadlines": {key: "YYYY-MM-DD HH:MM"}, "extensions": {student: {key: "YYYY-MM-DD HH:MM"}}}.
+
+		Times may carry a UTC offset ('Z' or '+HH:MM'); they are converted to UTC. Keys missing from "deadlines" keep their default deadline.
+		"""
+		with Path(path).open(encoding="utf-8") as fh:
+			config = json.load(fh)
+		deadlines = dict(DEFAULT_DEADLINES)
+		deadlines.update({key: datetime.fromisoformat(v) for key, v in config.get("deadlines", {}).items()})
+		extensions = {
+			name: {key: datetime.fromisoformat(v) for key, v in ext.items()}
+			for name, ext in config.get("extensions", {}).items()
+		}
+		return cls(deadlines, extensions)
+
+	def deadline_for(self, key: str, student: str | None = None) -> datetime | None:
+		extended = self.extensions.get(student, {}).get(key)
+		return extended if extended is not None else self.deadlines.get(key)
+
+	def classify(self, earliest: Dict[str, Dict[str, datetime | None]]) -> Dict[str, Dict[str, str]]:
+		"""Classify every student's earliest submissions at once.
+
+		`earliest` is `ProgressSummary.earliest`. Returns name -> {assignment key -> ON_TIME,
+		LATE, MISSING or SUBMITTED}. For each assignment the submission times are sorted once
+		and split at the deadline with a binary search; only students with an extension for
+		that assignment are checked individually. Comparison is at whole-second precision.
+		"""
+		result: Dict[str, Dict[str, str]] = {name: {} for name in earliest}
+		for key in ASSIGNMENT_KEYS:
+			submitted = []
+			for name, entry in earliest.items():
+				dt = entry.get(key)
+				if dt is None:
+					result[name][key] = MISSING
+				else:
+					submitted.append((_whole_seconds(_naive_utc(dt)), name))
+
+			deadline = self.deadlines.get(key)
+			submitted.sort()
+			epochs = array("q", (epoch for epoch, _ in submitted))
+			cut = len(epochs) if deadline is None else bisect_right(epochs, _whole_seconds(deadline))
+			on_time = SUBMITTED if deadline is None else ON_TIME
+			for i, (_, name) in enumerate(submitted):
+				result[name][key] = on_time if i < cut else LATE
+
+			for name, ext in self.extensions.items():
+				dt = earliest.get(name, {}).get(key)
+				if key in ext and dt is not None:
+					result[name][key] = LATE if _whole_seconds(_naive_utc(dt)) > _whole_seconds(ext[key]) else ON_TIME
+		return result
+
+
+def late_report(summary: ProgressSummary, schedule: DeadlineSchedule | None = None) -> Dict[str, List[str]]:
+	"""Return student name -> assignment keys submitted after their (possibly extended) deadline."""
+	schedule = schedule or DeadlineSchedule()
+	statuses = schedule.classify(summary.earliest)
+	report = {}
+	for name, by_key in statuses.items():
+		late = [key for key in ASSIGNMENT_KEYS if by_key.get(key) == LATE]
+		if late:
+			report[name] = late
+	return report
+
+
+def _print_late(summary: ProgressSummary, schedule: DeadlineSchedule):
+	report = late_report(summary, schedule)
+	if not report:
+		print("No late submissions.")
+		return
 
+	print(f"Students with late submissions: {len(report)}")
+	for name, keys in sorted(report.items()):
+		details = []
+		for key in keys:
+			submitted = summary.earliest[name][key].isoformat(sep=" ", timespec="seconds")
+			deadline = schedule.deadline_for(key, name).isoformat(sep=" ", timespec="minutes")
+			details.append(f"{key.upper()} {submitted} (deadline {deadline})")
+		print(f"- {name}: " + ", ".join(details))
 
-def export_report_xlsx(records: List[Dict[str, str]], filename: str = "report.xlsx"):
+
+def export_report_xlsx(records: Iterable[Dict[str, str]], filename: str = "report.xlsx", write_only: bool = True, schedule: DeadlineSchedule | None = None):
 	"""Export two-sheet Excel workbook:
 	  - Sheet 'Assignments': table of all open and closed assignments
 	  - Sheet 'Students': one row per student and a column per assignment (days 01-06, 08, proposal)
 
-	Cells are colored: on-time = black, late = yellow, missing = red.
+	Cells are colored: on-time = black, late = yellow, missing = red. Lateness is decided
+	by `schedule` (default: the course deadlines, no extensions).
+
+	By default the workbook is streamed with openpyxl's write-only mode, so rows are
+	written to disk as they are produced instead of being kept in memory; each cell's
+	colour is decided from the already-parsed datetime when the cell is created, and
+	the three fonts are shared. Pass `write_only=False` to build a regular in-memory
+	workbook instead.
 	"""
 	try:
 		from openpyxl import Workbook
+		from openpyxl.cell import WriteOnlyCell
 		from openpyxl.styles import Font
 	except Exception as exc:
 		raise RuntimeError("openpyxl is required for export. Install with: pip install openpyxl") from exc
 
-	from datetime import datetime
-
-	# deadlines (naive datetimes)
-	deadlines = {
-		"day01": datetime.strptime("2025.11.01 22:00", "%Y.%m.%d %H:%M"),
-		"day02": datetime.strptime("2025.11.09 22:00", "%Y.%m.%d %H:%M"),
-		"day03": datetime.strptime("2025.11.16 22:00", "%Y.%m.%d %H:%M"),
-		"day04": datetime.strptime("2025.11.23 22:00", "%Y.%m.%d %H:%M"),
-		"day05": datetime.strptime("2025.11.29 22:00", "%Y.%m.%d %H:%M"),
-		"day06": datetime.strptime("2025.12.06 22:00", "%Y.%m.%d %H:%M"),
-		# note: day07 ignored
-		"day08": datetime.strptime("2025.12.30 22:00", "%Y.%m.%d %H:%M"),
-		"proposal": datetime.strptime("2026.01.11 22:00", "%Y.%m.%d %H:%M"),
-	}
-
-	# assignment keys order for columns
-	assignment_keys = [f"day{d:02d}" for d in (1, 2, 3, 4, 5, 6)] + ["day08", "proposal"]
-
-	# build per-student earliest submission datetimes for each assignment key
-	students_map: Dict[str, Dict[str, datetime | None]] = {}
-
-	for r in records:
-		assignment = r.get("assignment", "")
-		days, is_final = _extract_days_and_final(assignment)
-		name = _extract_student_name(assignment)
-		if not name:
-			continue
+	schedule = schedule or DeadlineSchedule()
 
-		sub_dt = None
-		try:
-			sub_dt = _parse_iso_datetime(r.get("submitted_at", ""))
-		except Exception:
-			sub_dt = None
+	assignment_keys = ASSIGNMENT_KEYS
 
-		entry = students_map.setdefault(name, {k: None for k in assignment_keys})
-
-		for d in days:
-			if d == 7:
-				continue
-			key = f"day{d:02d}"
-			prev = entry.get(key)
-			if sub_dt is None:
-				continue
-			if prev is None or sub_dt < prev:
-				entry[key] = sub_dt
-
-		if is_final:
-			prev = entry.get("proposal")
-			if sub_dt is not None and (prev is None or sub_dt < prev):
-				entry["proposal"] = sub_dt
+	# Color definitions (one shared Font per colour)
+	font_black = Font(color="000000")
+	font_yellow = Font(color="FFFF00")
+	font_red = Font(color="FF0000")
 
 	# Create workbook
-	wb = Workbook()
-	ws1 = wb.active
-	ws1.title = "Assignments"
+	wb = Workbook(write_only=write_only)
+	if write_only:
+		ws1 = wb.create_sheet("Assignments")
+	else:
+		ws1 = wb.active
+		ws1.title = "Assignments"
 
-	# Header
+	# Single pass: write each record to the Assignments sheet while building
+	# per-student earliest submission datetimes for each assignment key
+	summary = ProgressSummary()
 	ws1.append(["serial", "status", "assignment", "submitted_at"])
 	for r in records:
 		ws1.append([r.get("serial", ""), r.get("status", ""), r.get("assignment", ""), r.get("submitted_at", "")])
+		summary.add(r)
+	students_map = summary.earliest
 
 	# Students sheet
 	ws2 = wb.create_sheet("Students")
-	header = ["student"] + [k.upper() for k in assignment_keys]
-	ws2.append(header)
+	ws2.append(["student"] + [k.upper() for k in assignment_keys])
 
-	# Color definitions
-	color_black = "000000"
-	color_yellow = "FFFF00"
-	color_red = "FF0000"
+	# classify all cells in one batch, then just pick the shared font per cell
+	statuses = schedule.classify(students_map)
+	fonts = {ON_TIME: font_black, SUBMITTED: font_black, LATE: font_yellow, MISSING: font_red}
 
-	for name, entry in sorted(students_map.items()):
-		row = [name]
+	for row_idx, (name, entry) in enumerate(sorted(students_map.items()), start=2):
+		values = [name]
+		row_fonts = []
 		for key in assignment_keys:
 			dt = entry.get(key)
-			if dt is None:
-				row.append("Not submitted")
-			else:
-				# compare to deadline
-				dl = deadlines.get(key)
-				if dl is None:
-					row.append("Submitted")
-				else:
-					row.append(dt.isoformat(sep=" ", timespec="seconds"))
-		ws2.append(row)
-
-	# Apply colors per cell in Students sheet
-	for r_idx, row in enumerate(ws2.iter_rows(min_row=2, max_col=len(header), max_row=ws2.max_row), start=2):
-		# r_idx matches Excel row index
-		for c_idx, cell in enumerate(row[1:], start=2):  # skip student name column
-			val = cell.value
-			col_key = assignment_keys[c_idx - 2]
-			if val == "Not submitted":
-				cell.font = Font(color=color_red)
+			status = statuses[name][key]
+			if status == MISSING:
+				values.append("Not submitted")
+			elif status == SUBMITTED:
+				values.append("Submitted")
 			else:
-				# parse the string back to datetime to compare
-				try:
-					parsed = datetime.fromisoformat(val.replace(" ", "T"))
-					dl = deadlines.get(col_key)
-					if dl is not None and parsed > dl:
-						cell.font = Font(color=color_yellow)
-					else:
-						cell.font = Font(color=color_black)
-				except Exception:
-					cell.font = Font(color=color_black)
+				values.append(dt.isoformat(sep=" ", timespec="seconds"))
+			row_fonts.append(fonts[status])
+		if write_only:
+			# write-only rows can't be styled after the fact: style each cell as it is created
+			row = [name]
+			for value, font in zip(values[1:], row_fonts):
+				cell = WriteOnlyCell(ws2, value=value)
+				cell.font = font
+				row.append(cell)
+			ws2.append(row)
+		else:
+			ws2.append(values)
+			for col_idx, font in enumerate(row_fonts, start=2):
+				ws2.cell(row=row_idx, column=col_idx).font = font
 
 	wb.save(filename)
 
 
-
-def print_missing_report(records: List[Dict[str, str]]):
-	report = submission_completeness_report(records)
+def _print_missing(report: Dict[str, Dict[str, object]]):
 	missing = {name: info for name, info in report.items() if not info.get("complete")}
 
 	if not missing:
@@ -311,35 +1022,355 @@ def print_missing_report(records: List[Dict[str, str]]):
 		print(f"- {name}: days submitted={days_done}, final_submitted={final}, missing_days={missing_days}")
 
 
+def print_missing_report(records: Iterable[Dict[str, str]]):
+	_print_missing(submission_completeness_report(records))
+
+
+# SQLite index of submissions, for ad-hoc queries without re-reading subjects.txt.
+# Serials are only unique within one subjects file (course section), so rows are
+# keyed by (source, serial), where source is the file the row came from.
+_INDEX_VERSION = 2
+_INDEX_TABLES = ("earliest", "submission_keys", "submissions")
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS submissions (
+	source TEXT NOT NULL,
+	serial INTEGER NOT NULL,
+	status TEXT NOT NULL,
+	assignment TEXT NOT NULL,
+	submitted_at TEXT NOT NULL,
+	submitted_epoch REAL,
+	student TEXT COLLATE NOCASE,
+	PRIMARY KEY (source, serial)
+);
+CREATE TABLE IF NOT EXISTS submission_keys (
+	source TEXT NOT NULL,
+	serial INTEGER NOT NULL,
+	key TEXT NOT NULL,
+	PRIMARY KEY (key, source, serial),
+	FOREIGN KEY (source, serial) REFERENCES submissions(source, serial) ON DELETE CASCADE
+);
+CREATE TABLE IF NOT EXISTS earliest (
+	student TEXT NOT NULL COLLATE NOCASE,
+	key TEXT NOT NULL,
+	source TEXT NOT NULL,
+	serial INTEGER NOT NULL,
+	submitted_epoch REAL NOT NULL,
+	PRIMARY KEY (key, student),
+	FOREIGN KEY (source, serial) REFERENCES submissions(source, serial) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS submissions_student ON submissions(student);
+CREATE INDEX IF NOT EXISTS submissions_status ON submissions(status);
+CREATE INDEX IF NOT EXISTS submissions_epoch ON submissions(submitted_epoch);
+CREATE INDEX IF NOT EXISTS submission_keys_serial ON submission_keys(source, serial);
+CREATE INDEX IF NOT EXISTS earliest_serial ON earliest(source, serial);
+"""
+
+# query kinds accepted by `query_index()` / `--query`
+INDEX_QUERIES = ("student", "assignment", "status", "late")
+
+
+def open_index(db_path: str | Path) -> sqlite3.Connection:
+	"""Open (creating if needed) the SQLite submissions index.
+
+	An index written with an older schema is dropped and re-created empty, so the
+	next `update_index()` call fills it from scratch.
+	"""
+	conn = sqlite3.connect(str(db_path))
+	if conn.execute("PRAGMA user_version").fetchone()[0] != _INDEX_VERSION:
+		with conn:
+			for table in _INDEX_TABLES:
+				conn.execute(f"DROP TABLE IF EXISTS {table}")
+			conn.execute(f"PRAGMA user_version = {_INDEX_VERSION}")
+	conn.execute("PRAGMA foreign_keys = ON")
+	conn.executescript(_INDEX_SCHEMA)
+	return conn
+
+
+def index_source(path: str | Path) -> str:
+	"""The `source` value rows read from `path` are indexed under."""
+	return str(Path(path).resolve())
+
+
+def update_index(db_path: str | Path, records: Iterable[Dict[str, str]], rebuild: bool = False, source: str = "") -> int:
+	"""Add records read from one subjects file to the index and return how many were added.
+
+	`source` identifies the file (see `index_source()`); serials only have to be unique
+	within a source. Incremental by serial: only records whose serial is above the highest
+	serial already indexed for that source are inserted (pass `rebuild=True` to clear the
+	whole index first, e.g. after statuses changed). If a serial appears more than once,
+	its last record is indexed. Records without an integer serial can't be keyed and are skipped.
+	"""
+	conn = open_index(db_path)
+	try:
+		with conn:
+			if rebuild:
+				conn.execute("DELETE FROM submissions")
+			last_serial = conn.execute("SELECT MAX(serial) FROM submissions WHERE source = ?", (source,)).fetchone()[0]
+			# one record per serial (the last one wins): a replaced submissions row
+			# would cascade-delete the keys and earliest entry of the first one
+			batch: Dict[int, Dict[str, str]] = {}
+			for r in records:
+				serial = _serial_number(r.get("serial", ""))
+				if serial is not None and (last_serial is None or serial > last_serial):
+					batch.pop(serial, None)
+					batch[serial] = r
+			rows = []
+			keys = []
+			# earliest (epoch, serial) per (student, key) among the new rows
+			earliest: Dict[tuple[str, str], tuple[float, int]] = {}
+			for serial, r in batch.items():
+				days, is_final, name = classify_assignment(r.get("assignment", ""))
+				epoch, _ = _iso_to_epoch(r.get("submitted_at", ""))
+				epoch = None if math.isnan(epoch) else epoch
+				rows.append((source, serial, r.get("status", ""), r.get("assignment", ""), r.get("submitted_at", ""), epoch, name or None))
+				row_keys = [f"day{d:02d}" for d in days if d != 7]
+				if is_final:
+					row_keys.append("proposal")
+				for key in row_keys:
+					keys.append((source, serial, key))
+					if name and epoch is not None:
+						prev = earliest.get((name, key))
+						if prev is None or (epoch, serial) < prev:
+							earliest[(name, key)] = (epoch, serial)
+
+			conn.executemany("INSERT INTO submissions VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+			conn.executemany("INSERT OR IGNORE INTO submission_keys VALUES (?, ?, ?)", keys)
+			# keep each student's earliest submission per assignment up to date, so
+			# lateness queries don't have to group over every submission
+			conn.executemany(
+				"INSERT INTO earliest (student, key, source, serial, submitted_epoch) VALUES (?, ?, ?, ?, ?)"
+				" ON CONFLICT (key, student) DO UPDATE SET source = excluded.source, serial = excluded.serial,"
+				" submitted_epoch = excluded.submitted_epoch"
+				" WHERE excluded.submitted_epoch < earliest.submitted_epoch",
+				((name, key, source, serial, epoch) for (name, key), (epoch, serial) in earliest.items()),
+			)
+	finally:
+		conn.close()
+	return len(rows)
+
+
+def query_index(db_path: str | Path, kind: str, value: str, schedule: DeadlineSchedule | None = None) -> List[Dict[str, str]]:
+	"""Answer a query from the index alone; returns record dicts ordered by submission time.
+
+	Kinds:
+	  - 'student': all submissions of a student (name matched case-insensitively)
+	  - 'assignment': all submissions covering an assignment key ('day05', 'proposal')
+	  - 'status': all submissions with a status ('OPEN', 'CLOSED')
+	  - 'late': each student's earliest submission for an assignment key, if it was after
+	    their (possibly extended) deadline in `schedule`
+	"""
+	if kind not in INDEX_QUERIES:
+		raise ValueError(f"kind must be one of {list(INDEX_QUERIES)}")
+	if not Path(db_path).exists():
+		raise FileNotFoundError(f"Index not found: {db_path}")
+
+	columns = "s.serial, s.status, s.assignment, s.submitted_at"
+	conn = sqlite3.connect(str(db_path))
+	try:
+		if kind == "student":
+			rows = conn.execute(f"SELECT {columns} FROM submissions s WHERE s.student = ? ORDER BY s.submitted_epoch, s.source, s.serial", (value,)).fetchall()
+		elif kind == "status":
+			rows = conn.execute(f"SELECT {columns} FROM submissions s WHERE s.status = ? ORDER BY s.submitted_epoch, s.source, s.serial", (value.upper(),)).fetchall()
+		elif kind == "assignment":
+			rows = conn.execute(
+				f"SELECT {columns} FROM submission_keys k JOIN submissions s USING (source, serial) WHERE k.key = ? ORDER BY s.submitted_epoch, s.source, s.serial",
+				(value.lower(),),
+			).fetchall()
+		else:
+			key = value.lower()
+			schedule = schedule or DeadlineSchedule()
+			# earliest submission per student, then compare with that student's deadline
+			candidates = conn.execute(
+				f"SELECT {columns}, e.student, e.submitted_epoch FROM earliest e JOIN submissions s USING (source, serial)"
+				" WHERE e.key = ? ORDER BY e.submitted_epoch, s.source, s.serial",
+				(key,),
+			).fetchall()
+			rows = []
+			for *record, student, epoch in candidates:
+				deadline = schedule.deadline_for(key, student)
+				if deadline is not None and int(epoch) > _whole_seconds(deadline):
+					rows.append(record)
+	finally:
+		conn.close()
+
+	return [
+		{"serial": str(serial), "status": status, "assignment": assignment, "submitted_at": submitted_at}
+		for serial, status, assignment, submitted_at in rows
+	]
+
+
+class StageTimer:
+	"""Collects wall time per named stage for `--profile`; does nothing when disabled."""
+
+	__slots__ = ("enabled", "stages")
+
+	def __init__(self, enabled: bool = True):
+		self.enabled = enabled
+		self.stages: List[Tuple[str, float]] = []
+
+	@contextmanager
+	def stage(self, name: str):
+		if not self.enabled:
+			yield
+			return
+		start = time.perf_counter()
+		try:
+			yield
+		finally:
+			self.stages.append((name, time.perf_counter() - start))
+
+	def report(self, file=None):
+		"""Print the per-stage breakdown (to stderr by default, so --json output stays clean)."""
+		if not self.enabled or not self.stages:
+			return
+		file = file or sys.stderr
+		total = sum(seconds for _, seconds in self.stages)
+		width = max(len("total"), *(len(name) for name, _ in self.stages))
+		print(f"Profile ({len(self.stages)} stages)", file=file)
+		for name, seconds in self.stages:
+			share = seconds / total if total else 0.0
+			print(f"  {name:<{width}}  {seconds * 1000:>10.1f} ms  {share:>6.1%}", file=file)
+		print(f"  {'total':<{width}}  {total * 1000:>10.1f} ms", file=file)
+
+
+_NO_TIMER = StageTimer(enabled=False)
+
+
+def _print_outputs(
+	args: argparse.Namespace,
+	table: SubjectsTable,
+	summary: ProgressSummary,
+	schedule: DeadlineSchedule,
+	timer: StageTimer = _NO_TIMER,
+):
+	with timer.stage("filter open/closed"):
+		closed = closed_assignments(table)
+		open_ = open_assignments(table)
+
+	with timer.stage("print json" if args.json else "print lists"):
+		if args.json:
+			out = {"open": open_.to_records(), "closed": closed.to_records()}
+			print(json.dumps(out, ensure_ascii=False, indent=2))
+		else:
+			_print_list("Closed assignments", closed, len(closed))
+			print()
+			_print_list("Open assignments", open_, len(open_))
+
+	# optional report: missing submissions
+	if args.report:
+		with timer.stage("missing report"):
+			print()
+			_print_missing(summary.completeness_report())
+
+	# optional report: late submissions
+	if args.late:
+		with timer.stage("late report"):
+			print()
+			_print_late(summary, schedule)
+
+
 def main():
 	parser = argparse.ArgumentParser(description="Print open and closed assignments from subjects.txt")
 	parser.add_argument("--json", action="store_true", help="Output JSON with keys 'open' and 'closed'")
-	parser.add_argument("--file", default="subjects.txt", help="Path to subjects file")
+	parser.add_argument("--file", nargs="+", default=["subjects.txt"], help="Subjects file(s): paths, directories (searched for subjects*.txt) or glob patterns; several course sections are combined into one report")
+	parser.add_argument("--jobs", type=int, default=None, help="Worker processes for reading several files (default: one per CPU)")
 	parser.add_argument("--report", action="store_true", help="Print report of students missing submissions (Day01-08 + final)")
+	parser.add_argument("--late", action="store_true", help="Print report of submissions made after their deadline")
+	parser.add_argument("--deadlines", default=None, help="JSON file with deadlines and per-student extensions (default: built-in course deadlines)")
 	parser.add_argument("--export", nargs="?", const="report.xlsx", help="Export an Excel workbook (.xlsx) with the assignments and students sheets. Optionally pass filename.")
+	parser.add_argument("--incremental", action="store_true", help="Only process rows added since the last --incremental run (state kept in --state); prints counts and, with --report/--late, those reports")
+	parser.add_argument("--state", default=None, help="State file for --incremental (default: <file>.state.json)")
+	parser.add_argument("--watch", action="store_true", help="Keep running: tail the subjects file and re-print the output whenever new rows change it (Ctrl-C to stop)")
+	parser.add_argument("--interval", type=float, default=0.5, help="Polling interval in seconds for --watch")
+	parser.add_argument("--index", default=None, help="SQLite submissions index used by --build-index and --query")
+	parser.add_argument("--build-index", action="store_true", help="Add rows with new serials from --file to the --index database (with --rebuild-index: re-create it)")
+	parser.add_argument("--rebuild-index", action="store_true", help="Clear the --index database before indexing")
+	parser.add_argument("--query", nargs=2, metavar=("KIND", "VALUE"), help=f"Answer a query from --index without reading subjects.txt; KIND is one of {', '.join(INDEX_QUERIES)} (e.g. --query late day05, --query student 'Noa Levi')")
+	parser.add_argument("--profile", action="store_true", help="Print a per-stage timing breakdown to stderr when done")
 	args = parser.parse_args()
+	timer = StageTimer(args.profile)
+	try:
+		_run(parser, args, timer)
+	finally:
+		timer.report()
+
+
+def _run(parser: argparse.ArgumentParser, args: argparse.Namespace, timer: StageTimer):
+	with timer.stage("load deadlines"):
+		schedule = DeadlineSchedule.from_file(args.deadlines) if args.deadlines else DeadlineSchedule()
+
+	if args.build_index or args.rebuild_index or args.query:
+		if not args.index:
+			parser.error("--build-index/--query need --index PATH")
+		if args.query and args.query[0] not in INDEX_QUERIES:
+			parser.error(f"--query KIND must be one of {', '.join(INDEX_QUERIES)}")
+		if args.build_index or args.rebuild_index:
+			with timer.stage("build index"):
+				added = 0
+				for i, path in enumerate(resolve_subject_files(args.file)):
+					# each course section is tracked separately; --rebuild-index clears once, before the first
+					added += update_index(args.index, iter_subjects(path), rebuild=args.rebuild_index and i == 0, source=index_source(path))
+			print(f"Indexed {added} new rows into {args.index}")
+		if args.query:
+			kind, value = args.query
+			with timer.stage("query index"):
+				rows = query_index(args.index, kind, value, schedule)
+			if args.json:
+				print(json.dumps(rows, ensure_ascii=False, indent=2))
+			else:
+				_print_list(f"Query {kind}={value}", rows)
+		return
 
-	records = load_subjects(args.file)
-	closed = closed_assignments(records)
-	open_ = open_assignments(records)
+	if args.incremental:
+		if args.json or args.export:
+			parser.error("--incremental cannot be combined with --json or --export (they need every row)")
+		if len(args.file) != 1:
+			parser.error("--incremental works on a single --file")
+		with timer.stage("incremental update"):
+			summary, new_rows, rebuilt = update_incremental(args.file[0], args.state)
+		print(f"{'Rebuilt' if rebuilt else 'Updated'} progress state from {args.file[0]} ({new_rows} new rows)")
+		print(f"Closed assignments ({summary.closed_count})")
+		print(f"Open assignments ({summary.open_count})")
+		if args.report:
+			with timer.stage("missing report"):
+				print()
+				_print_missing(summary.completeness_report())
+		if args.late:
+			with timer.stage("late report"):
+				print()
+				_print_late(summary, schedule)
+		return
 
-	if args.json:
-		out = {"open": open_, "closed": closed}
-		print(json.dumps(out, ensure_ascii=False, indent=2))
-	else:
-		_print_list("Closed assignments", closed)
-		print()
-		_print_list("Open assignments", open_)
+	if args.watch:
+		if args.export or args.incremental:
+			parser.error("--watch cannot be combined with --export or --incremental")
+		if len(args.file) != 1:
+			parser.error("--watch works on a single --file")
+		last = None
+		try:
+			for table, summary in watch_subjects(args.file[0], args.interval):
+				# re-emit only when the rendered output actually changed
+				buf = io.StringIO()
+				with redirect_stdout(buf):
+					_print_outputs(args, table, summary, schedule, timer)
+				if buf.getvalue() != last:
+					last = buf.getvalue()
+					print(last, flush=True)
+		except KeyboardInterrupt:
+			pass
+		return
 
-	# optional report: missing submissions
-	if args.report:
-		print()
-		print_missing_report(records)
+	# compact columnar table: far smaller than a list of dicts and lets the
+	# filters/report work on whole columns at once
+	with timer.stage("load + summarize"):
+		table, summary = load_sections(resolve_subject_files(args.file), args.jobs)
+	_print_outputs(args, table, summary, schedule, timer)
 
 	if args.export:
 		fname = args.export if isinstance(args.export, str) else "report.xlsx"
 		print(f"Exporting workbook to {fname}...")
-		export_report_xlsx(records, fname)
+		with timer.stage("export xlsx"):
+			export_report_xlsx(table, fname, schedule=schedule)
 		print("Export complete.")
 
 
@@ -0,0 +1,507 @@
+# test_progress_report.py
+
+import pytest
+from datetime import datetime
+
+from progress_report import (
+    LATE,
+    MISSING,
+    ON_TIME,
+    DeadlineSchedule,
+    StageTimer,
+    SubjectsTable,
+    classify_assignment,
+    export_report_xlsx,
+    closed_assignments,
+    index_source,
+    iter_subjects,
+    load_subjects,
+    late_report,
+    load_sections,
+    load_subjects_table,
+    open_assignments,
+    query_index,
+    resolve_subject_files,
+    submission_completeness_report,
+    summarize_subjects,
+    update_incremental,
+    update_index,
+    watch_subjects,
+)
+
+SAMPLE = (
+    "5\tOPEN\tFinal Project proposal by Dana\t\t2026-01-02T15:59:16Z\n"
+    "4\tCLOSED\tDay08 by Dana\t\t2025-12-30T18:03:43Z\n"
+    "3\tCLOSED\tDay03 and Day04 by Dana\t\t2025-11-20T10:00:00Z\n"
+    "malformed line\n"
+    "\n"
+    "2\tclosed\tday01 by Omer\t\t2025-11-01T12:00:00Z\n"
+    "1\tCLOSED\tDay01 by Dana\t\t2025-11-05T20:11:06Z\n"
+)
+
+
+@pytest.fixture
+def subjects_file(tmp_path):
+    path = tmp_path / "subjects.txt"
+    path.write_text(SAMPLE, encoding="utf-8")
+    return path
+
+
+# -----------------------------
+# Tests for iter_subjects / load_subjects
+# -----------------------------
+
+def test_iter_subjects_matches_load_subjects(subjects_file):
+    assert list(iter_subjects(subjects_file)) == load_subjects(subjects_file)
+
+def test_iter_subjects_skips_malformed_and_uppercases_status(subjects_file):
+    records = list(iter_subjects(subjects_file))
+    assert [r["serial"] for r in records] == ["5", "4", "3", "2", "1"]
+    assert records[3]["status"] == "CLOSED"
+
+def test_iter_subjects_missing_file_raises_immediately(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        iter_subjects(tmp_path / "nope.txt")
+
+
+# -----------------------------
+# Tests for summarize_subjects
+# -----------------------------
+
+def test_summary_open_closed_counts(subjects_file):
+    summary = summarize_subjects(iter_subjects(subjects_file))
+    records = load_subjects(subjects_file)
+    assert summary.closed_count == len(closed_assignments(records))
+    assert summary.open_count == len(open_assignments(records))
+
+def test_summary_report_matches_list_based_report(subjects_file):
+    summary = summarize_subjects(iter_subjects(subjects_file))
+    assert summary.completeness_report() == submission_completeness_report(load_subjects(subjects_file))
+
+def test_summary_keeps_earliest_timestamp(subjects_file):
+    summary = summarize_subjects(iter_subjects(subjects_file))
+    dana = summary.earliest["Dana"]
+    assert dana["day01"].isoformat() == "2025-11-05T20:11:06"
+    assert dana["day03"] == dana["day04"]
+    assert dana["proposal"].isoformat() == "2026-01-02T15:59:16"
+    assert dana["day02"] is None
+
+
+# -----------------------------
+# Tests for multiple course sections
+# -----------------------------
+
+@pytest.fixture
+def sections_dir(tmp_path):
+    (tmp_path / "a").mkdir()
+    (tmp_path / "b").mkdir()
+    (tmp_path / "a" / "subjects.txt").write_text(SAMPLE, encoding="utf-8")
+    (tmp_path / "b" / "subjects_b.txt").write_text(
+        "1\tCLOSED\tDay02 by Dana\t\t2025-11-02T10:00:00Z\n"
+        "2\tOPEN\tDay01 by Noa\t\t2025-11-01T10:00:00Z\n",
+        encoding="utf-8",
+    )
+    (tmp_path / "b" / "notes.txt").write_text("not a subjects file", encoding="utf-8")
+    return tmp_path
+
+def test_resolve_subject_files_directory_and_glob(sections_dir):
+    expected = [sections_dir / "a" / "subjects.txt", sections_dir / "b" / "subjects_b.txt"]
+    assert resolve_subject_files(str(sections_dir)) == [p.resolve() for p in expected]
+    assert resolve_subject_files([str(sections_dir / "*" / "subjects*.txt"), str(expected[0])]) == [p.resolve() for p in expected]
+
+def test_resolve_subject_files_no_match(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        resolve_subject_files(str(tmp_path / "*.txt"))
+
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_load_sections_combines_files(sections_dir, jobs):
+    paths = resolve_subject_files(str(sections_dir))
+    table, summary = load_sections(paths, jobs=jobs)
+    records = [r for p in paths for r in load_subjects(p)]
+    assert table.to_records() == records
+    assert summary.completeness_report() == submission_completeness_report(records)
+    assert summary.earliest == summarize_subjects(records).earliest
+    assert (summary.open_count, summary.closed_count) == (2, 5)
+
+
+# -----------------------------
+# Tests for classify_assignment
+# -----------------------------
+
+@pytest.mark.parametrize("title, expected", [
+    ("Day08 by Shoshana Sernik", ({8}, False, "Shoshana Sernik")),
+    ("day 05 By Noa", ({5}, False, "Noa")),
+    ("Day03andDay04 - Lior", ({3, 4}, False, "Lior")),
+    ("Final Project proposal by Dana", (set(), True, "Dana")),
+    ("Day04 Lior Batat", ({4}, False, "Lior Batat")),
+])
+def test_classify_assignment(title, expected):
+    days, is_final, name = classify_assignment(title)
+    assert (set(days), is_final, name) == expected
+
+def test_classify_assignment_is_cached():
+    classify_assignment.cache_clear()
+    classify_assignment("Day01 by Omer")
+    classify_assignment("Day01 by Omer")
+    assert classify_assignment.cache_info().hits == 1
+
+
+# -----------------------------
+# Tests for SubjectsTable
+# -----------------------------
+
+def test_table_round_trips_records(subjects_file):
+    assert load_subjects_table(subjects_file).to_records() == load_subjects(subjects_file)
+
+def test_table_keeps_nonstandard_values_verbatim():
+    records = [
+        {"serial": "A7", "status": "OPEN", "assignment": "Day02 by Noa", "submitted_at": "2025-11-03 10:00:00"},
+        {"serial": "8", "status": "CLOSED", "assignment": "Day02 by Noa", "submitted_at": "not a date"},
+    ]
+    assert SubjectsTable.from_records(records).to_records() == records
+
+def test_table_filters_match_list_filters(subjects_file):
+    table = load_subjects_table(subjects_file)
+    records = load_subjects(subjects_file)
+    assert closed_assignments(table).to_records() == closed_assignments(records)
+    assert open_assignments(table).to_records() == open_assignments(records)
+    assert table.count_status("CLOSED") == 4
+    assert len(table.where_status("MISSING")) == 0
+
+def test_table_summary_matches_list_summary(subjects_file):
+    table_summary = summarize_subjects(load_subjects_table(subjects_file))
+    list_summary = summarize_subjects(load_subjects(subjects_file))
+    assert table_summary.completeness_report() == list_summary.completeness_report()
+    assert table_summary.earliest == list_summary.earliest
+    assert (table_summary.open_count, table_summary.closed_count) == (1, 4)
+
+def test_table_keeps_utc_offset_like_dict_path():
+    records = [
+        {"serial": "2", "status": "CLOSED", "assignment": "Day01 by Noa", "submitted_at": "2025-11-02T01:30:00+02:00"},
+        {"serial": "1", "status": "CLOSED", "assignment": "Day02 by Noa", "submitted_at": "2025-11-09T10:00:00Z"},
+    ]
+    table_summary = summarize_subjects(SubjectsTable.from_records(records))
+    list_summary = summarize_subjects(records)
+    assert table_summary.earliest == list_summary.earliest
+    assert table_summary.earliest["Noa"]["day01"].isoformat() == "2025-11-01T23:30:00"
+    assert late_report(table_summary) == late_report(list_summary) == {"Noa": ["day01"]}
+
+def test_mixed_utc_offsets_compare_as_utc(tmp_path):
+    records = [
+        {"serial": "2", "status": "CLOSED", "assignment": "Day01 by Ann", "submitted_at": "2025-10-30T10:00:00Z"},
+        {"serial": "1", "status": "CLOSED", "assignment": "day 01 by Ann", "submitted_at": "2025-10-30T10:00:00+02:00"},
+    ]
+    expected = {"Ann": {"days": {1}, "final": False, "complete": False}}
+    assert submission_completeness_report(records) == expected
+    assert submission_completeness_report(SubjectsTable.from_records(records)) == expected
+    assert summarize_subjects(records).earliest["Ann"]["day01"] == datetime(2025, 10, 30, 8, 0)
+
+    path = tmp_path / "subjects.txt"
+    path.write_text("".join(f"{r['serial']}\tCLOSED\t{r['assignment']}\t\t{r['submitted_at']}\n" for r in records), encoding="utf-8")
+    _, summary = load_sections([path, path], jobs=1)
+    assert summary.earliest["Ann"]["day01"] == datetime(2025, 10, 30, 8, 0)
+
+def test_table_supports_more_than_256_statuses():
+    records = [
+        {"serial": str(i), "status": f"S{i}", "assignment": "Day01 by Noa", "submitted_at": "2025-11-01T10:00:00Z"}
+        for i in range(300)
+    ]
+    table = SubjectsTable.from_records(records)
+    assert table.to_records() == records
+    assert table.count_status("S299") == 1
+    assert table.where_status("S299").to_records() == records[-1:]
+    assert len(table.where_status("S0", negate=True)) == 299
+
+
+# -----------------------------
+# Tests for DeadlineSchedule
+# -----------------------------
+
+def test_schedule_classifies_with_default_deadlines(subjects_file):
+    statuses = DeadlineSchedule().classify(summarize_subjects(iter_subjects(subjects_file)).earliest)
+    assert statuses["Dana"]["day01"] == LATE       # 2025-11-05, deadline 2025-11-01 22:00
+    assert statuses["Dana"]["day02"] == MISSING
+    assert statuses["Dana"]["day08"] == ON_TIME
+    assert statuses["Omer"]["day01"] == ON_TIME
+
+def test_schedule_deadline_is_inclusive_to_the_second():
+    earliest = {"Noa": {"day01": datetime(2025, 11, 1, 22, 0, 0, 500000)}}
+    assert DeadlineSchedule().classify(earliest)["Noa"]["day01"] == ON_TIME
+
+def test_schedule_extensions_from_file(subjects_file, tmp_path):
+    config = tmp_path / "deadlines.json"
+    config.write_text(
+        '{"deadlines": {"day08": "2025-12-01 22:00"}, "extensions": {"Dana": {"day01": "2025-11-06 22:00"}}}',
+        encoding="utf-8",
+    )
+    schedule = DeadlineSchedule.from_file(config)
+    assert schedule.deadline_for("day01", "Dana") == datetime(2025, 11, 6, 22, 0)
+    assert schedule.deadline_for("day01", "Omer") == datetime(2025, 11, 1, 22, 0)
+    summary = summarize_subjects(iter_subjects(subjects_file))
+    assert late_report(summary, schedule) == {"Dana": ["day03", "day08"]}
+    assert late_report(summary) == {"Dana": ["day01", "day03"]}
+
+def test_schedule_deadlines_with_utc_offset(tmp_path):
+    config = tmp_path / "deadlines.json"
+    config.write_text(
+        '{"deadlines": {"day01": "2025-11-01T22:00:00+02:00"}, "extensions": {"Dana": {"day01": "2025-11-02T22:00:00Z"}}}',
+        encoding="utf-8",
+    )
+    schedule = DeadlineSchedule.from_file(config)
+    assert schedule.deadline_for("day01") == datetime(2025, 11, 1, 20, 0)
+    earliest = {
+        "Noa": {"day01": datetime(2025, 11, 1, 20, 0)},
+        "Omer": {"day01": datetime(2025, 11, 1, 21, 0)},
+        "Dana": {"day01": datetime(2025, 11, 2, 21, 0)},
+    }
+    statuses = schedule.classify(earliest)
+    assert [statuses[name]["day01"] for name in ("Noa", "Omer", "Dana")] == [ON_TIME, LATE, ON_TIME]
+
+
+# -----------------------------
+# Tests for the SQLite index
+# -----------------------------
+
+def test_index_is_incremental_by_serial(subjects_file, tmp_path):
+    db = tmp_path / "index.db"
+    assert update_index(db, iter_subjects(subjects_file)) == 5
+    assert update_index(db, iter_subjects(subjects_file)) == 0
+    with subjects_file.open("a", encoding="utf-8") as fh:
+        fh.write("6\tOPEN\tDay02 by Omer\t\t2025-11-09T10:00:00Z\n")
+    assert update_index(db, iter_subjects(subjects_file)) == 1
+    assert update_index(db, iter_subjects(subjects_file), rebuild=True) == 6
+
+def test_index_keeps_last_record_of_duplicate_serial(subjects_file, tmp_path):
+    db = tmp_path / "index.db"
+    update_index(db, iter_subjects(subjects_file))
+    with subjects_file.open("a", encoding="utf-8") as fh:
+        fh.write("6\tOPEN\tDay02 by Omer\t\t2025-11-12T10:00:00Z\n")
+        fh.write("6\tCLOSED\tDay03 by Omer\t\t2025-11-13T10:00:00Z\n")
+    assert update_index(db, iter_subjects(subjects_file)) == 1
+    omer = query_index(db, "student", "Omer")
+    assert [(r["serial"], r["status"], r["assignment"]) for r in omer][1:] == [("6", "CLOSED", "Day03 by Omer")]
+    assert query_index(db, "assignment", "day02") == []
+    assert query_index(db, "late", "day02") == []
+    assert [r["serial"] for r in query_index(db, "assignment", "day03")] == ["6", "3"]
+
+def test_index_queries(subjects_file, tmp_path):
+    db = tmp_path / "index.db"
+    update_index(db, iter_subjects(subjects_file))
+    assert [r["serial"] for r in query_index(db, "student", "dana")] == ["1", "3", "4", "5"]
+    assert [r["serial"] for r in query_index(db, "assignment", "day04")] == ["3"]
+    assert [r["serial"] for r in query_index(db, "status", "open")] == ["5"]
+    assert query_index(db, "student", "Dana")[0] == load_subjects(subjects_file)[-1]
+
+def test_index_late_query_matches_late_report(subjects_file, tmp_path):
+    db = tmp_path / "index.db"
+    update_index(db, iter_subjects(subjects_file))
+    assert [r["serial"] for r in query_index(db, "late", "day01")] == ["1"]
+    assert query_index(db, "late", "day08") == []
+    schedule = DeadlineSchedule(extensions={"Dana": {"day01": datetime(2025, 11, 6)}})
+    assert query_index(db, "late", "day01", schedule) == []
+
+def test_index_keeps_sections_with_overlapping_serials(sections_dir, tmp_path):
+    db = tmp_path / "index.db"
+    a, b = resolve_subject_files(str(sections_dir))
+    assert update_index(db, iter_subjects(a), source=index_source(a)) == 5
+    assert update_index(db, iter_subjects(b), source=index_source(b)) == 2
+    dana = query_index(db, "student", "Dana")
+    assert [(r["serial"], r["assignment"]) for r in dana][:2] == [("1", "Day02 by Dana"), ("1", "Day01 by Dana")]
+    assert len(dana) == 5
+
+    # new rows in a section whose serials are below the other section's are still picked up
+    with b.open("a", encoding="utf-8") as fh:
+        fh.write("3\tOPEN\tDay05 by Noa\t\t2025-11-29T10:00:00Z\n")
+    assert update_index(db, iter_subjects(a), source=index_source(a)) == 0
+    assert update_index(db, iter_subjects(b), source=index_source(b)) == 1
+    assert [r["serial"] for r in query_index(db, "assignment", "day01")] == ["2", "2", "1"]
+
+def test_index_from_older_schema_is_recreated(tmp_path):
+    import sqlite3
+
+    db = tmp_path / "index.db"
+    conn = sqlite3.connect(db)
+    conn.execute("CREATE TABLE submissions (serial INTEGER PRIMARY KEY, status TEXT)")
+    conn.execute("INSERT INTO submissions VALUES (9, 'OPEN')")
+    conn.commit()
+    conn.close()
+    assert update_index(db, [{"serial": "1", "status": "OPEN", "assignment": "Day01 by Noa", "submitted_at": "2025-11-01T10:00:00Z"}]) == 1
+    assert [r["serial"] for r in query_index(db, "status", "OPEN")] == ["1"]
+
+def test_index_query_errors(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        query_index(tmp_path / "missing.db", "student", "Dana")
+    with pytest.raises(ValueError, match="kind must be one of"):
+        query_index(tmp_path / "missing.db", "teacher", "Dana")
+
+
+# -----------------------------
+# Tests for export_report_xlsx
+# -----------------------------
+
+@pytest.mark.parametrize("write_only", [True, False])
+def test_export_colors_students_sheet(subjects_file, tmp_path, write_only):
+    openpyxl = pytest.importorskip("openpyxl")
+    out = tmp_path / "report.xlsx"
+    export_report_xlsx(load_subjects_table(subjects_file), str(out), write_only=write_only)
+
+    wb = openpyxl.load_workbook(out)
+    assert wb.sheetnames == ["Assignments", "Students"]
+    assert wb["Assignments"].max_row == 6
+    rows = {row[0].value: row[1:] for row in wb["Students"].iter_rows(min_row=2)}
+    day01, day02 = rows["Dana"][0], rows["Dana"][1]
+    assert day01.value == "2025-11-05 20:11:06"
+    assert day01.font.color.rgb == "00FFFF00"  # late
+    assert day02.value == "Not submitted"
+    assert day02.font.color.rgb == "00FF0000"  # missing
+    assert rows["Omer"][0].font.color.rgb == "00000000"  # on time
+
+def test_export_matches_previous_export(subjects_file, tmp_path):
+    openpyxl = pytest.importorskip("openpyxl")
+    from benchmark_progress_report import export_report_xlsx_previous
+
+    export_report_xlsx(load_subjects_table(subjects_file), str(tmp_path / "new.xlsx"))
+    export_report_xlsx_previous(load_subjects(subjects_file), str(tmp_path / "old.xlsx"))
+    sheets = []
+    for name in ("new.xlsx", "old.xlsx"):
+        ws = openpyxl.load_workbook(tmp_path / name)["Students"]
+        sheets.append([[(c.value, c.font.color.rgb if c.font.color else None) for c in row] for row in ws.iter_rows(min_row=2)])
+    assert sheets[0] == sheets[1]
+
+
+# -----------------------------
+# Tests for update_incremental
+# -----------------------------
+
+def test_incremental_first_run_matches_full_summary(subjects_file, tmp_path):
+    summary, new_rows, rebuilt = update_incremental(subjects_file, tmp_path / "state.json")
+    assert (new_rows, rebuilt) == (5, True)
+    assert summary.completeness_report() == submission_completeness_report(load_subjects(subjects_file))
+
+def test_incremental_processes_only_appended_rows(subjects_file, tmp_path):
+    state = tmp_path / "state.json"
+    update_incremental(subjects_file, state)
+    with subjects_file.open("a", encoding="utf-8") as fh:
+        fh.write("6\tOPEN\tDay02 by Omer\t\t2025-11-09T10:00:00Z\n")
+        fh.write("4\tOPEN\tDay05 by Omer\t\t2025-11-09T10:00:00Z\n")  # serial already seen
+    summary, new_rows, rebuilt = update_incremental(subjects_file, state)
+    assert (new_rows, rebuilt) == (1, False)
+    assert summary.students["Omer"]["days"] == {1, 2}
+    assert summary.open_count == 2
+
+def test_incremental_rebuilds_when_file_rewritten(subjects_file, tmp_path):
+    state = tmp_path / "state.json"
+    update_incremental(subjects_file, state)
+    subjects_file.write_text("9\tCLOSED\tDay01 by Noa\t\t2025-11-01T10:00:00Z\n" + SAMPLE, encoding="utf-8")
+    summary, new_rows, rebuilt = update_incremental(subjects_file, state)
+    assert (new_rows, rebuilt) == (6, True)
+    assert "Noa" in summary.students
+
+def test_incremental_counts_partial_line_without_saving_it(subjects_file, tmp_path):
+    state = tmp_path / "state.json"
+    update_incremental(subjects_file, state)
+    with subjects_file.open("a", encoding="utf-8") as fh:
+        fh.write("6\tOPEN\tDay02 by Omer\t\t2025-11-09T10:00:00Z")
+    summary, new_rows, _ = update_incremental(subjects_file, state)
+    assert (new_rows, summary.open_count) == (1, 2)
+    summary, new_rows, _ = update_incremental(subjects_file, state)
+    assert (new_rows, summary.open_count) == (1, 2)
+    with subjects_file.open("a", encoding="utf-8") as fh:
+        fh.write("\n")
+    summary, new_rows, rebuilt = update_incremental(subjects_file, state)
+    assert (new_rows, rebuilt) == (1, False)
+    assert summary.open_count == 2
+    assert update_incremental(subjects_file, state)[1] == 0
+
+def test_incremental_matches_full_summary_without_trailing_newline(subjects_file, tmp_path):
+    subjects_file.write_text(SAMPLE.rstrip("\n"), encoding="utf-8")
+    expected = summarize_subjects(iter_subjects(subjects_file))
+    state = tmp_path / "state.json"
+    runs = [update_incremental(subjects_file, state), update_incremental(subjects_file, state)]
+    with subjects_file.open("a", encoding="utf-8") as fh:
+        fh.write("\n")
+    runs += [update_incremental(subjects_file, state), update_incremental(subjects_file, state)]
+    assert [(new_rows, rebuilt) for _, new_rows, rebuilt in runs] == [(5, True), (1, False), (1, False), (0, False)]
+    for summary, _, _ in runs:
+        assert (summary.open_count, summary.closed_count) == (expected.open_count, expected.closed_count)
+        assert summary.completeness_report() == expected.completeness_report()
+
+@pytest.mark.parametrize("drop", ["offset", "head_hash", "summary"])
+def test_incremental_rebuilds_from_incomplete_state(subjects_file, tmp_path, drop):
+    import json
+
+    state = tmp_path / "state.json"
+    update_incremental(subjects_file, state)
+    saved = json.loads(state.read_text(encoding="utf-8"))
+    del saved[drop]
+    state.write_text(json.dumps(saved), encoding="utf-8")
+    summary, new_rows, rebuilt = update_incremental(subjects_file, state)
+    assert (new_rows, rebuilt) == (5, True)
+    assert summary.closed_count == 4
+
+
+# -----------------------------
+# Tests for watch_subjects
+# -----------------------------
+
+def test_watch_yields_initial_state_then_only_on_new_rows(subjects_file):
+    watcher = watch_subjects(subjects_file, interval=0)
+    table, summary = next(watcher)
+    assert len(table) == 5
+
+    with subjects_file.open("a", encoding="utf-8") as fh:
+        fh.write("6\tOPEN\tDay02 by Omer\t\t2025-11-09T10:00:00Z\n")
+        fh.write("7\tOPEN\tDay03 by Omer")  # unterminated: not consumed yet
+    table, summary = next(watcher)
+    assert len(table) == 6
+    assert summary.students["Omer"]["days"] == {1, 2}
+
+    with subjects_file.open("a", encoding="utf-8") as fh:
+        fh.write("\t\t2025-11-16T10:00:00Z\n")
+    table, summary = next(watcher)
+    assert table.to_records()[-1]["assignment"] == "Day03 by Omer"
+    assert summary.open_count == 3
+
+def test_watch_rebuilds_after_rewrite(subjects_file):
+    watcher = watch_subjects(subjects_file, interval=0)
+    next(watcher)
+    subjects_file.write_text("1\tCLOSED\tDay01 by Noa\t\t2025-11-01T10:00:00Z\n", encoding="utf-8")
+    table, summary = next(watcher)
+    assert len(table) == 1
+    assert list(summary.students) == ["Noa"]
+
+def test_watch_stops_after_max_polls(subjects_file):
+    assert len(list(watch_subjects(subjects_file, interval=0, max_polls=3))) == 1
+
+# -----------------------------
+# Tests for the profiling/benchmark helpers
+# -----------------------------
+
+def test_stage_timer_reports_each_stage(capsys):
+    timer = StageTimer()
+    with timer.stage("load"):
+        pass
+    with timer.stage("report"):
+        pass
+    assert [name for name, _ in timer.stages] == ["load", "report"]
+    timer.report()
+    err = capsys.readouterr().err
+    assert "Profile (2 stages)" in err and "load" in err and "total" in err
+
+def test_stage_timer_disabled_is_silent(capsys):
+    timer = StageTimer(enabled=False)
+    with timer.stage("load"):
+        pass
+    timer.report()
+    assert timer.stages == []
+    assert capsys.readouterr().err == ""
+
+def test_generated_subjects_respect_days_and_malformed_ratio(tmp_path):
+    from benchmark_progress_report import generate_subjects
+
+    path = tmp_path / "subjects.txt"
+    generate_subjects(path, 2000, students=20, days=(2, 5), malformed=0.1, variants=4)
+    table = load_subjects_table(path)
+    assert 1700 < len(table) < 1900
+    summary = summarize_subjects(table)
+    assert set().union(*(s["days"] for s in summary.students.values())) == {2, 5}